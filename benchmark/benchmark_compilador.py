@@ -0,0 +1,218 @@
+"""
+Benchmark de escalabilidade do analisador léxico e do Parser.
+
+Gera programas sintéticos de vários tamanhos e formas, mede separadamente
+o léxico (compilador.analisar_lexico, com os tokens em lista ou compactos, ou
+tokens_do_arquivo, em fluxo direto do arquivo) e Parser.analisar (tempo,
+tokens/s e pico de memória via tracemalloc) e grava os resultados em JSON para
+comparação entre execuções.
+
+Uso:
+    python -m benchmark.benchmark_compilador --tamanhos 16K,256K,4M --formas misto,aninhado
+    python -m benchmark.benchmark_compilador --baseline benchmark/resultados/anterior.json
+    python -m benchmark.benchmark_compilador --tamanhos 200M --lexico fluxo
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmark.gerador_programas import FORMAS, escrever_programa
+from compilador import LEXICOS, analisar_lexico
+from lexico.analisador_lexico import tokens_do_arquivo
+from sintatico.analisador_sintatico import Parser
+
+DIRETORIO_RESULTADOS = os.path.join(os.path.dirname(__file__), 'resultados')
+_SUFIXOS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def interpretar_tamanho(texto):
+    texto = texto.strip().upper().rstrip('B')
+    if texto and texto[-1] in _SUFIXOS:
+        return int(float(texto[:-1]) * _SUFIXOS[texto[-1]])
+    return int(texto)
+
+
+def formatar_tamanho(n):
+    for sufixo in ('G', 'M', 'K'):
+        if n >= _SUFIXOS[sufixo]:
+            return f"{n / _SUFIXOS[sufixo]:.0f}{sufixo}"
+    return str(n)
+
+
+def _medir(funcao, repeticoes):
+    melhor = None
+    resultado = None
+    for _ in range(repeticoes):
+        resultado = None
+        gc.collect()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor, resultado
+
+
+def _pico_memoria(funcao):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def executar_caso(fonte, repeticoes=3, medir_memoria=True, lexico='lista'):
+    """
+    Args:
+        fonte (str): o código-fonte; com 'fluxo', o caminho do arquivo, que é
+            lido em blocos (via mmap) e nunca fica inteiro em memória.
+    """
+    if lexico == 'fluxo':
+        # os tokens não ficam guardados: a fase léxica só percorre o fluxo e
+        # a sintática refaz o léxico enquanto analisa
+        def lexar():
+            return sum(1 for _ in tokens_do_arquivo(fonte))
+
+        def analisar():
+            Parser(tokens_do_arquivo(fonte)).analisar(imprimir=False)
+
+        tempo_lexico, quantidade = _medir(lexar, repeticoes)
+    else:
+        def lexar():
+            return analisar_lexico(fonte, lexico)
+
+        def analisar():
+            Parser(tokens).analisar(imprimir=False)
+
+        tempo_lexico, tokens = _medir(lexar, repeticoes)
+        quantidade = len(tokens)
+
+    tempo_sintatico, _ = _medir(analisar, repeticoes)
+
+    fases = {
+        'lexico': {'segundos': tempo_lexico},
+        'sintatico': {'segundos': tempo_sintatico},
+    }
+    if medir_memoria:
+        fases['lexico']['pico_memoria_bytes'] = _pico_memoria(lexar)
+        fases['sintatico']['pico_memoria_bytes'] = _pico_memoria(analisar)
+    for fase in fases.values():
+        fase['tokens_por_segundo'] = quantidade / fase['segundos'] if fase['segundos'] else 0.0
+    return quantidade, fases
+
+
+def executar(tamanhos, formas, repeticoes=3, medir_memoria=True, opcoes_gerador=None, lexico='lista'):
+    resultados = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        for forma in formas:
+            for tamanho in tamanhos:
+                caminho = os.path.join(diretorio, f"{forma}_{tamanho}.txt")
+                with open(caminho, 'w', encoding='utf-8') as arquivo:
+                    escrito = escrever_programa(arquivo, tamanho, forma, **(opcoes_gerador or {}))
+                if lexico == 'fluxo':
+                    quantidade, fases = executar_caso(caminho, repeticoes, medir_memoria, lexico)
+                else:
+                    with open(caminho, 'r', encoding='utf-8') as arquivo:
+                        codigo = arquivo.read()
+                    quantidade, fases = executar_caso(codigo, repeticoes, medir_memoria, lexico)
+                    del codigo
+                os.remove(caminho)
+                for fase, medidas in fases.items():
+                    resultados.append({
+                        'forma': forma,
+                        'lexico': lexico,
+                        'tamanho_alvo': tamanho,
+                        'tamanho_bytes': escrito,
+                        'tokens': quantidade,
+                        'fase': fase,
+                        **medidas,
+                    })
+                    imprimir_linha(resultados[-1])
+    return resultados
+
+
+def imprimir_linha(r):
+    memoria = r.get('pico_memoria_bytes')
+    texto_memoria = f"{memoria / (1 << 20):9.1f} MB" if memoria is not None else '        -'
+    print(f"{r['forma']:<11} {formatar_tamanho(r['tamanho_alvo']):>6} {r['fase']:<10} "
+          f"{r['tokens']:>11} tokens {r['segundos']:9.4f} s "
+          f"{r['tokens_por_segundo']:>13,.0f} tok/s {texto_memoria}")
+
+
+def _chave(r):
+    # resultados anteriores à opção --lexico usaram a lista de tokens
+    return (r['forma'], r.get('lexico', 'lista'), r['tamanho_alvo'], r['fase'])
+
+
+def comparar(resultados, caminho_baseline):
+    with open(caminho_baseline, 'r', encoding='utf-8') as f:
+        baseline = {_chave(r): r for r in json.load(f)['resultados']}
+
+    print(f"\nComparação com {caminho_baseline} (razão atual/baseline; < 1 é melhor):")
+    for r in resultados:
+        anterior = baseline.get(_chave(r))
+        if anterior is None:
+            continue
+        razao_tempo = r['segundos'] / anterior['segundos'] if anterior['segundos'] else float('inf')
+        texto = f"{r['forma']:<11} {formatar_tamanho(r['tamanho_alvo']):>6} {r['fase']:<10} tempo x{razao_tempo:.2f}"
+        if 'pico_memoria_bytes' in r and anterior.get('pico_memoria_bytes'):
+            texto += f"  memória x{r['pico_memoria_bytes'] / anterior['pico_memoria_bytes']:.2f}"
+        print(texto)
+
+
+def salvar(resultados, caminho):
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    dados = {
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'resultados': resultados,
+    }
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, indent=2)
+    print(f"\nResultados salvos em {caminho}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de escalabilidade do léxico e do Parser.")
+    parser.add_argument('--tamanhos', default='16K,256K,4M',
+                        help="tamanhos dos programas, separados por vírgula (ex.: 64K,1M,200M)")
+    parser.add_argument('--formas', default='misto',
+                        help=f"formas de programa: {', '.join(FORMAS)} ou 'todas'")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--sem-memoria', action='store_true', help="não mede o pico de memória")
+    parser.add_argument('--lexico', choices=LEXICOS, default='lista',
+                        help="formato dos tokens; com 'fluxo', a fase sintática inclui o léxico")
+    parser.add_argument('--profundidade', type=int, default=8, help="aninhamento de se/enquanto")
+    parser.add_argument('--termos', type=int, default=40, help="operandos por expressão longa")
+    parser.add_argument('--largura', type=int, default=10, help="variáveis por declaração global")
+    parser.add_argument('--saida', help="arquivo JSON de resultados")
+    parser.add_argument('--baseline', help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args(argv)
+
+    tamanhos = [interpretar_tamanho(t) for t in args.tamanhos.split(',')]
+    formas = list(FORMAS) if args.formas == 'todas' else args.formas.split(',')
+    # o Parser é recursivo; aninhamentos profundos precisam de mais pilha
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100 * args.profundidade + 1000))
+
+    resultados = executar(
+        tamanhos, formas, args.repeticoes, not args.sem_memoria,
+        {'profundidade': args.profundidade, 'termos': args.termos, 'largura': args.largura},
+        args.lexico,
+    )
+
+    saida = args.saida or os.path.join(DIRETORIO_RESULTADOS, time.strftime('benchmark_%Y%m%d_%H%M%S.json'))
+    salvar(resultados, saida)
+    if args.baseline:
+        comparar(resultados, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark de execução do código de três endereços.
+
+Executa os programas de exemplo (entrada*.txt) e laços de contagem gerados com
+milhões de iterações na máquina virtual e no backend Python, e compara os laços
+com o mesmo laço escrito diretamente em Python como referência.
+
+Uso:
+    python -m benchmark.benchmark_execucao --iteracoes 100000,1000000
+    python -m benchmark.benchmark_execucao -O 1
+"""
+import argparse
+import glob
+import os
+import time
+
+from benchmark.benchmark_compilador import salvar
+from benchmark.gerador_programas import gerar_programa_laco
+from compilador import compilar
+from execucao.backend_python import BackendPython, CacheCodigo
+from execucao.maquina_virtual import MaquinaVirtual
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRETORIO_RESULTADOS = os.path.join(os.path.dirname(__file__), 'resultados')
+
+
+def _descartar(_texto):
+    pass
+
+
+def _melhor_tempo(funcao, repeticoes):
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor
+
+
+def medir_vm(codigo, repeticoes, nivel_otimizacao=0):
+    tac = compilar(codigo, nivel_otimizacao=nivel_otimizacao).codigo_intermediario
+    carga = _melhor_tempo(lambda: MaquinaVirtual(tac, saida=_descartar), repeticoes)
+    execucao = _melhor_tempo(lambda: MaquinaVirtual(tac, saida=_descartar).executar(), repeticoes) - carga
+    # sem cache, para medir também a tradução e o compile()
+    carga_py = _melhor_tempo(lambda: BackendPython(tac, saida=_descartar, cache=CacheCodigo()).carregar(), repeticoes)
+    carga_py_cache = _melhor_tempo(lambda: BackendPython(tac, saida=_descartar).carregar(), repeticoes)
+    execucao_py = _melhor_tempo(lambda: BackendPython(tac, saida=_descartar).executar(), repeticoes) - carga_py_cache
+    return {
+        'instrucoes_tac': len(tac),
+        'carga_segundos': carga,
+        'execucao_segundos': max(execucao, 0.0),
+        'carga_python_segundos': carga_py,
+        'execucao_python_segundos': max(execucao_py, 0.0),
+    }
+
+
+def laco_python(iteracoes, com_chamada=True):
+    # o mesmo programa de gerar_programa_laco, escrito em Python
+    def maior(x, y):
+        if x > y:
+            return x
+        return y
+
+    c = iteracoes
+    s = 0
+    if com_chamada:
+        while c > 0:
+            s = s + maior(c, 7)
+            c = c - 1
+    else:
+        while c > 0:
+            s = s + c * 2
+            c = c - 1
+    return s
+
+
+def executar(iteracoes, repeticoes, nivel_otimizacao=0):
+    resultados = []
+    for caminho in sorted(glob.glob(os.path.join(RAIZ, 'entrada*.txt'))):
+        with open(caminho, 'r', encoding='utf-8') as f:
+            codigo = f.read()
+        medidas = medir_vm(codigo, repeticoes, nivel_otimizacao)
+        resultados.append({'programa': os.path.basename(caminho), **medidas})
+        imprimir_linha(resultados[-1])
+
+    for n in iteracoes:
+        for com_chamada in (False, True):
+            nome = f"laco_{'chamada' if com_chamada else 'aritmetico'}_{n}"
+            medidas = medir_vm(gerar_programa_laco(n, com_chamada), repeticoes, nivel_otimizacao)
+            medidas['python_segundos'] = _melhor_tempo(lambda: laco_python(n, com_chamada), repeticoes)
+            resultados.append({'programa': nome, 'iteracoes': n, **medidas})
+            imprimir_linha(resultados[-1])
+    return resultados
+
+
+def imprimir_linha(r):
+    texto = (f"{r['programa']:<28} {r['instrucoes_tac']:>5} instr  carga {r['carga_segundos'] * 1000:8.2f} ms"
+             f"  vm {r['execucao_segundos'] * 1000:10.2f} ms"
+             f"  backend py (carga {r['carga_python_segundos'] * 1000:.2f} ms) {r['execucao_python_segundos'] * 1000:10.2f} ms")
+    if r['execucao_python_segundos'] > 1e-4:
+        texto += f" (vm/backend x{r['execucao_segundos'] / r['execucao_python_segundos']:.1f})"
+    if 'python_segundos' in r:
+        texto += f"  python puro {r['python_segundos'] * 1000:10.2f} ms"
+    print(texto)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de execução do TAC (máquina virtual e backend Python).")
+    parser.add_argument('--iteracoes', default='100000,1000000',
+                        help="iterações dos laços gerados, separadas por vírgula")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('-O', '--otimizacao', type=int, default=0, metavar='NIVEL',
+                        help="nível de otimização aplicado ao TAC antes de executar")
+    parser.add_argument('--saida', help="arquivo JSON de resultados")
+    args = parser.parse_args(argv)
+
+    iteracoes = [int(n) for n in args.iteracoes.split(',')]
+    resultados = executar(iteracoes, args.repeticoes, args.otimizacao)
+    saida = args.saida or os.path.join(DIRETORIO_RESULTADOS, time.strftime('execucao_%Y%m%d_%H%M%S.json'))
+    salvar(resultados, saida)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Gerador de programas sintéticos válidos para os benchmarks do compilador.
+
+Os programas são escritos em blocos diretamente em um arquivo, de modo que é
+possível gerar entradas de centenas de MB sem montá-las em memória.
+"""
+import io
+
+FORMAS = ('globais', 'aninhado', 'expressoes', 'funcoes', 'misto')
+
+CABECALHO = (
+    "inicio_programa bench\n"
+    "inteiro a, b, c;\n"
+    "a = 4;\n"
+    "b = 2;\n"
+    "c = 0;\n"
+)
+RODAPE = "fim_programa\n"
+
+
+def _bloco_globais(n, largura):
+    nomes = [f"g{n}_{i}" for i in range(largura)]
+    linhas = [f"inteiro {', '.join(nomes)};\n"]
+    linhas += [f"{nome} = {i};\n" for i, nome in enumerate(nomes)]
+    linhas.append(f"c = {nomes[0]} + {nomes[-1]};\n")
+    return ''.join(linhas)
+
+
+def _bloco_aninhado(n, profundidade):
+    partes = []
+    recuo = ''
+    for nivel in range(profundidade):
+        if nivel % 2 == 0:
+            partes.append(f"{recuo}se (a > {nivel}) {{\n")
+        else:
+            partes.append(f"{recuo}enquanto (c < {nivel}) {{\n")
+        recuo += '    '
+    partes.append(f"{recuo}c = c + 1;\n")
+    for nivel in reversed(range(profundidade)):
+        if nivel % 2 and nivel < profundidade - 1:
+            # o corpo de dentro pode não executar (um `se` falso): cada laço avança a própria condição
+            partes.append(f"{recuo}c = c + 1;\n")
+        recuo = recuo[:-4]
+        partes.append(f"{recuo}}}\n")
+    return ''.join(partes)
+
+
+def _bloco_expressoes(n, termos):
+    operadores = (' + ', ' * ', ' - ', ' * ')
+    partes = ['c = a']
+    for i in range(1, termos):
+        operando = 'b' if i % 3 else f"({i} - a)"
+        partes.append(operadores[i % 4])
+        partes.append(operando)
+    partes.append(';\n')
+    return ''.join(partes)
+
+
+def _bloco_funcoes(n, largura):
+    return (
+        f"funcao f{n}(inteiro x, inteiro y): inteiro {{\n"
+        f"    se (x > y) {{\n"
+        f"        retorna x * y + {n};\n"
+        f"    }}\n"
+        f"    retorna x - y;\n"
+        f"}}\n"
+        f"c = f{n}(a, b) + f{n}(b, {largura});\n"
+    )
+
+
+_GERADORES = {
+    'globais': _bloco_globais,
+    'aninhado': _bloco_aninhado,
+    'expressoes': _bloco_expressoes,
+    'funcoes': _bloco_funcoes,
+}
+
+
+def escrever_programa(arquivo, tamanho_alvo, forma='misto', largura=10, profundidade=8, termos=40):
+    """
+    Escreve em `arquivo` um programa válido com aproximadamente `tamanho_alvo` bytes.
+
+    Args:
+        arquivo: objeto de arquivo em modo texto.
+        tamanho_alvo (int): tamanho aproximado do programa, em caracteres.
+        forma (str): uma de FORMAS; 'misto' alterna entre as demais.
+        largura (int): variáveis por declaração em 'globais'.
+        profundidade (int): níveis de se/enquanto aninhados em 'aninhado'.
+        termos (int): operandos por expressão em 'expressoes'.
+
+    Returns:
+        int: quantidade de caracteres escrita.
+    """
+    if forma not in FORMAS:
+        raise ValueError(f"Forma desconhecida: '{forma}'. Use uma de {', '.join(FORMAS)}.")
+
+    parametros = {
+        'globais': largura,
+        'aninhado': profundidade,
+        'expressoes': termos,
+        'funcoes': largura,
+    }
+    ciclo = [f for f in FORMAS if f != 'misto'] if forma == 'misto' else [forma]
+
+    arquivo.write(CABECALHO)
+    escrito = len(CABECALHO)
+    n = 0
+    while escrito + len(RODAPE) < tamanho_alvo:
+        atual = ciclo[n % len(ciclo)]
+        bloco = _GERADORES[atual](n, parametros[atual])
+        arquivo.write(bloco)
+        escrito += len(bloco)
+        n += 1
+    arquivo.write(RODAPE)
+    return escrito + len(RODAPE)
+
+
+def gerar_programa(tamanho_alvo, forma='misto', **opcoes):
+    buffer = io.StringIO()
+    escrever_programa(buffer, tamanho_alvo, forma, **opcoes)
+    return buffer.getvalue()
+
+
+def gerar_programa_laco(iteracoes, com_chamada=True):
+    """
+    Programa com um laço de contagem no estilo de entrada.txt, para medir a
+    execução do TAC. Com `com_chamada`, cada iteração também chama uma função.
+    """
+    chamada = "    s = s + maior(c, 7);\n" if com_chamada else "    s = s + c * 2;\n"
+    return (
+        "inicio_programa laco\n"
+        "inteiro c, s;\n"
+        "funcao maior(inteiro x, inteiro y): inteiro {\n"
+        "    se (x > y) {\n"
+        "        retorna x;\n"
+        "    } senao {\n"
+        "        retorna y;\n"
+        "    }\n"
+        "}\n"
+        f"c = {iteracoes};\n"
+        "s = 0;\n"
+        "enquanto (c > 0) {\n"
+        f"{chamada}"
+        "    c = c - 1;\n"
+        "}\n"
+        "escreva(s);\n"
+        "fim_programa\n"
+    )
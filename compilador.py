@@ -0,0 +1,125 @@
+"""
+Ponto de entrada programático do pipeline de compilação.
+
+    parser = compilar(codigo, estatisticas=Estatisticas(), nivel_otimizacao=1)
+    print(parser.estatisticas.relatorio())
+"""
+from contextlib import nullcontext
+
+from intermediario.quadruplas import listagem
+from lexico.analisador_lexico import analisar_codigo, analisar_codigo_compacto, gerar_tokens
+from sintatico.analisador_sintatico import Parser
+
+
+def fase(estatisticas, nome):
+    return estatisticas.fase(nome) if estatisticas is not None else nullcontext()
+
+
+LEXICOS = ('lista', 'compacto', 'fluxo')
+
+
+def analisar_lexico(fonte, lexico='lista'):
+    """
+    Tokens de `fonte` no formato pedido, todos aceitos pelo Parser.
+
+    Args:
+        fonte: código-fonte; com 'fluxo', também um arquivo aberto ou mmap.
+        lexico (str): 'lista' (lista de Token), 'compacto' (FluxoTokens, em
+            arrays paralelos) ou 'fluxo' (gerador: os tokens são produzidos à
+            medida que o Parser avança e não ficam em memória; não serve para
+            o cache nem para a compilação em duas fases).
+    """
+    if lexico == 'lista':
+        return analisar_codigo(fonte)
+    if lexico == 'compacto':
+        return analisar_codigo_compacto(fonte)
+    if lexico == 'fluxo':
+        return gerar_tokens(fonte)
+    raise ValueError(f"Léxico desconhecido: '{lexico}'. Use um de {', '.join(LEXICOS)}.")
+
+
+def compilar(codigo, estatisticas=None, imprimir=False, nivel_otimizacao=0, registradores=None, cache=None,
+             duas_fases=False, trabalhadores=None, lexico='lista', limite_expansao=None):
+    """
+    Executa as fases léxica e sintática (com geração de TAC) sobre `codigo` e,
+    com `nivel_otimizacao` > 0, otimiza o TAC gerado.
+
+    Args:
+        codigo (str): código-fonte do programa.
+        estatisticas (Estatisticas): instrumentação opcional das fases.
+        imprimir (bool): imprime o código de três endereços ao final.
+        nivel_otimizacao (int): 0 desliga as otimizações (ver otimizacao.otimizador).
+        registradores (int): limite de temporários por função na alocação.
+        cache (CacheFuncoes): cache em disco do TAC das funções (ver
+            sintatico.cache_funcoes); só as funções alteradas são analisadas.
+        duas_fases (bool): pré-declara globais e funções (permitindo chamar
+            funções declaradas depois) e analisa os corpos das funções em
+            `trabalhadores` processos (ver sintatico.duas_fases).
+        lexico (str): formato dos tokens (ver analisar_lexico).
+        limite_expansao (int): com -O2, expande em linha as funções de até
+            tantas instruções (None usa expansao_funcoes.LIMITE_EXPANSAO).
+
+    Returns:
+        Parser: o parser após a análise, com o código intermediário gerado (e
+        otimizado) e o relatório dos passes em `relatorio_otimizacao`.
+    """
+    with fase(estatisticas, 'lexico'):
+        tokens = analisar_lexico(codigo, lexico)
+    if estatisticas is not None and lexico != 'fluxo':
+        # no fluxo, o léxico corre junto com o Parser (ver tokens_consumidos)
+        estatisticas.contadores['tokens_lexados'] = len(tokens)
+
+    parser = Parser(tokens, codigo, estatisticas=estatisticas, cache=cache)
+    with fase(estatisticas, 'sintatico'):
+        if duas_fases:
+            from sintatico.duas_fases import analisar_em_duas_fases
+            analisar_em_duas_fases(parser, trabalhadores, imprimir=imprimir and not nivel_otimizacao)
+        else:
+            parser.analisar(imprimir=imprimir and not nivel_otimizacao)
+    if nivel_otimizacao:
+        otimizar_parser(parser, nivel_otimizacao, estatisticas, registradores, limite_expansao)
+        if imprimir:
+            for linha in listagem(parser.codigo_intermediario):
+                print(linha)
+    return parser
+
+
+def otimizar_parser(parser, nivel, estatisticas=None, registradores=None, limite_expansao=None):
+    """Troca o código intermediário do parser pela versão otimizada."""
+    from otimizacao.otimizador import otimizar
+
+    with fase(estatisticas, 'otimizacao'):
+        codigo, relatorio = otimizar(parser.codigo_intermediario, nivel, registradores, limite_expansao)
+    parser.codigo_intermediario = codigo
+    parser.relatorio_otimizacao = relatorio
+    if estatisticas is not None:
+        estatisticas.contadores['instrucoes_removidas'] = relatorio['total']['instrucoes_removidas']
+        if 'alocar_temporarios' in relatorio:
+            estatisticas.contadores['max_temporarios_vivos'] = relatorio['alocar_temporarios']['max_vivos']
+    return relatorio
+
+
+BACKENDS = ('vm', 'python')
+
+
+def executar(parser, saida=print, estatisticas=None, backend='vm'):
+    """
+    Executa o TAC gerado por `parser` e devolve as variáveis globais.
+
+    Args:
+        backend (str): 'vm' (máquina virtual) ou 'python' (tradução para
+            funções Python compiladas com compile()).
+    """
+    if backend == 'vm':
+        from execucao.maquina_virtual import MaquinaVirtual as Executor
+    elif backend == 'python':
+        from execucao.backend_python import BackendPython as Executor
+    else:
+        raise ValueError(f"Backend desconhecido: '{backend}'. Use um de {', '.join(BACKENDS)}.")
+
+    with fase(estatisticas, 'carga_' + backend):
+        # a máquina virtual executa o TAC endereçado, com os slots do Parser
+        codigo = parser.codigo_enderecado() if backend == 'vm' else parser.codigo_intermediario
+        executor = Executor(codigo, saida=saida)
+    with fase(estatisticas, 'execucao'):
+        return executor.executar()
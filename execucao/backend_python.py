@@ -0,0 +1,575 @@
+"""
+Backend que traduz o código de três endereços para Python e o compila com
+compile()/exec().
+
+Cada funcao/procedimento vira uma função Python e o programa principal vira
+`_principal`. A estrutura de rótulos gerada por `se`/`enquanto` é reconstruída
+como `if`/`else` e `while True` com `break`/`continue`, de modo que o próprio
+avaliador do CPython executa os laços. Quando o fluxo de uma função não pode
+ser reconstruído (saltos que atravessam mais de um laço, por exemplo), ela é
+gerada como um laço de despacho entre blocos básicos, que vale para qualquer
+fluxo.
+
+Os objetos de código de cada função ficam em cache, indexados pelo texto gerado.
+"""
+import hashlib
+import marshal
+import os
+import sys
+from collections import OrderedDict
+
+from execucao.maquina_virtual import formatar_valor, separar_funcoes
+from intermediario.quadruplas import (
+    BINARIAS,
+    DESVIOS,
+    SALTOS,
+    Op,
+    dividir,
+    eh_literal,
+    eh_temporario,
+    valor_literal,
+)
+
+_EXPRESSOES = {
+    Op.SOMA: '{a} + {b}',
+    Op.SUB: '{a} - {b}',
+    Op.MULT: '{a} * {b}',
+    Op.DIV: '_dividir({a}, {b})',
+    Op.IGUAL: '{a} == {b}',
+    Op.DIFERENTE: '{a} != {b}',
+    Op.MENOR: '{a} < {b}',
+    Op.MAIOR: '{a} > {b}',
+    Op.MENORIGUAL: '{a} <= {b}',
+    Op.MAIORIGUAL: '{a} >= {b}',
+    Op.E: '{a} and {b}',
+    Op.OU: '{a} or {b}',
+}
+
+RECUO = '    '
+
+
+def nome_variavel(nome):
+    # prefixo evita colisão com palavras reservadas e nomes do Python
+    return 'v_' + nome
+
+
+def nome_funcao(nome):
+    return 'f_' + nome
+
+
+class _NaoEstruturavel(Exception):
+    pass
+
+
+class CacheCodigo:
+    """
+    Cache de objetos de código, indexado pelo hash do texto-fonte gerado.
+
+    Args:
+        limite (int): quantidade máxima de objetos mantidos em memória (LRU).
+        diretorio (str): se informado, os objetos também são gravados em disco
+            (marshal), para reaproveitamento entre execuções.
+    """
+
+    def __init__(self, limite=256, diretorio=None):
+        self.limite = limite
+        self.diretorio = diretorio
+        self._memoria = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    def _caminho(self, chave):
+        versao = f"{sys.implementation.cache_tag}"
+        return os.path.join(self.diretorio, f"{chave}.{versao}.marshal")
+
+    def obter(self, fonte, nome_arquivo='<tac>'):
+        chave = hashlib.sha256(fonte.encode('utf-8')).hexdigest()
+        codigo = self._memoria.get(chave)
+        if codigo is not None:
+            self._memoria.move_to_end(chave)
+            self.acertos += 1
+            return codigo
+
+        if self.diretorio:
+            try:
+                with open(self._caminho(chave), 'rb') as f:
+                    codigo = marshal.load(f)
+            except (OSError, EOFError, ValueError, TypeError):
+                codigo = None
+
+        if codigo is None:
+            self.falhas += 1
+            codigo = compile(fonte, nome_arquivo, 'exec')
+            if self.diretorio:
+                os.makedirs(self.diretorio, exist_ok=True)
+                with open(self._caminho(chave), 'wb') as f:
+                    marshal.dump(codigo, f)
+        else:
+            self.acertos += 1
+
+        self._memoria[chave] = codigo
+        if len(self._memoria) > self.limite:
+            self._memoria.popitem(last=False)
+        return codigo
+
+
+CACHE_PADRAO = CacheCodigo()
+
+
+class _GeradorFuncao:
+    """Gera o texto Python de uma função a partir do seu corpo em TAC."""
+
+    def __init__(self, funcao, principal):
+        self.funcao = funcao
+        self.principal = principal
+        self.locais = set(funcao.parametros) | set(funcao.locais)
+        self.globais_escritos = set()
+        self.estruturado = True
+
+        # remove os rótulos: cada rótulo passa a apontar para a próxima instrução
+        self.rotulos = {}
+        self.codigo = []
+        for q in funcao.corpo:
+            if q.op == Op.ROTULO:
+                self.rotulos[q.resultado] = len(self.codigo)
+            else:
+                self.codigo.append(q)
+
+        # para cada posição, o índice do último salto para trás que a alcança
+        # e quantos saltos chegam a ela
+        self.ultimo_retorno = {}
+        self.entradas = {}
+        for indice, q in enumerate(self.codigo):
+            if q.op in SALTOS:
+                alvo = self.rotulos[q.resultado]
+                self.entradas[alvo] = self.entradas.get(alvo, 0) + 1
+                if alvo <= indice:
+                    self.ultimo_retorno[alvo] = indice
+
+    # ------------------------------------------------------------------
+    # Operandos e instruções simples
+    # ------------------------------------------------------------------
+    def operando(self, operando):
+        if eh_literal(operando):
+            return repr(valor_literal(operando))
+        return nome_variavel(operando)
+
+    def destino(self, nome):
+        variavel = nome_variavel(nome)
+        if not (eh_temporario(nome) or nome in self.locais):
+            self.globais_escritos.add(variavel)
+        return variavel
+
+    def partes(self, q, params):
+        """
+        (destino, expressão) de uma instrução que não altera o fluxo; o
+        destino é None quando não há atribuição. None para `param`.
+        """
+        op = q.op
+        if op in BINARIAS:
+            expressao = _EXPRESSOES[op].format(a=self.operando(q.arg1), b=self.operando(q.arg2))
+            return self.destino(q.resultado), expressao
+        if op == Op.COPIA:
+            return self.destino(q.resultado), self.operando(q.arg1)
+        if op == Op.ESCREVA:
+            return None, f"_escrever({self.operando(q.arg1)})"
+        if op == Op.PARAM:
+            params.append(self.operando(q.arg1))
+            return None
+        if op == Op.CHAMADA:
+            if len(params) < q.arg2:
+                raise Exception(f"Erro interno: 'call {q.arg1}' sem os {q.arg2} parâmetros empilhados.")
+            args = params[len(params) - q.arg2:]
+            del params[len(params) - q.arg2:]
+            chamada = f"{nome_funcao(q.arg1)}({', '.join(args)})"
+            if q.resultado is None:
+                return None, chamada
+            return self.destino(q.resultado), chamada
+        raise Exception(f"Erro interno: instrução não suportada pelo backend: {q}")
+
+    def simples(self, q, params):
+        """Texto de uma instrução que não altera o fluxo (ou None para `param`)."""
+        partes = self.partes(q, params)
+        if partes is None:
+            return None
+        destino, expressao = partes
+        return f"{destino} = {expressao}" if destino else expressao
+
+    def condicao(self, q, negar=False):
+        texto = self.operando(q.arg1)
+        # `ifFalse` desvia quando a condição é falsa
+        if q.op == Op.SE_NAO:
+            negar = not negar
+        return f"not {texto}" if negar else texto
+
+    # ------------------------------------------------------------------
+    # Reconstrução estruturada
+    # ------------------------------------------------------------------
+    def salto(self, alvo, fim, seguinte, lacos, ultima):
+        """Tradução de um salto para `alvo`; None quando basta seguir o fluxo."""
+        if lacos:
+            cabecalho, saida = lacos[-1]
+            if alvo == cabecalho:
+                return 'continue'
+            if alvo == saida:
+                return 'break'
+        if alvo == seguinte and ultima:
+            return None
+        raise _NaoEstruturavel(alvo)
+
+    def regiao(self, inicio, fim, seguinte, lacos, linhas, nivel, params, ignorar_laco=None):
+        """
+        Emite as instruções de [inicio, fim). Ao terminar a região o fluxo segue
+        para `seguinte`. Devolve True se o fim da região pode ser alcançado.
+        """
+        recuo = RECUO * nivel
+        codigo = self.codigo
+        alcancavel = True
+        i = inicio
+        while i < fim:
+            q = codigo[i]
+
+            # cabeçalho de laço: há um salto para trás que volta a esta posição
+            volta = self.ultimo_retorno.get(i)
+            if volta is not None and i != ignorar_laco:
+                if volta >= fim:
+                    raise _NaoEstruturavel(i)
+                linhas.append(f"{recuo}while True:")
+                antes = len(linhas)
+                cai = self.regiao(i, volta + 1, None, lacos + [(i, volta + 1)],
+                                  linhas, nivel + 1, params, ignorar_laco=i)
+                if cai:
+                    linhas.append(f"{recuo}{RECUO}break")
+                elif linhas[-1].strip() == 'continue' and len(linhas) > antes + 1:
+                    linhas.pop()
+                if len(linhas) == antes:
+                    linhas.append(f"{recuo}{RECUO}pass")
+                alcancavel = True
+                i = volta + 1
+                continue
+
+            if q.op == Op.GOTO:
+                texto = self.salto(self.rotulos[q.resultado], fim, seguinte, lacos, i == fim - 1)
+                if texto:
+                    linhas.append(f"{recuo}{texto}")
+                alcancavel = False
+                i += 1
+                continue
+
+            if q.op in DESVIOS:
+                i, alcancavel = self.desvio(i, fim, seguinte, lacos, linhas, nivel, params)
+                continue
+
+            if q.op == Op.RETORNO:
+                linhas.append(f"{recuo}return {self.operando(q.arg1)}")
+                alcancavel = False
+                i += 1
+                continue
+
+            texto = self.simples(q, params)
+            if texto is not None:
+                linhas.append(f"{recuo}{texto}")
+            alcancavel = True
+            i += 1
+        return alcancavel
+
+    def _alvos(self, i, fim):
+        """(verdadeiro, falso, próxima posição) do desvio em i e do `goto` seguinte, se houver."""
+        codigo = self.codigo
+        verdadeiro = self.rotulos[codigo[i].resultado]
+        if i + 1 < fim and codigo[i + 1].op == Op.GOTO:
+            return verdadeiro, self.rotulos[codigo[i + 1].resultado], i + 2
+        return verdadeiro, i + 1, i + 1
+
+    def cadeia(self, i, fim, params):
+        """
+        Junta ao desvio em i os blocos de condição que vêm logo depois dele
+        (o código de `e`/`ou` em desvios) numa só expressão Python com
+        and/or. O código de cada bloco juntado entra na expressão como
+        atribuições `:=`, na mesma ordem.
+
+        Returns:
+            tuple: (condição de ir para `verdadeiro`, verdadeiro, falso, próxima posição)
+        """
+        codigo = self.codigo
+        texto = self.condicao(codigo[i])
+        verdadeiro, falso, proximo = self._alvos(i, fim)
+        saltos = [verdadeiro] if proximo == i + 1 else [verdadeiro, falso]
+        while proximo in (verdadeiro, falso) and proximo not in self.ultimo_retorno \
+                and self.entradas.get(proximo, 0) == saltos.count(proximo):
+            # o bloco é só o cálculo do operando (com as chamadas, às vezes já
+            # expandidas) até o desvio, sem outras entradas
+            inicio = j = proximo
+            while j < fim and codigo[j].op not in SALTOS and codigo[j].op != Op.RETORNO \
+                    and (j == inicio or j not in self.entradas):
+                j += 1
+            if j >= fim or codigo[j].op not in DESVIOS or (j != inicio and j in self.entradas):
+                break
+            v, f, seguinte = self._alvos(j, fim)
+            if verdadeiro == inicio and falso == f:
+                modelo = '({}) and ({})'
+            elif falso == inicio and verdadeiro == v:
+                modelo = '({}) or ({})'
+            elif verdadeiro == inicio and falso == v:
+                modelo = 'not ({}) or ({})'
+            elif falso == inicio and verdadeiro == f:
+                modelo = 'not ({}) and ({})'
+            else:
+                break
+            partes = []
+            for q in codigo[inicio:j]:
+                par = self.partes(q, params)
+                if par is not None:
+                    destino, expressao = par
+                    partes.append(f"({destino} := {expressao})" if destino else expressao)
+            desvio = codigo[j]
+            condicao = self.condicao(desvio)
+            if len(partes) == 1 and codigo[j - 1].resultado == desvio.arg1 and j > inicio:
+                # `(t := expr)` já vale o que o desvio testa
+                condicao = f"not {partes[0]}" if desvio.op == Op.SE_NAO else partes[0]
+            elif partes:
+                condicao = f"({', '.join(partes)}, {condicao})[-1]"
+            texto = modelo.format(texto, condicao)
+            saltos += [v] if seguinte == j + 1 else [v, f]
+            verdadeiro, falso, proximo = v, f, seguinte
+        return texto, verdadeiro, falso, proximo
+
+    def desvio(self, i, fim, seguinte, lacos, linhas, nivel, params):
+        """Reconstrói um `if`/`ifFalse ... goto` (com o `goto` seguinte, se houver)."""
+        recuo = RECUO * nivel
+        codigo = self.codigo
+        texto_condicao, verdadeiro, falso, proximo = self.cadeia(i, fim, params)
+        sozinho = proximo == self._alvos(i, fim)[2]
+
+        def condicao(negar=False):
+            if sozinho:
+                return self.condicao(codigo[i], negar)
+            return f"not ({texto_condicao})" if negar else texto_condicao
+
+        # desvios para o cabeçalho ou a saída do laço atual
+        if lacos and verdadeiro in lacos[-1]:
+            texto = self.salto(verdadeiro, fim, seguinte, lacos, False)
+            linhas.append(f"{recuo}if {condicao()}: {texto}")
+            if falso == proximo:
+                return proximo, True
+            if sozinho:
+                # sem cadeia: o `goto` seguinte é tratado como um salto comum
+                return i + 1, True
+            texto = self.salto(falso, fim, seguinte, lacos, proximo == fim)
+            if texto:
+                linhas.append(f"{recuo}{texto}")
+            return proximo, False
+        if lacos and falso in lacos[-1]:
+            texto = self.salto(falso, fim, seguinte, lacos, False)
+            linhas.append(f"{recuo}if {condicao(negar=True)}: {texto}")
+            if verdadeiro == proximo:
+                return proximo, True
+            texto = self.salto(verdadeiro, fim, seguinte, lacos, proximo == fim)
+            if texto:
+                linhas.append(f"{recuo}{texto}")
+            return proximo, False
+
+        # alvos iguais ao ponto de continuação equivalem ao fim da região
+        if verdadeiro == seguinte:
+            verdadeiro = fim
+        if falso == seguinte:
+            falso = fim
+
+        primeiro, segundo = sorted((verdadeiro, falso))
+        if primeiro != proximo or segundo > fim or primeiro == segundo:
+            if primeiro == segundo == proximo:
+                return proximo, True
+            raise _NaoEstruturavel(i)
+        negar = primeiro != verdadeiro
+
+        # o bloco [primeiro, segundo) termina com um goto para além de `segundo`:
+        # é um se/senao. Se termina num return, o fim do senao é o alvo dos
+        # saltos de dentro do então que passam de `segundo`.
+        ultimo = segundo - 1
+        destino = None
+        if ultimo >= primeiro and codigo[ultimo].op == Op.GOTO:
+            destino = self.rotulos[codigo[ultimo].resultado]
+        elif ultimo >= primeiro and codigo[ultimo].op == Op.RETORNO:
+            alvos = [fim if self.rotulos[q.resultado] == seguinte else self.rotulos[q.resultado]
+                     for q in codigo[primeiro:ultimo] if q.op in SALTOS]
+            destino = max((alvo for alvo in alvos if segundo < alvo <= fim), default=None)
+            ultimo = segundo
+        if destino is not None:
+            if destino == seguinte:
+                destino = fim
+            if segundo < destino <= fim:
+                linhas.append(f"{recuo}if {condicao(negar)}:")
+                cai_entao = self._bloco(primeiro, ultimo, destino, lacos, linhas, nivel + 1, params)
+                linhas.append(f"{recuo}else:")
+                cai_senao = self._bloco(segundo, destino, destino, lacos, linhas, nivel + 1, params)
+                return destino, cai_entao or cai_senao
+
+        linhas.append(f"{recuo}if {condicao(negar)}:")
+        self._bloco(primeiro, segundo, segundo, lacos, linhas, nivel + 1, params)
+        return segundo, True
+
+    def _bloco(self, inicio, fim, seguinte, lacos, linhas, nivel, params):
+        antes = len(linhas)
+        cai = self.regiao(inicio, fim, seguinte, lacos, linhas, nivel, params)
+        if len(linhas) == antes:
+            linhas.append(f"{RECUO * nivel}pass")
+        return cai
+
+    # ------------------------------------------------------------------
+    # Laço de despacho entre blocos básicos (qualquer fluxo)
+    # ------------------------------------------------------------------
+    def despacho(self, linhas, nivel):
+        codigo = self.codigo
+        lideres = {0}
+        for indice, q in enumerate(codigo):
+            if q.op in SALTOS:
+                lideres.add(self.rotulos[q.resultado])
+                lideres.add(indice + 1)
+            elif q.op == Op.RETORNO:
+                lideres.add(indice + 1)
+        lideres = sorted(l for l in lideres if l < len(codigo))
+        if not lideres:
+            return
+
+        recuo = RECUO * nivel
+        params = []
+        linhas.append(f"{recuo}_b = 0")
+        linhas.append(f"{recuo}while True:")
+        for numero, inicio in enumerate(lideres):
+            fim = lideres[numero + 1] if numero + 1 < len(lideres) else len(codigo)
+            palavra = 'if' if numero == 0 else 'elif'
+            linhas.append(f"{recuo}{RECUO}{palavra} _b == {inicio}:")
+            interno = recuo + RECUO * 2
+            ultimo = codigo[fim - 1]
+            for q in codigo[inicio:fim - 1]:
+                texto = self.simples(q, params)
+                if texto is not None:
+                    linhas.append(f"{interno}{texto}")
+
+            seguinte = self._alvo_despacho(fim)
+            if ultimo.op == Op.GOTO:
+                linhas.append(f"{interno}_b = {self._alvo_despacho(self.rotulos[ultimo.resultado])}")
+            elif ultimo.op in DESVIOS:
+                alvo = self._alvo_despacho(self.rotulos[ultimo.resultado])
+                linhas.append(f"{interno}_b = {alvo} if {self.condicao(ultimo)} else {seguinte}")
+            elif ultimo.op == Op.RETORNO:
+                linhas.append(f"{interno}return {self.operando(ultimo.arg1)}")
+            else:
+                texto = self.simples(ultimo, params)
+                if texto is not None:
+                    linhas.append(f"{interno}{texto}")
+                linhas.append(f"{interno}_b = {seguinte}")
+        linhas.append(f"{recuo}{RECUO}else:")
+        linhas.append(f"{recuo}{RECUO * 2}break")
+
+    def _alvo_despacho(self, posicao):
+        # passar do fim do código encerra o laço de despacho
+        return posicao if posicao < len(self.codigo) else -1
+
+    # ------------------------------------------------------------------
+    def gerar(self):
+        funcao = self.funcao
+        nome = '_principal' if self.principal else nome_funcao(funcao.nome)
+        parametros = ', '.join(nome_variavel(p) for p in funcao.parametros)
+
+        corpo = []
+        try:
+            self.regiao(0, len(self.codigo), len(self.codigo), [], corpo, 1, [])
+        except _NaoEstruturavel:
+            self.estruturado = False
+            corpo = []
+            self.globais_escritos = set()
+            # no despacho os temporários podem ser lidos em blocos diferentes
+            temporarios = sorted({q.resultado for q in self.codigo
+                                  if q.resultado and q.op not in SALTOS and eh_temporario(q.resultado)})
+            for temp in temporarios:
+                corpo.append(f"{RECUO}{nome_variavel(temp)} = 0")
+            self.despacho(corpo, 1)
+
+        linhas = [f"def {nome}({parametros}):"]
+        if self.globais_escritos:
+            linhas.append(f"{RECUO}global {', '.join(sorted(self.globais_escritos))}")
+        for local in funcao.locais:
+            linhas.append(f"{RECUO}{nome_variavel(local)} = 0")
+        linhas += corpo
+        linhas.append(f"{RECUO}return 0")
+        return '\n'.join(linhas) + '\n'
+
+
+class BackendPython:
+    """
+    Compila o TAC de um Parser para funções Python e as executa.
+
+    Args:
+        codigo (list): lista de Quadrupla (Parser.codigo_intermediario).
+        saida: função chamada com o texto de cada `escreva` (padrão: print).
+        cache (CacheCodigo): cache de objetos de código (padrão: cache do módulo).
+        limite_recursao (int): profundidade de pilha do Python durante a execução.
+    """
+
+    def __init__(self, codigo, saida=print, cache=None, limite_recursao=100000):
+        self.saida = saida
+        self.cache = cache if cache is not None else CACHE_PADRAO
+        self.limite_recursao = limite_recursao
+        principal, funcoes = separar_funcoes(codigo)
+
+        self.fontes = {}
+        self.estruturadas = {}
+        for funcao in [*funcoes.values(), principal]:
+            gerador = _GeradorFuncao(funcao, funcao is principal)
+            self.fontes[funcao.nome] = gerador.gerar()
+            self.estruturadas[funcao.nome] = gerador.estruturado
+
+        self.nomes_globais = self._coletar_globais(principal, funcoes)
+        self.namespace = None
+
+    @staticmethod
+    def _coletar_globais(principal, funcoes):
+        nomes = []
+        vistos = set()
+        for funcao in [principal, *funcoes.values()]:
+            locais = set(funcao.parametros) | set(funcao.locais)
+            for q in funcao.corpo:
+                if q.op in (Op.ROTULO, Op.GOTO):
+                    continue
+                if q.op == Op.CHAMADA:
+                    operandos = (q.resultado,)
+                elif q.op in DESVIOS:
+                    operandos = (q.arg1,)
+                else:
+                    operandos = (q.resultado, q.arg1, q.arg2)
+                for operando in operandos:
+                    if (isinstance(operando, str) and operando not in locais and operando not in vistos
+                            and not eh_literal(operando) and not eh_temporario(operando)):
+                        vistos.add(operando)
+                        nomes.append(operando)
+        return nomes
+
+    @property
+    def fonte(self):
+        return '\n'.join(self.fontes.values())
+
+    def _escrever(self, valor):
+        self.saida(formatar_valor(valor))
+
+    def carregar(self):
+        namespace = {'_dividir': dividir, '_escrever': self._escrever}
+        for nome in self.nomes_globais:
+            namespace[nome_variavel(nome)] = 0
+        for nome, fonte in self.fontes.items():
+            exec(self.cache.obter(fonte, f"<tac:{nome}>"), namespace)
+        self.namespace = namespace
+        return namespace
+
+    def executar(self):
+        namespace = self.carregar()
+        limite_anterior = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limite_anterior, self.limite_recursao))
+        try:
+            namespace['_principal']()
+        finally:
+            sys.setrecursionlimit(limite_anterior)
+        return self.valores_globais()
+
+    def valores_globais(self):
+        return {nome: self.namespace[nome_variavel(nome)] for nome in self.nomes_globais}
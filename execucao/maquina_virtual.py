@@ -0,0 +1,273 @@
+"""
+Máquina virtual para o código de três endereços gerado pelo Parser.
+
+A máquina executa o TAC endereçado (intermediario.enderecamento): rótulos já
+resolvidos para índices de instrução e cada operando já um slot do quadro da
+função, um slot da área global ou uma constante. Antes de executar, cada
+função é "carregada": cada instrução vira uma closure especializada para a sua
+operação e para o tipo dos seus operandos, escolhida em uma tabela de
+fábricas.
+
+O laço principal apenas chama `pc = codigo[pc](quadro)`: não há interpretação
+de texto nem buscas em dicionário durante a execução.
+"""
+import sys
+
+from intermediario.enderecamento import (
+    CONSTANTE,
+    GLOBAL,
+    QUADRO,
+    SLOT_RETORNO,
+    ProgramaEnderecado,
+    enderecar,
+    verificar_aninhamento,
+)
+from intermediario.quadruplas import BINARIAS, Op, dividir, literal
+
+FIM = -1
+
+# Expressão Python de cada operação binária; {a} e {b} são os operandos
+_EXPRESSOES = {
+    Op.SOMA: '{a} + {b}',
+    Op.SUB: '{a} - {b}',
+    Op.MULT: '{a} * {b}',
+    Op.DIV: '_dividir({a}, {b})',
+    Op.IGUAL: '{a} == {b}',
+    Op.DIFERENTE: '{a} != {b}',
+    Op.MENOR: '{a} < {b}',
+    Op.MAIOR: '{a} > {b}',
+    Op.MENORIGUAL: '{a} <= {b}',
+    Op.MAIORIGUAL: '{a} >= {b}',
+    Op.E: '{a} and {b}',
+    Op.OU: '{a} or {b}',
+}
+
+# Acesso a cada tipo de operando: slot do quadro, slot global ou constante já convertida
+_ACESSO = {QUADRO: 'q[{}]', GLOBAL: 'g[{}]', CONSTANTE: '{}'}
+
+
+def _acesso(nome, tipo):
+    return _ACESSO[tipo].format(nome)
+
+
+class _Fabricas:
+    """
+    Tabela de fábricas de closures, indexada por (operação, tipos dos operandos).
+    Cada fábrica é gerada uma única vez, no primeiro uso.
+    """
+
+    def __init__(self):
+        self._cache = {}
+
+    def obter(self, chave, corpo, assinatura):
+        fabrica = self._cache.get(chave)
+        if fabrica is None:
+            fonte = (
+                f"def fabrica({assinatura}):\n"
+                f"    def h(q):\n"
+                + ''.join(f"        {linha}\n" for linha in corpo)
+                + "    return h\n"
+            )
+            escopo = {'_dividir': dividir}
+            exec(fonte, escopo)
+            fabrica = self._cache[chave] = escopo['fabrica']
+        return fabrica
+
+
+_FABRICAS = _Fabricas()
+
+
+class FuncaoCarregada:
+    __slots__ = ('nome', 'parametros', 'locais', 'corpo', 'modelo', 'codigo', 'slots_parametros')
+
+    def __init__(self, nome, parametros=(), locais=()):
+        self.nome = nome
+        self.parametros = tuple(parametros)
+        self.locais = tuple(locais)
+        self.corpo = []
+        self.modelo = None
+        self.codigo = None
+        self.slots_parametros = ()
+
+    def __repr__(self):
+        return f"FuncaoCarregada({self.nome}, {len(self.codigo or ())} instruções)"
+
+
+def separar_funcoes(codigo):
+    """
+    Separa o TAC em corpo principal e funções (inclusive aninhadas), usando as
+    marcas FUNCAO/FIM_FUNCAO.
+
+    Returns:
+        tuple: (FuncaoCarregada do programa principal, dict nome -> FuncaoCarregada)
+    """
+    verificar_aninhamento(codigo)
+    principal = FuncaoCarregada('<principal>')
+    funcoes = {}
+    pilha = [principal]
+    for q in codigo:
+        if q.op == Op.FUNCAO:
+            funcao = FuncaoCarregada(q.resultado, q.arg1, q.arg2)
+            funcoes[q.resultado] = funcao
+            pilha.append(funcao)
+        elif q.op == Op.FIM_FUNCAO:
+            pilha.pop()
+        else:
+            pilha[-1].corpo.append(q)
+    return principal, funcoes
+
+
+def formatar_valor(valor):
+    if valor is True or valor is False:
+        return literal(valor)
+    return str(valor)
+
+
+class MaquinaVirtual:
+    """
+    Executa o TAC de um Parser.
+
+    Args:
+        codigo: lista de Quadrupla (Parser.codigo_intermediario) ou o
+            ProgramaEnderecado correspondente (Parser.codigo_enderecado()).
+        saida: função chamada com o texto de cada `escreva` (padrão: print).
+        limite_recursao (int): profundidade de pilha do Python durante a execução.
+    """
+
+    def __init__(self, codigo, saida=print, limite_recursao=100000):
+        self.saida = saida
+        self.limite_recursao = limite_recursao
+        self.programa = codigo if isinstance(codigo, ProgramaEnderecado) else enderecar(codigo)
+        self.globais = [0] * len(self.programa.globais)
+        self.pendentes = []  # argumentos empilhados por `param`
+        self.principal = self._preparar(self.programa.principal)
+        self.funcoes = [self._preparar(funcao) for funcao in self.programa.funcoes]
+        # as funções chamadas precisam existir antes de compilar as chamadas
+        for funcao in [self.principal, *self.funcoes]:
+            self._carregar(funcao)
+
+    # ------------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------------
+    def _operando(self, operando):
+        tipo, indice = operando
+        if tipo == CONSTANTE:
+            return CONSTANTE, self.programa.constantes[indice]
+        return operando
+
+    @staticmethod
+    def _preparar(enderecada):
+        funcao = FuncaoCarregada(enderecada.nome, enderecada.parametros, enderecada.locais)
+        funcao.corpo = enderecada.codigo
+        funcao.slots_parametros = enderecada.slots_parametros
+        funcao.modelo = [0] * len(enderecada.nomes)
+        return funcao
+
+    def _carregar(self, funcao):
+        codigo = []
+        for indice, q in enumerate(funcao.corpo):
+            codigo.append(self._compilar_instrucao(q, indice + 1))
+        # ao passar do fim, a função retorna (valor padrão no slot de retorno)
+        codigo.append(lambda q: FIM)
+        funcao.codigo = codigo
+
+    def _compilar_instrucao(self, q, proximo):
+        op = q.op
+        g = self.globais
+
+        if op == Op.GOTO:
+            alvo = q.resultado
+            return lambda quadro: alvo
+
+        if op == Op.CHAMADA:
+            return self._compilar_chamada(q, proximo)
+
+        if op in BINARIAS:
+            td, d = self._operando(q.resultado)
+            ta, a = self._operando(q.arg1)
+            tb, b = self._operando(q.arg2)
+            expressao = _EXPRESSOES[op].format(a=_acesso('a', ta), b=_acesso('b', tb))
+            corpo = (f"{_acesso('d', td)} = {expressao}", "return p")
+            return _FABRICAS.obter((op, td, ta, tb), corpo, 'd, a, b, g, p')(d, a, b, g, proximo)
+
+        if op == Op.COPIA:
+            td, d = self._operando(q.resultado)
+            ta, a = self._operando(q.arg1)
+            corpo = (f"{_acesso('d', td)} = {_acesso('a', ta)}", "return p")
+            return _FABRICAS.obter((op, td, ta), corpo, 'd, a, g, p')(d, a, g, proximo)
+
+        ta, a = self._operando(q.arg1)
+        valor = _acesso('a', ta)
+        if op == Op.SE:
+            corpo = (f"return t if {valor} else p",)
+            return _FABRICAS.obter((op, ta), corpo, 'a, g, t, p')(a, g, q.resultado, proximo)
+        if op == Op.SE_NAO:
+            corpo = (f"return p if {valor} else t",)
+            return _FABRICAS.obter((op, ta), corpo, 'a, g, t, p')(a, g, q.resultado, proximo)
+        if op == Op.PARAM:
+            corpo = (f"empilhar({valor})", "return p")
+            return _FABRICAS.obter((op, ta), corpo, 'a, g, empilhar, p')(a, g, self.pendentes.append, proximo)
+        if op == Op.RETORNO:
+            corpo = (f"q[{SLOT_RETORNO}] = {valor}", f"return {FIM}")
+            return _FABRICAS.obter((op, ta), corpo, 'a, g')(a, g)
+        if op == Op.ESCREVA:
+            corpo = (f"escrever({valor})", "return p")
+            return _FABRICAS.obter((op, ta), corpo, 'a, g, escrever, p')(a, g, self._escrever, proximo)
+
+        raise Exception(f"Erro de execução: instrução não suportada: {q}")
+
+    def _compilar_chamada(self, q, proximo):
+        chamada = self.funcoes[q.arg1]
+        if q.arg2 != len(chamada.parametros):
+            raise Exception(f"Erro de execução: '{chamada.nome}' espera {len(chamada.parametros)} argumentos, recebeu {q.arg2}.")
+
+        # o quadro novo é preenchido desempilhando os argumentos, do último ao
+        # primeiro, e a função chamada roda no próprio laço da closure
+        corpo = [
+            "novo = f.modelo[:]",
+            "for s in slots:",
+            "    novo[s] = desempilhar()",
+            "codigo = f.codigo",
+            "pc = 0",
+            "while pc >= 0:",
+            "    pc = codigo[pc](novo)",
+        ]
+        if q.resultado is None:
+            td, d = None, None
+        else:
+            td, d = self._operando(q.resultado)
+            corpo.append(f"{_acesso('d', td)} = novo[{SLOT_RETORNO}]")
+        corpo.append("return p")
+        fabrica = _FABRICAS.obter((Op.CHAMADA, td), corpo, 'f, slots, desempilhar, d, g, p')
+        slots = tuple(reversed(chamada.slots_parametros))
+        return fabrica(chamada, slots, self.pendentes.pop, d, self.globais, proximo)
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+    def _escrever(self, valor):
+        self.saida(formatar_valor(valor))
+
+    def _chamar(self, funcao, args=()):
+        quadro = funcao.modelo[:]
+        for slot, valor in zip(funcao.slots_parametros, args):
+            quadro[slot] = valor
+        codigo = funcao.codigo
+        pc = 0
+        while pc >= 0:
+            pc = codigo[pc](quadro)
+        return quadro[SLOT_RETORNO]
+
+    def executar(self):
+        limite_anterior = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limite_anterior, self.limite_recursao))
+        try:
+            self._chamar(self.principal)
+        finally:
+            sys.setrecursionlimit(limite_anterior)
+        return self.valores_globais()
+
+    def valores_globais(self):
+        nomes = self.programa.globais
+        return {nomes[slot]: self.globais[slot] for slot in self.programa.globais_usadas}
+
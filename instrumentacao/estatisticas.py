@@ -0,0 +1,121 @@
+"""
+Instrumentação do pipeline de compilação.
+
+Estatisticas acumula, por fase, o tempo de parede e o pico de memória
+(tracemalloc), além de contadores do compilador: tokens lexados e consumidos, buscas na
+tabela de símbolos e escopos percorridos, temporários e rótulos alocados e
+linhas de TAC emitidas.
+"""
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class Estatisticas:
+    """
+    Args:
+        medir_memoria (bool): mede o pico de memória de cada fase com tracemalloc.
+        ganchos (list): funções chamadas como gancho(nome_fase, medidas) ao fim de cada fase.
+    """
+
+    def __init__(self, medir_memoria=True, ganchos=None):
+        self.medir_memoria = medir_memoria
+        self.ganchos = list(ganchos or [])
+        self.fases = {}
+        self.contadores = {
+            'tokens_lexados': 0,
+            'tokens_consumidos': 0,
+            'buscas_simbolos': 0,
+            'escopos_percorridos': 0,
+            'profundidade_max_escopo': 0,
+            'temporarios': 0,
+            'rotulos': 0,
+            'linhas_tac': 0,
+        }
+
+    @contextmanager
+    def fase(self, nome):
+        iniciou_tracemalloc = False
+        if self.medir_memoria:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                iniciou_tracemalloc = True
+        inicio = time.perf_counter()
+        try:
+            yield self
+        finally:
+            medidas = self.fases.setdefault(nome, {'segundos': 0.0})
+            medidas['segundos'] += time.perf_counter() - inicio
+            if self.medir_memoria:
+                pico = tracemalloc.get_traced_memory()[1]
+                medidas['pico_memoria_bytes'] = max(pico, medidas.get('pico_memoria_bytes', 0))
+                if iniciou_tracemalloc:
+                    tracemalloc.stop()
+            for gancho in self.ganchos:
+                gancho(nome, medidas)
+
+    def contar(self, contador, quantidade=1):
+        self.contadores[contador] = self.contadores.get(contador, 0) + quantidade
+
+    def registrar_busca(self, profundidade):
+        contadores = self.contadores
+        contadores['buscas_simbolos'] += 1
+        contadores['escopos_percorridos'] += profundidade
+        if profundidade > contadores['profundidade_max_escopo']:
+            contadores['profundidade_max_escopo'] = profundidade
+
+    def registrar_parser(self, parser):
+        self.contadores['tokens_consumidos'] = parser.pos
+        self.contadores['temporarios'] = parser.temp_count
+        self.contadores['rotulos'] = parser.label_count
+        self.contadores['linhas_tac'] = len(parser.codigo_intermediario)
+        if parser.cache is not None:
+            self.contadores['cache_acertos'] = parser.cache.acertos
+            self.contadores['cache_falhas'] = parser.cache.falhas
+
+    def como_dict(self):
+        return {'fases': self.fases, 'contadores': self.contadores}
+
+    def relatorio(self):
+        linhas = ["Estatísticas de compilação:"]
+        total = 0.0
+        for nome, medidas in self.fases.items():
+            total += medidas['segundos']
+            texto = f"  {nome:<14} {medidas['segundos'] * 1000:10.2f} ms"
+            if 'pico_memoria_bytes' in medidas:
+                texto += f"  pico {medidas['pico_memoria_bytes'] / 1024:10.1f} KB"
+            linhas.append(texto)
+        linhas.append(f"  {'total':<14} {total * 1000:10.2f} ms")
+        linhas.append("Contadores:")
+        for nome, valor in self.contadores.items():
+            linhas.append(f"  {nome:<24} {valor}")
+        buscas = self.contadores['buscas_simbolos']
+        if buscas:
+            media = self.contadores['escopos_percorridos'] / buscas
+            linhas.append(f"  {'escopos_por_busca':<24} {media:.2f}")
+        return '\n'.join(linhas)
+
+
+@contextmanager
+def perfilar(caminho=None, limite=25, saida=None):
+    """
+    Executa o bloco sob cProfile. Grava as estatísticas brutas em `caminho`
+    (legíveis com pstats/snakeviz) e escreve as `limite` funções mais caras em `saida`.
+    """
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield perfil
+    finally:
+        perfil.disable()
+        if caminho:
+            perfil.dump_stats(caminho)
+        if saida is not None:
+            texto = io.StringIO()
+            pstats.Stats(perfil, stream=texto).sort_stats('cumulative').print_stats(limite)
+            saida.write(texto.getvalue())
@@ -0,0 +1,225 @@
+"""
+TAC endereçado: o código de três endereços com os nomes já resolvidos.
+
+Cada operando vira um par (tipo, índice):
+- (QUADRO, s): slot s do quadro da função. O slot 0 guarda o valor de
+  retorno; depois vêm os parâmetros, as variáveis locais (na ordem dos slots
+  que o Parser atribuiu) e os temporários;
+- (GLOBAL, s): slot s da área global, na ordem de declaração das globais;
+- (CONSTANTE, k): entrada k de ProgramaEnderecado.constantes, já convertida
+  para int ou bool.
+Os rótulos somem: os desvios guardam o índice da instrução de destino. A
+chamada guarda o índice da função em ProgramaEnderecado.funcoes.
+
+Os nomes continuam em cada função e no programa, para a listagem.
+"""
+from intermediario.quadruplas import BINARIAS, Op, Quadrupla, SALTOS, eh_literal, eh_temporario, formatar, literal, valor_literal
+
+QUADRO, GLOBAL, CONSTANTE = 'q', 'g', 'c'
+
+# Slot do quadro que guarda o valor de retorno da função
+SLOT_RETORNO = 0
+
+
+class FuncaoEnderecada:
+    __slots__ = ('nome', 'parametros', 'locais', 'nomes', 'codigo')
+
+    def __init__(self, nome, parametros=(), locais=()):
+        self.nome = nome
+        self.parametros = tuple(parametros)
+        self.locais = tuple(locais)
+        # nome de cada slot do quadro
+        self.nomes = ['<retorno>', *self.parametros, *self.locais]
+        self.codigo = []
+
+    @property
+    def slots_parametros(self):
+        return tuple(range(SLOT_RETORNO + 1, SLOT_RETORNO + 1 + len(self.parametros)))
+
+    def __repr__(self):
+        return f"FuncaoEnderecada({self.nome}, {len(self.nomes)} slots, {len(self.codigo)} instruções)"
+
+
+class ProgramaEnderecado:
+    """
+    Atributos:
+        principal (FuncaoEnderecada): o corpo do programa.
+        funcoes (list): as funções e procedimentos, na ordem do código.
+        globais (list): nome de cada slot global.
+        globais_usadas (list): slots globais que o código lê ou escreve, na
+            ordem em que aparecem.
+        constantes (list): valores das constantes.
+    """
+    __slots__ = ('principal', 'funcoes', 'globais', 'globais_usadas', 'constantes')
+
+    def __init__(self):
+        self.principal = None
+        self.funcoes = []
+        self.globais = []
+        self.globais_usadas = []
+        self.constantes = []
+
+
+class _Enderecador:
+    def __init__(self, programa, globais):
+        self.programa = programa
+        self.slots_globais = {}
+        for nome in globais:
+            self._slot_global(nome)
+        self.usadas = set()
+        self.constantes = {}  # texto do literal -> índice
+
+    def _slot_global(self, nome):
+        slot = self.slots_globais.get(nome)
+        if slot is None:
+            slot = self.slots_globais[nome] = len(self.programa.globais)
+            self.programa.globais.append(nome)
+        return slot
+
+    def operando(self, slots, funcao, operando):
+        if operando is None:
+            return None
+        slot = slots.get(operando)
+        if slot is not None:
+            return QUADRO, slot
+        if eh_literal(operando):
+            indice = self.constantes.get(operando)
+            if indice is None:
+                indice = self.constantes[operando] = len(self.programa.constantes)
+                self.programa.constantes.append(valor_literal(operando))
+            return CONSTANTE, indice
+        if eh_temporario(operando):
+            slot = slots[operando] = len(funcao.nomes)
+            funcao.nomes.append(operando)
+            return QUADRO, slot
+        slot = self._slot_global(operando)
+        if slot not in self.usadas:
+            self.usadas.add(slot)
+            self.programa.globais_usadas.append(slot)
+        return GLOBAL, slot
+
+    def enderecar(self, funcao, corpo, indices_funcoes):
+        slots = {nome: slot for slot, nome in enumerate(funcao.nomes) if slot != SLOT_RETORNO}
+        # rótulo -> índice da próxima instrução
+        rotulos = {}
+        instrucoes = []
+        for q in corpo:
+            if q.op == Op.ROTULO:
+                rotulos[q.resultado] = len(instrucoes)
+            else:
+                instrucoes.append(q)
+
+        for q in instrucoes:
+            op = q.op
+            if op in SALTOS:
+                novo = Quadrupla(op, rotulos[q.resultado], self.operando(slots, funcao, q.arg1))
+            elif op == Op.CHAMADA:
+                indice = indices_funcoes.get(q.arg1)
+                if indice is None:
+                    raise Exception(f"Erro interno: chamada à função '{q.arg1}', que não está no código.")
+                novo = Quadrupla(op, self.operando(slots, funcao, q.resultado), indice, q.arg2)
+            elif op in BINARIAS or op == Op.COPIA:
+                novo = Quadrupla(op, self.operando(slots, funcao, q.resultado),
+                                 self.operando(slots, funcao, q.arg1), self.operando(slots, funcao, q.arg2))
+            else:
+                novo = Quadrupla(op, None, self.operando(slots, funcao, q.arg1))
+            funcao.codigo.append(novo)
+
+
+def _variaveis(q):
+    """Nomes de variáveis e temporários lidos ou escritos pela instrução."""
+    op = q.op
+    if op in BINARIAS:
+        operandos = (q.resultado, q.arg1, q.arg2)
+    elif op in (Op.COPIA, Op.CHAMADA):
+        operandos = (q.resultado, q.arg1 if op == Op.COPIA else None)
+    elif op in (Op.ESCREVA, Op.PARAM, Op.RETORNO, Op.SE, Op.SE_NAO):
+        operandos = (q.arg1,)
+    else:
+        operandos = ()
+    return [o for o in operandos if isinstance(o, str) and not eh_literal(o)]
+
+
+def verificar_aninhamento(codigo):
+    """
+    Rejeita o código em que uma função aninhada usa um parâmetro ou uma
+    variável local de uma função que a contém. O quadro de uma função não tem
+    elo de acesso ao da função de fora (e a otimização trata esses nomes como
+    locais da função de fora, que uma chamada não altera), então o nome
+    acabaria num slot global.
+    """
+    pilha = []  # (nome da função, nomes do seu quadro)
+    for q in codigo:
+        if q.op == Op.FUNCAO:
+            pilha.append((q.resultado, frozenset(q.arg1) | frozenset(q.arg2)))
+        elif q.op == Op.FIM_FUNCAO:
+            pilha.pop()
+        elif len(pilha) > 1:
+            funcao, proprios = pilha[-1]
+            for nome in _variaveis(q):
+                if nome in proprios or eh_temporario(nome):
+                    continue
+                for externa, nomes in reversed(pilha[:-1]):
+                    if nome in nomes:
+                        raise Exception(f"Erro semântico: a função aninhada '{funcao}' usa '{nome}', local de '{externa}'; "
+                                        f"a execução e a otimização não dão acesso às variáveis da função de fora.")
+
+
+def enderecar(codigo, globais=()):
+    """
+    Args:
+        codigo (list): lista de Quadrupla.
+        globais (iterable): nomes das variáveis globais na ordem dos slots
+            (Parser.slots_globais()); as demais globais que aparecerem no
+            código recebem os slots seguintes.
+
+    Returns:
+        ProgramaEnderecado
+    """
+    verificar_aninhamento(codigo)
+    programa = ProgramaEnderecado()
+    programa.principal = FuncaoEnderecada('<principal>')
+    corpos = {programa.principal: []}
+    pilha = [programa.principal]
+    for q in codigo:
+        if q.op == Op.FUNCAO:
+            funcao = FuncaoEnderecada(q.resultado, q.arg1, q.arg2)
+            programa.funcoes.append(funcao)
+            corpos[funcao] = []
+            pilha.append(funcao)
+        elif q.op == Op.FIM_FUNCAO:
+            pilha.pop()
+        else:
+            corpos[pilha[-1]].append(q)
+
+    indices_funcoes = {funcao.nome: indice for indice, funcao in enumerate(programa.funcoes)}
+    enderecador = _Enderecador(programa, globais)
+    for funcao, corpo in corpos.items():
+        enderecador.enderecar(funcao, corpo, indices_funcoes)
+    return programa
+
+
+def listagem_enderecada(programa):
+    """Texto do TAC endereçado, com os nomes no lugar dos slots e o índice de cada instrução."""
+    def nome(funcao, operando):
+        if operando is None:
+            return None
+        tipo, indice = operando
+        if tipo == QUADRO:
+            return funcao.nomes[indice]
+        if tipo == GLOBAL:
+            return programa.globais[indice]
+        return literal(programa.constantes[indice])
+
+    linhas = []
+    for funcao in [*programa.funcoes, programa.principal]:
+        linhas.append(f"{funcao.nome}: {len(funcao.nomes)} slots")
+        for indice, q in enumerate(funcao.codigo):
+            if q.op in SALTOS:
+                texto = Quadrupla(q.op, q.resultado, nome(funcao, q.arg1))
+            elif q.op == Op.CHAMADA:
+                texto = Quadrupla(q.op, nome(funcao, q.resultado), programa.funcoes[q.arg1].nome, q.arg2)
+            else:
+                texto = Quadrupla(q.op, nome(funcao, q.resultado), nome(funcao, q.arg1), nome(funcao, q.arg2))
+            linhas.append(f"  {indice:4}  {formatar(texto)}")
+    return linhas
@@ -0,0 +1,199 @@
+"""
+Representação estruturada do código de três endereços (TAC).
+
+Cada instrução é uma Quadrupla (op, resultado, arg1, arg2) com __slots__. Os
+operandos são os mesmos textos usados pelo Parser (nomes de variáveis,
+temporários _tN, rótulos Lk e literais); o texto da listagem só é montado
+quando pedido, por formatar().
+
+Cada `funcao`/`procedimento` fica entre as marcas FUNCAO e FIM_FUNCAO. A marca
+FUNCAO guarda os nomes dos parâmetros (arg1) e das variáveis locais (arg2);
+temporários (_tN) são sempre locais à função em que aparecem.
+"""
+import operator
+import re
+from enum import IntEnum
+
+
+class Op(IntEnum):
+    COPIA = 0        # resultado := arg1
+    SOMA = 1         # resultado := arg1 + arg2
+    SUB = 2
+    MULT = 3
+    DIV = 4
+    IGUAL = 5
+    DIFERENTE = 6
+    MENOR = 7
+    MAIOR = 8
+    MENORIGUAL = 9
+    MAIORIGUAL = 10
+    E = 11           # resultado := arg1 && arg2
+    OU = 12
+    ESCREVA = 13     # escreva(arg1)
+    PARAM = 14       # param arg1
+    CHAMADA = 15     # resultado := call arg1, arg2
+    RETORNO = 16     # return arg1
+    SE = 17          # if arg1 goto resultado
+    GOTO = 18        # goto resultado
+    ROTULO = 19      # resultado:
+    FUNCAO = 20      # início de funcao/procedimento `resultado`
+    FIM_FUNCAO = 21  # fim de funcao/procedimento `resultado`
+    SE_NAO = 22      # ifFalse arg1 goto resultado
+
+
+# Símbolo de cada operação binária, na mesma grafia da listagem textual
+SIMBOLOS = {
+    Op.SOMA: '+',
+    Op.SUB: '-',
+    Op.MULT: '*',
+    Op.DIV: '/',
+    Op.IGUAL: '==',
+    Op.DIFERENTE: '!=',
+    Op.MENOR: '<',
+    Op.MAIOR: '>',
+    Op.MENORIGUAL: '<=',
+    Op.MAIORIGUAL: '>=',
+    Op.E: '&&',
+    Op.OU: '||',
+}
+
+# Tipo de token do léxico -> operação
+OPERADORES_BINARIOS = {
+    'SOMA': Op.SOMA,
+    'SUB': Op.SUB,
+    'MULT': Op.MULT,
+    'DIV': Op.DIV,
+    'IGUAL': Op.IGUAL,
+    'DIFERENTE': Op.DIFERENTE,
+    'MENOR': Op.MENOR,
+    'MAIOR': Op.MAIOR,
+    'MENORIGUAL': Op.MENORIGUAL,
+    'MAIORIGUAL': Op.MAIORIGUAL,
+    'AND': Op.E,
+    'OR': Op.OU,
+}
+
+BINARIAS = frozenset(SIMBOLOS)
+# && e || não entram: `0 || falso` é falso, mas `falso || 0` é 0
+COMUTATIVAS = frozenset((Op.SOMA, Op.MULT, Op.IGUAL, Op.DIFERENTE))
+DESVIOS = frozenset((Op.SE, Op.SE_NAO))
+SALTOS = DESVIOS | {Op.GOTO}
+
+
+class Quadrupla:
+    __slots__ = ('op', 'resultado', 'arg1', 'arg2')
+
+    def __init__(self, op, resultado=None, arg1=None, arg2=None):
+        self.op = op
+        self.resultado = resultado
+        self.arg1 = arg1
+        self.arg2 = arg2
+
+    def __str__(self):
+        return formatar(self)
+
+    def __repr__(self):
+        return f"Quadrupla({self.op.name}, {self.resultado!r}, {self.arg1!r}, {self.arg2!r})"
+
+    def __eq__(self, outra):
+        if not isinstance(outra, Quadrupla):
+            return NotImplemented
+        return (self.op, self.resultado, self.arg1, self.arg2) == (outra.op, outra.resultado, outra.arg1, outra.arg2)
+
+    __hash__ = None
+
+
+def _formatar_binaria(q):
+    return f"{q.resultado} := {q.arg1} {SIMBOLOS[q.op]} {q.arg2}"
+
+
+def _formatar_chamada(q):
+    if q.resultado is None:
+        return f"call {q.arg1}, {q.arg2}"
+    return f"{q.resultado} := call {q.arg1}, {q.arg2}"
+
+
+_FORMATOS = {
+    Op.COPIA: lambda q: f"{q.resultado} := {q.arg1}",
+    Op.ESCREVA: lambda q: f"escreva({q.arg1})",
+    Op.PARAM: lambda q: f"param {q.arg1}",
+    Op.CHAMADA: _formatar_chamada,
+    Op.RETORNO: lambda q: f"return {q.arg1}",
+    Op.SE: lambda q: f"if {q.arg1} goto {q.resultado}",
+    Op.SE_NAO: lambda q: f"ifFalse {q.arg1} goto {q.resultado}",
+    Op.GOTO: lambda q: f"goto {q.resultado}",
+    Op.ROTULO: lambda q: f"{q.resultado}:",
+    Op.FUNCAO: lambda q: f"funcao {q.resultado}({', '.join(q.arg1)}):",
+    Op.FIM_FUNCAO: lambda q: f"fim_funcao {q.resultado}",
+}
+for _op in BINARIAS:
+    _FORMATOS[_op] = _formatar_binaria
+
+
+def formatar(quadrupla):
+    return _FORMATOS[quadrupla.op](quadrupla)
+
+
+def listagem(codigo):
+    """Texto do código de três endereços, uma instrução por linha."""
+    return [_FORMATOS[q.op](q) for q in codigo]
+
+
+# Semântica das operações e dos literais, compartilhada por quem executa ou
+# avalia o TAC (máquina virtual, otimizações).
+LITERAIS_BOOLEANOS = {'verdadeiro': True, 'falso': False}
+
+
+def dividir(a, b):
+    # divisão inteira truncada em direção a zero
+    if b == 0:
+        raise Exception("Erro de execução: divisão por zero.")
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+OPERACOES = {
+    Op.SOMA: operator.add,
+    Op.SUB: operator.sub,
+    Op.MULT: operator.mul,
+    Op.DIV: dividir,
+    Op.IGUAL: operator.eq,
+    Op.DIFERENTE: operator.ne,
+    Op.MENOR: operator.lt,
+    Op.MAIOR: operator.gt,
+    Op.MENORIGUAL: operator.le,
+    Op.MAIORIGUAL: operator.ge,
+    Op.E: lambda a, b: a and b,
+    Op.OU: lambda a, b: a or b,
+}
+
+
+PREFIXO_TEMPORARIO = '_t'
+
+# Temporários do Parser (_tN) e a memória de derramamento da alocação (_tmN);
+# o parser não aceita declarações com essa forma
+_TEMPORARIO = re.compile(r'_tm?\d+').fullmatch
+
+
+def eh_temporario(operando):
+    return _TEMPORARIO(operando) is not None
+
+
+def eh_literal(operando):
+    if operando in LITERAIS_BOOLEANOS:
+        return True
+    return operando.lstrip('-').isdigit()
+
+
+def valor_literal(operando):
+    if operando in LITERAIS_BOOLEANOS:
+        return LITERAIS_BOOLEANOS[operando]
+    return int(operando)
+
+
+def literal(valor):
+    if valor is True:
+        return 'verdadeiro'
+    if valor is False:
+        return 'falso'
+    return str(valor)
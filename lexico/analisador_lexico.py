@@ -1,9 +1,17 @@
+import bisect
+import codecs
+import mmap
 import re
+import sys
+from array import array
 
 class Token:
-    def __init__(self, tipo, lexema):
+    __slots__ = ('tipo', 'lexema', 'inicio')
+
+    def __init__(self, tipo, lexema, inicio=None):
         self.tipo = tipo
         self.lexema = lexema
+        self.inicio = inicio  # deslocamento do token no código-fonte, se conhecido
     def __repr__(self):
         return f"Token({self.tipo}, {self.lexema})"
 
@@ -52,47 +60,262 @@ PADROES = [
     ('DOISPONTOS', r':'),
 ]
 
-def analisar_codigo(codigo):
+# Padrão mestre: um único regex pré-compilado com um grupo nomeado por classe
+# de token. A ordem das alternativas reproduz a prioridade da varredura
+# original (espaços, números, identificadores e depois PADROES na ordem).
+def _construir_padrao_mestre():
+    partes = [
+        r'(?P<ESPACO>\s+)',
+        r'(?P<NUMERO>\d+)',
+        r'(?P<ID>[a-zA-Z_][a-zA-Z0-9_]*)',
+    ]
+    partes += [f'(?P<{tipo}>{padrao})' for tipo, padrao in PADROES]
+    return re.compile('|'.join(partes))
+
+PADRAO_MESTRE = _construir_padrao_mestre()
+
+def analisar_codigo(codigo, inicio=0, fim=None):
+    # inicio/fim: trecho do código a analisar; os tokens guardam a posição no código inteiro
     tokens = []
+    pos = inicio
+    tamanho = len(codigo) if fim is None else fim
+    casar = PADRAO_MESTRE.match
+    reservadas = PALAVRAS_RESERVADAS
+    intern = sys.intern
+
+    while pos < tamanho:
+        # match(codigo, pos) não copia o restante do código a cada token
+        match = casar(codigo, pos, tamanho)
+        if match is None:
+            raise SyntaxError(f"Caractere inválido na posição {pos}: '{codigo[pos]}'")
+
+        tipo = match.lastgroup
+        fim = match.end()
+        if tipo != 'ESPACO':
+            # lexemas internados: nomes repetidos são o mesmo objeto, e as
+            # buscas por nome comparam identidade antes do texto
+            lexema = intern(codigo[pos:fim])
+            if tipo == 'ID':
+                tipo = reservadas.get(lexema, 'ID')
+            tokens.append(Token(tipo, lexema, pos))
+        pos = fim
+
+    tokens.append(Token('EOF', 'EOF', tamanho))
+    return tokens
+
+
+
+# Representação compacta: em vez de um objeto por token, o fluxo guarda
+# códigos inteiros de tipo e os deslocamentos de início/fim em arrays. Os
+# lexemas são fatiados do código-fonte apenas quando pedidos.
+TIPOS_TOKEN = (
+    ['NUMERO', 'ID', 'EOF']
+    + sorted(set(PALAVRAS_RESERVADAS.values()))
+    + [tipo for tipo, _ in PADROES]
+)
+CODIGOS_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS_TOKEN)}
+CODIGO_EOF = CODIGOS_TIPO['EOF']
+CODIGO_ID = CODIGOS_TIPO['ID']
+_CODIGOS_RESERVADAS = {lexema: CODIGOS_TIPO[tipo] for lexema, tipo in PALAVRAS_RESERVADAS.items()}
+
+
+class IndiceLinhas:
+    """Converte deslocamentos em (linha, coluna), ambos a partir de 1."""
+    __slots__ = ('codigo', '_quebras')
+
+    def __init__(self, codigo):
+        self.codigo = codigo
+        self._quebras = None
+
+    def localizar(self, deslocamento):
+        if self._quebras is None:
+            # construído só no primeiro pedido (normalmente, ao reportar um erro)
+            self._quebras = array('q', (m.start() for m in re.finditer('\n', self.codigo)))
+        linha = bisect.bisect_left(self._quebras, deslocamento)
+        inicio_linha = self._quebras[linha - 1] + 1 if linha else 0
+        return linha + 1, deslocamento - inicio_linha + 1
+
+
+class FluxoTokens:
+    """
+    Sequência de tokens armazenada em arrays paralelos.
+
+    Indexar ou iterar devolve objetos Token (visões criadas sob demanda), então
+    o fluxo pode ser passado diretamente ao Parser.
+    """
+    __slots__ = ('codigo', 'tipos', 'inicios', 'fins', 'indice_linhas')
+
+    def __init__(self, codigo):
+        self.codigo = codigo
+        self.tipos = array('B')
+        self.inicios = array('q')
+        self.fins = array('q')
+        self.indice_linhas = IndiceLinhas(codigo)
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def tipo(self, indice):
+        return TIPOS_TOKEN[self.tipos[indice]]
+
+    def lexema(self, indice):
+        if self.tipos[indice] == CODIGO_EOF:
+            return 'EOF'
+        return sys.intern(self.codigo[self.inicios[indice]:self.fins[indice]])
+
+    def linha_coluna(self, indice):
+        return self.indice_linhas.localizar(self.inicios[indice])
+
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += len(self.tipos)
+        return Token(self.tipo(indice), self.lexema(indice), self.inicios[indice])
+
+    def __iter__(self):
+        codigo = self.codigo
+        tipos = TIPOS_TOKEN
+        intern = sys.intern
+        for codigo_tipo, inicio, fim in zip(self.tipos, self.inicios, self.fins):
+            if codigo_tipo == CODIGO_EOF:
+                yield Token('EOF', 'EOF', inicio)
+            else:
+                yield Token(tipos[codigo_tipo], intern(codigo[inicio:fim]), inicio)
+
+
+def analisar_codigo_compacto(codigo):
+    fluxo = FluxoTokens(codigo)
+    tipos = fluxo.tipos
+    inicios = fluxo.inicios
+    fins = fluxo.fins
     pos = 0
+    tamanho = len(codigo)
+    casar = PADRAO_MESTRE.match
+    codigos = CODIGOS_TIPO
+    reservadas = _CODIGOS_RESERVADAS
 
-    while pos < len(codigo):
-        if codigo[pos].isspace():
-            pos += 1
-            continue
+    while pos < tamanho:
+        match = casar(codigo, pos)
+        if match is None:
+            linha, coluna = fluxo.indice_linhas.localizar(pos)
+            raise SyntaxError(f"Caractere inválido na linha {linha}, coluna {coluna}: '{codigo[pos]}'")
 
-        # Números
-        match = re.match(r'\d+', codigo[pos:])
-        if match:
-            lexema = match.group(0)
-            tokens.append(Token('NUMERO', lexema))
-            pos += len(lexema)
-            continue
+        grupo = match.lastgroup
+        fim = match.end()
+        if grupo != 'ESPACO':
+            if grupo == 'ID':
+                tipos.append(reservadas.get(codigo[pos:fim], CODIGO_ID))
+            else:
+                tipos.append(codigos[grupo])
+            inicios.append(pos)
+            fins.append(fim)
+        pos = fim
 
-        # Identificadores e palavras reservadas
-        match = re.match(r'[a-zA-Z_][a-zA-Z0-9_]*', codigo[pos:])
-        if match:
-            lexema = match.group(0)
-            tipo = PALAVRAS_RESERVADAS.get(lexema, 'ID')
-            tokens.append(Token(tipo, lexema))
-            pos += len(lexema)
-            continue
+    tipos.append(CODIGO_EOF)
+    inicios.append(tamanho)
+    fins.append(tamanho)
+    return fluxo
+
+
+# Varredura preguiçosa: os tokens são produzidos sob demanda a partir de uma
+# string, de um arquivo (texto ou binário) ou de um mmap, lendo a entrada em
+# blocos. Nem o código-fonte inteiro nem a lista de tokens ficam em memória.
+TAMANHO_BLOCO = 1 << 16
+
+def _blocos_da_fonte(fonte, tamanho_bloco):
+    if isinstance(fonte, str):
+        yield fonte
+        return
+
+    decodificador = None
+    while True:
+        bloco = fonte.read(tamanho_bloco)
+        if not bloco:
+            break
+        if isinstance(bloco, (bytes, bytearray)):
+            if decodificador is None:
+                decodificador = codecs.getincrementaldecoder('utf-8')()
+            bloco = decodificador.decode(bloco)
+            if not bloco:
+                continue
+        yield bloco
+
+    if decodificador is not None:
+        resto = decodificador.decode(b'', final=True)
+        if resto:
+            yield resto
 
-        # Operadores e símbolos
-        matched = False
-        for tipo, padrao in PADROES:
-            regex = re.compile(padrao)
-            match = regex.match(codigo[pos:])
-            if match:
-                lexema = match.group(0)
-                tokens.append(Token(tipo, lexema))
-                pos += len(lexema)
-                matched = True
+
+def gerar_tokens(fonte, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Gera os tokens da fonte um a um, terminando com o token EOF.
+
+    Args:
+        fonte: string, objeto de arquivo (modo texto ou binário) ou mmap.
+        tamanho_bloco (int): quantidade lida da fonte por vez.
+    """
+    casar = PADRAO_MESTRE.match
+    reservadas = PALAVRAS_RESERVADAS
+    intern = sys.intern
+    blocos = _blocos_da_fonte(fonte, tamanho_bloco)
+
+    buffer = ''
+    base = 0  # posição absoluta de buffer[0] na fonte
+    pos = 0
+    fim_entrada = False
+
+    while True:
+        if not fim_entrada and len(buffer) - pos < tamanho_bloco:
+            bloco = next(blocos, None)
+            if bloco is None:
+                fim_entrada = True
+            else:
+                base += pos
+                buffer = buffer[pos:] + bloco
+                pos = 0
+
+        if pos >= len(buffer):
+            if fim_entrada:
                 break
-        if matched:
             continue
 
-        raise SyntaxError(f"Caractere inválido na posição {pos}: '{codigo[pos]}'")
+        match = casar(buffer, pos)
+        if match is None:
+            raise SyntaxError(f"Caractere inválido na posição {base + pos}: '{buffer[pos]}'")
+
+        fim = match.end()
+        # Um token que encosta no fim do buffer pode continuar no próximo bloco
+        if fim == len(buffer) and not fim_entrada:
+            bloco = next(blocos, None)
+            if bloco is None:
+                fim_entrada = True
+            else:
+                base += pos
+                buffer = buffer[pos:] + bloco
+                pos = 0
+            continue
+
+        tipo = match.lastgroup
+        if tipo != 'ESPACO':
+            lexema = intern(buffer[pos:fim])
+            if tipo == 'ID':
+                tipo = reservadas.get(lexema, 'ID')
+            yield Token(tipo, lexema, base + pos)
+        pos = fim
+
+    yield Token('EOF', 'EOF', base + len(buffer))
+
 
-    tokens.append(Token('EOF', 'EOF'))
-    return tokens
\ No newline at end of file
+def tokens_do_arquivo(caminho, usar_mmap=True, tamanho_bloco=TAMANHO_BLOCO):
+    """Gera os tokens de um arquivo sem carregá-lo inteiro (via mmap, se possível)."""
+    with open(caminho, 'rb') as arquivo:
+        if usar_mmap:
+            try:
+                mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # arquivos vazios não podem ser mapeados
+                mapa = None
+            if mapa is not None:
+                with mapa:
+                    yield from gerar_tokens(mapa, tamanho_bloco)
+                return
+        yield from gerar_tokens(arquivo, tamanho_bloco)
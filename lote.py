@@ -0,0 +1,178 @@
+"""
+Compilação em lote de muitos arquivos-fonte, em paralelo.
+
+Cada arquivo é compilado (léxico, sintático e, com -O, otimização) num
+processo de um ProcessPoolExecutor; os processos ficam vivos durante todo o
+lote, então a inicialização do Python e os imports são pagos uma vez por
+trabalhador, e não por arquivo. Para cada entrada, a saída recebe
+`<nome>.tac` (a listagem do TAC) ou, se a compilação falhou, `<nome>.erro`
+com a mensagem; `resumo.json` traz o resultado de todos os arquivos.
+
+Uso:
+    python lote.py 'programas/**/*.txt' --saida saida_tac -j 8 --lote 16 -O 1
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from compilador import compilar
+from intermediario.quadruplas import listagem
+from sintatico.cache_funcoes import CacheFuncoes
+
+# Opções de compilação de cada trabalhador (definidas em _iniciar)
+_opcoes = {}
+
+
+def expandir_entradas(padroes):
+    """Caminhos dos arquivos indicados por `padroes` (caminhos ou globs, com ** recursivo), sem repetições."""
+    caminhos = {}
+    for padrao in padroes:
+        encontrados = sorted(glob.glob(padrao, recursive=True)) if glob.has_magic(padrao) else [padrao]
+        if not encontrados:
+            raise ValueError(f"Nenhum arquivo corresponde a '{padrao}'.")
+        for caminho in encontrados:
+            if not os.path.isdir(caminho):
+                caminhos[os.path.normpath(caminho)] = None
+    return list(caminhos)
+
+
+def _iniciar(saida, raiz, nivel_otimizacao, registradores, diretorio_cache, limite_expansao=None):
+    _opcoes.update(saida=saida, raiz=raiz, nivel_otimizacao=nivel_otimizacao, registradores=registradores,
+                   cache=CacheFuncoes(diretorio_cache) if diretorio_cache else None,
+                   limite_expansao=limite_expansao)
+
+
+def compilar_arquivo(caminho):
+    """
+    Compila um arquivo e grava o TAC ou o erro na saída.
+
+    Returns:
+        dict: arquivo, ok, segundos, bytes, instrucoes e erro.
+    """
+    inicio = time.perf_counter()
+    resultado = {'arquivo': caminho, 'ok': False, 'bytes': 0, 'instrucoes': 0, 'erro': None}
+    try:
+        with open(caminho, encoding='utf-8') as f:
+            codigo = f.read()
+        resultado['bytes'] = len(codigo)
+        parser = compilar(codigo, nivel_otimizacao=_opcoes['nivel_otimizacao'],
+                          registradores=_opcoes['registradores'], cache=_opcoes['cache'],
+                          limite_expansao=_opcoes['limite_expansao'])
+        linhas = listagem(parser.codigo_intermediario)
+        resultado['ok'] = True
+        resultado['instrucoes'] = len(linhas)
+        texto, extensao = '\n'.join(linhas) + '\n', '.tac'
+    except Exception as e:
+        resultado['erro'] = f"{type(e).__name__}: {e}"
+        texto, extensao = resultado['erro'] + '\n', '.erro'
+
+    destino = os.path.join(_opcoes['saida'], os.path.relpath(caminho, _opcoes['raiz']))
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    base = os.path.splitext(destino)[0]
+    # a saída de uma execução anterior com o resultado oposto ficaria enganosa
+    for antiga in ('.tac', '.erro'):
+        if antiga != extensao and os.path.exists(base + antiga):
+            os.remove(base + antiga)
+    with open(base + extensao, 'w', encoding='utf-8') as f:
+        f.write(texto)
+    resultado['segundos'] = time.perf_counter() - inicio
+    return resultado
+
+
+def compilar_lote(caminhos, saida, trabalhadores=None, lote=None, nivel_otimizacao=0, registradores=None,
+                  diretorio_cache=None, limite_expansao=None):
+    """
+    Compila `caminhos` e grava os resultados em `saida`.
+
+    Args:
+        trabalhadores (int): processos; None usa os.cpu_count() e 1 compila
+            no próprio processo.
+        lote (int): arquivos entregues a um trabalhador por vez; None divide
+            os arquivos em cerca de 4 lotes por trabalhador.
+        diretorio_cache (str): diretório de um CacheFuncoes compartilhado
+            pelos trabalhadores.
+        limite_expansao (int): com -O2, tamanho máximo das funções expandidas em linha.
+
+    Returns:
+        list: um dict por arquivo (ver compilar_arquivo), na ordem de `caminhos`.
+    """
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    if trabalhadores < 1:
+        raise ValueError(f"Número de trabalhadores inválido: {trabalhadores}.")
+    if lote is None:
+        lote = max(1, len(caminhos) // (trabalhadores * 4))
+    elif lote < 1:
+        raise ValueError(f"Tamanho de lote inválido: {lote}.")
+
+    os.makedirs(saida, exist_ok=True)
+    raiz = os.path.commonpath([os.path.dirname(os.path.abspath(c)) for c in caminhos]) if caminhos else '.'
+    opcoes = (saida, raiz, nivel_otimizacao, registradores, diretorio_cache, limite_expansao)
+    if trabalhadores == 1:
+        _iniciar(*opcoes)
+        return [compilar_arquivo(c) for c in caminhos]
+    with ProcessPoolExecutor(trabalhadores, initializer=_iniciar, initargs=opcoes) as executor:
+        return list(executor.map(compilar_arquivo, caminhos, chunksize=lote))
+
+
+def resumo(resultados, segundos, mais_lentos=5):
+    """Texto com vazão, falhas e os arquivos mais lentos."""
+    falhas = [r for r in resultados if not r['ok']]
+    total_bytes = sum(r['bytes'] for r in resultados)
+    linhas = [
+        f"{len(resultados)} arquivos em {segundos:.2f} s "
+        f"({len(resultados) / segundos if segundos else 0:.1f} arquivos/s, "
+        f"{total_bytes / 1024 / segundos if segundos else 0:.1f} KB/s)",
+        f"{len(resultados) - len(falhas)} compilados, {len(falhas)} com erro",
+    ]
+    for r in falhas[:mais_lentos]:
+        linhas.append(f"  ✗ {r['arquivo']}: {r['erro']}")
+    if len(falhas) > mais_lentos:
+        linhas.append(f"  ... e mais {len(falhas) - mais_lentos}")
+    if resultados:
+        linhas.append("Mais lentos:")
+        for r in sorted(resultados, key=lambda r: r['segundos'], reverse=True)[:mais_lentos]:
+            linhas.append(f"  {r['segundos'] * 1000:10.2f} ms  {r['arquivo']}")
+    return '\n'.join(linhas)
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description="Compila muitos arquivos em paralelo e grava o TAC de cada um.")
+    argumentos.add_argument('entradas', nargs='+', help="arquivos ou globs (entre aspas; ** é recursivo)")
+    argumentos.add_argument('--saida', default='saida_tac', metavar='DIRETORIO',
+                            help="onde gravar os .tac, os .erro e o resumo.json")
+    argumentos.add_argument('-j', '--trabalhadores', type=int, metavar='N',
+                            help="processos de compilação (padrão: um por CPU; 1 compila sem processos)")
+    argumentos.add_argument('--lote', type=int, metavar='N',
+                            help="arquivos enviados a um processo de cada vez")
+    argumentos.add_argument('-O', '--otimizacao', type=int, default=0, metavar='NIVEL',
+                            help="nível de otimização do código de três endereços (0 desliga)")
+    argumentos.add_argument('--registradores', type=int, metavar='N',
+                            help="com -O2, limita os temporários de cada função a N")
+    argumentos.add_argument('--limite-expansao', type=int, metavar='N',
+                            help="com -O2, expande em linha as funções de até N instruções")
+    argumentos.add_argument('--cache', metavar='DIRETORIO',
+                            help="cache de funções em disco compartilhado pelos processos")
+    args = argumentos.parse_args(argv)
+
+    try:
+        caminhos = expandir_entradas(args.entradas)
+    except ValueError as e:
+        argumentos.error(str(e))
+
+    inicio = time.perf_counter()
+    resultados = compilar_lote(caminhos, args.saida, args.trabalhadores, args.lote, args.otimizacao,
+                               args.registradores, args.cache, args.limite_expansao)
+    segundos = time.perf_counter() - inicio
+
+    with open(os.path.join(args.saida, 'resumo.json'), 'w', encoding='utf-8') as f:
+        json.dump({'segundos': segundos, 'resultados': resultados}, f, indent=2, ensure_ascii=False)
+    print(resumo(resultados, segundos))
+    return 1 if any(not r['ok'] for r in resultados) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
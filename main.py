@@ -1,25 +1,107 @@
-from lexico.analisador_lexico import analisar_codigo
+import argparse
+import sys
+from contextlib import nullcontext
+
+from compilador import BACKENDS, LEXICOS, analisar_lexico, executar, fase, otimizar_parser
+from otimizacao.otimizador import formatar_relatorio
+from instrumentacao.estatisticas import Estatisticas, perfilar
+from intermediario.quadruplas import listagem
+from lexico.analisador_lexico import tokens_do_arquivo
 from sintatico.analisador_sintatico import Parser
+from sintatico.cache_funcoes import LIMITE_PADRAO, CacheFuncoes
+from sintatico.duas_fases import analisar_em_duas_fases
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description="Compilador: análise léxica, sintática e geração de TAC.")
+    argumentos.add_argument('arquivo', nargs='?', default="entrada_3.txt")
+    argumentos.add_argument('--stats', action='store_true',
+                            help="mostra tempo, pico de memória e contadores de cada fase")
+    argumentos.add_argument('--perfil', metavar='ARQUIVO',
+                            help="grava a saída do cProfile da compilação em ARQUIVO")
+    argumentos.add_argument('--executar', action='store_true',
+                            help="executa o código de três endereços gerado")
+    argumentos.add_argument('--backend', choices=BACKENDS, default='vm',
+                            help="como executar: máquina virtual ou funções Python compiladas")
+    argumentos.add_argument('-O', '--otimizacao', type=int, default=0, metavar='NIVEL',
+                            help="nível de otimização do código de três endereços (0 desliga)")
+    argumentos.add_argument('--registradores', type=int, metavar='N',
+                            help="com -O2, limita os temporários de cada função a N e derrama os demais")
+    argumentos.add_argument('--limite-expansao', type=int, metavar='N',
+                            help="com -O2, expande em linha as funções de até N instruções")
+    argumentos.add_argument('--cache', metavar='DIRETORIO',
+                            help="guarda o TAC de cada função em DIRETORIO e reaproveita o das funções não alteradas")
+    argumentos.add_argument('--cache-limite', type=int, default=LIMITE_PADRAO // (1024 * 1024), metavar='MB',
+                            help="tamanho máximo do diretório do cache; as entradas menos usadas saem primeiro")
+    argumentos.add_argument('--duas-fases', action='store_true',
+                            help="pré-declara globais e funções (chamadas antes da declaração valem) "
+                                 "e analisa os corpos das funções em paralelo")
+    argumentos.add_argument('-j', '--trabalhadores', type=int, metavar='N',
+                            help="com --duas-fases, processos para os corpos (padrão: um por CPU)")
+    argumentos.add_argument('--lexico', choices=LEXICOS, default='lista',
+                            help="tokens em lista, em arrays compactos ou em fluxo, lendo o arquivo "
+                                 "aos poucos durante a análise (sem --cache nem --duas-fases)")
+    args = argumentos.parse_args(argv)
+    if args.lexico == 'fluxo' and (args.cache or args.duas_fases):
+        argumentos.error("--lexico fluxo não combina com --cache nem com --duas-fases, que precisam da lista de tokens")
+
+    if args.lexico == 'fluxo':
+        codigo = None
+    else:
+        with open(args.arquivo, "r", encoding="utf-8") as f:
+            codigo = f.read()
+
+    estatisticas = Estatisticas() if args.stats else None
+    cache = CacheFuncoes(args.cache, args.cache_limite * 1024 * 1024) if args.cache else None
+    if args.perfil:
+        perfil = perfilar(args.perfil, saida=sys.stdout if args.stats else None)
+    else:
+        perfil = nullcontext()
+
+    with perfil:
+        with fase(estatisticas, 'lexico'):
+            if codigo is None:
+                tokens = tokens_do_arquivo(args.arquivo)
+            else:
+                tokens = analisar_lexico(codigo, args.lexico)
+
+        # o fluxo só é lido pelo Parser
+        if codigo is not None:
+            if estatisticas is not None:
+                estatisticas.contadores['tokens_lexados'] = len(tokens)
+            print("TOKENS LIDOS:")
+            index = 0
+            for t in tokens:
+                print(f"{index} - {t}")
+                index += 1
+
+        parser = Parser(tokens, codigo, estatisticas=estatisticas, cache=cache)
+        try:
+            with fase(estatisticas, 'sintatico'):
+                if args.duas_fases:
+                    analisar_em_duas_fases(parser, args.trabalhadores, imprimir=not args.otimizacao)
+                else:
+                    parser.analisar(imprimir=not args.otimizacao)
+            if args.otimizacao:
+                relatorio = otimizar_parser(parser, args.otimizacao, estatisticas, args.registradores,
+                                             args.limite_expansao)
+                print(f"\nCódigo intermediário otimizado (-O{args.otimizacao}):")
+                for linha in listagem(parser.codigo_intermediario):
+                    print(linha)
+                print(f"Instruções removidas: {relatorio['total']['instrucoes_removidas']}")
+                print(formatar_relatorio(relatorio))
+            print("✓ Código analisado com sucesso!")
+            if cache is not None:
+                print(cache.resumo())
+            if args.executar:
+                print("\nExecução:")
+                executar(parser, estatisticas=estatisticas, backend=args.backend)
+        except Exception as e:
+            print("✗ Erro durante análise:")
+            print(e)
 
-def main():
-    with open("entrada_3.txt", "r", encoding="utf-8") as f:
-        codigo = f.read()
-
-    tokens = analisar_codigo(codigo)
-
-    print("TOKENS LIDOS:")
-    index = 0
-    for t in tokens:
-        print(f"{index} - {t}")
-        index += 1
-
-    parser = Parser(tokens)
-    try:
-        parser.analisar()
-        print("✓ Código analisado com sucesso!")
-    except Exception as e:
-        print("✗ Erro durante análise:")
-        print(e)
+    if estatisticas is not None:
+        print()
+        print(estatisticas.relatorio())
 
 if __name__ == "__main__":
     main()
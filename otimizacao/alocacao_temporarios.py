@@ -0,0 +1,145 @@
+"""
+Reaproveitamento de temporários guiado por vivacidade (alocação por varredura
+linear).
+
+Cada temporário recebe o intervalo de instruções em que está vivo; os
+intervalos são percorridos em ordem de início e cada um ocupa o menor
+"registrador" livre (_t0, _t1, ...). Com um número fixo de registradores,
+quando não há registrador livre o intervalo que termina mais tarde é
+derramado para a área de memória da função (_tm0, _tm1, ...), que também é
+reaproveitada entre intervalos disjuntos.
+"""
+import heapq
+
+from intermediario.quadruplas import eh_temporario
+from otimizacao.cfg import grafos_por_funcao
+from otimizacao.comum import definicao, juntar_corpos, renomear, usos
+from otimizacao.fluxo_dados import vivacidade
+
+PREFIXO_REGISTRADOR = '_t'
+PREFIXO_MEMORIA = '_tm'
+
+
+def intervalos_vivos(corpo, vivas, universo):
+    """
+    temporário -> [início, fim] do trecho em que está vivo. A instrução i tem
+    dois pontos: 2i, onde lê os operandos, e 2i + 1, onde escreve o resultado.
+    """
+    intervalos = {}
+
+    def marcar(temp, ponto):
+        intervalo = intervalos.get(temp)
+        if intervalo is None:
+            intervalos[temp] = [ponto, ponto]
+        else:
+            intervalo[0] = min(intervalo[0], ponto)
+            intervalo[1] = max(intervalo[1], ponto)
+
+    for i, q in enumerate(corpo):
+        for temp in universo.itens(vivas[i]):
+            marcar(temp, 2 * i)
+        for temp in usos(q):
+            if eh_temporario(temp):
+                marcar(temp, 2 * i)
+        destino = definicao(q)
+        if destino is not None and eh_temporario(destino):
+            marcar(destino, 2 * i + 1)
+    return intervalos
+
+
+def _varredura(intervalos, limite=None):
+    """
+    Atribui um índice de registrador a cada temporário.
+
+    Returns:
+        tuple: (temporário -> índice, lista dos temporários derramados)
+    """
+    ordem = sorted(intervalos, key=lambda t: (intervalos[t][0], intervalos[t][1], t))
+    atribuido = {}
+    derramados = []
+    ativos = []  # heap de (fim, temporário)
+    livres = []  # heap de índices livres
+    proximo = 0
+
+    for temp in ordem:
+        inicio, fim = intervalos[temp]
+        while ativos and ativos[0][0] < inicio:
+            _, expirado = heapq.heappop(ativos)
+            heapq.heappush(livres, atribuido[expirado])
+        if livres:
+            indice = heapq.heappop(livres)
+        elif limite is None or proximo < limite:
+            indice = proximo
+            proximo += 1
+        else:
+            # derrama o intervalo que termina mais tarde
+            fim_maior, vitima = max(ativos)
+            if fim_maior <= fim:
+                derramados.append(temp)
+                continue
+            ativos.remove((fim_maior, vitima))
+            heapq.heapify(ativos)
+            indice = atribuido.pop(vitima)
+            derramados.append(vitima)
+        atribuido[temp] = indice
+        heapq.heappush(ativos, (fim, temp))
+    return atribuido, derramados
+
+
+def _maximo_simultaneos(intervalos):
+    """Maior número de intervalos que se sobrepõem em um mesmo ponto."""
+    eventos = sorted([(inicio, 1) for inicio, _ in intervalos.values()] +
+                     [(fim + 1, -1) for _, fim in intervalos.values()])
+    maximo = atual = 0
+    for _, delta in eventos:
+        atual += delta
+        maximo = max(maximo, atual)
+    return maximo
+
+
+def alocar_corpo(grafo, registradores=None):
+    """
+    Returns:
+        tuple: (novo corpo, dict com as contagens da função)
+    """
+    corpo = grafo.corpo
+    analise = vivacidade(grafo, eh_temporario)
+    intervalos = intervalos_vivos(corpo, analise.por_instrucao(), analise.universo)
+    atribuido, derramados = _varredura(intervalos, registradores)
+    memoria, _ = _varredura({t: intervalos[t] for t in derramados})
+
+    mapa = {t: f"{PREFIXO_REGISTRADOR}{i}" for t, i in atribuido.items()}
+    mapa.update((t, f"{PREFIXO_MEMORIA}{i}") for t, i in memoria.items())
+    novo = [renomear(q, mapa) for q in corpo]
+    info = {
+        'temporarios_antes': len(intervalos),
+        'temporarios_depois': len(set(mapa.values())),
+        'max_vivos': _maximo_simultaneos(intervalos),
+        'derramados': len(derramados),
+    }
+    return novo, info
+
+
+def alocar_temporarios(codigo, registradores=None):
+    """
+    Args:
+        codigo (list): lista de Quadrupla.
+        registradores (int): quantidade máxima de temporários em registrador
+            por função; None não limita (só reaproveita).
+
+    Returns:
+        tuple: (novo código, dict com as contagens do passo)
+    """
+    if registradores is not None and registradores < 1:
+        raise ValueError("O número de registradores deve ser positivo.")
+    info = {'temporarios_antes': 0, 'temporarios_depois': 0, 'derramados': 0, 'max_vivos': 0,
+            'max_vivos_por_funcao': {}}
+    corpos = []
+    for grafo in grafos_por_funcao(codigo):
+        corpo, contagens = alocar_corpo(grafo, registradores)
+        corpos.append((grafo.marca, corpo, grafo.fim))
+        for chave in ('temporarios_antes', 'temporarios_depois', 'derramados'):
+            info[chave] += contagens[chave]
+        info['max_vivos'] = max(info['max_vivos'], contagens['max_vivos'])
+        info['max_vivos_por_funcao'][grafo.nome] = contagens['max_vivos']
+    return juntar_corpos(corpos), info
@@ -0,0 +1,121 @@
+"""
+Grafo de fluxo de controle (CFG) sobre o código de três endereços.
+
+Cada corpo (programa principal ou função, sem as marcas FUNCAO/FIM_FUNCAO)
+vira um GrafoFluxo: os blocos básicos são trechos [inicio, fim) do corpo,
+ligados por arestas de sucessor e predecessor. Os blocos guardam só índices;
+as instruções continuam na lista do corpo.
+"""
+from intermediario.quadruplas import DESVIOS, Op, eh_temporario
+from otimizacao.comum import separar_corpos
+
+# Instruções depois das quais começa um novo bloco
+_ENCERRA = DESVIOS | {Op.GOTO, Op.RETORNO}
+
+
+class BlocoBasico:
+    __slots__ = ('indice', 'inicio', 'fim', 'sucessores', 'predecessores')
+
+    def __init__(self, indice, inicio, fim):
+        self.indice = indice
+        self.inicio = inicio
+        self.fim = fim
+        self.sucessores = []
+        self.predecessores = []
+
+    def __len__(self):
+        return self.fim - self.inicio
+
+    def __repr__(self):
+        return f"BlocoBasico({self.indice}, [{self.inicio}, {self.fim}), -> {self.sucessores})"
+
+
+class GrafoFluxo:
+    """
+    Args:
+        corpo (list): instruções do corpo, sem as marcas da função.
+        marca (Quadrupla): marca FUNCAO da função, ou None no programa principal.
+        fim (Quadrupla): marca FIM_FUNCAO correspondente.
+    """
+
+    def __init__(self, corpo, marca=None, fim=None):
+        self.corpo = corpo
+        self.marca = marca
+        self.fim = fim
+        self.nome = marca.resultado if marca is not None else '<principal>'
+        self.locais = frozenset(marca.arg1) | frozenset(marca.arg2) if marca is not None else frozenset()
+        self.blocos = []
+        self.bloco_do_rotulo = {}
+        self._construir()
+
+    def _construir(self):
+        corpo = self.corpo
+        inicios = [0] if corpo else []
+        for i, q in enumerate(corpo):
+            if q.op == Op.ROTULO:
+                if inicios[-1] != i:
+                    inicios.append(i)
+            elif q.op in _ENCERRA and i + 1 < len(corpo):
+                inicios.append(i + 1)
+        inicios.append(len(corpo))
+
+        blocos = self.blocos
+        for n in range(len(inicios) - 1):
+            bloco = BlocoBasico(n, inicios[n], inicios[n + 1])
+            blocos.append(bloco)
+            for i in range(bloco.inicio, bloco.fim):
+                if corpo[i].op != Op.ROTULO:
+                    break
+                self.bloco_do_rotulo[corpo[i].resultado] = n
+
+        for bloco in blocos:
+            ultimo = corpo[bloco.fim - 1]
+            if ultimo.op in DESVIOS or ultimo.op == Op.GOTO:
+                self._ligar(bloco, blocos[self.bloco_do_rotulo[ultimo.resultado]])
+            if ultimo.op not in (Op.GOTO, Op.RETORNO) and bloco.indice + 1 < len(blocos):
+                self._ligar(bloco, blocos[bloco.indice + 1])
+
+    @staticmethod
+    def _ligar(origem, destino):
+        if destino.indice not in origem.sucessores:
+            origem.sucessores.append(destino.indice)
+            destino.predecessores.append(origem.indice)
+
+    def eh_local(self, nome):
+        """Temporários, parâmetros e variáveis locais; no principal, só temporários."""
+        return eh_temporario(nome) or nome in self.locais
+
+    def instrucoes(self, bloco):
+        return self.corpo[bloco.inicio:bloco.fim]
+
+    def ordem_reversa_pos(self):
+        """Índices dos blocos alcançáveis a partir da entrada, em pós-ordem reversa."""
+        if not self.blocos:
+            return []
+        visitado = [False] * len(self.blocos)
+        ordem = []
+        pilha = [(0, iter(self.blocos[0].sucessores))]
+        visitado[0] = True
+        while pilha:
+            n, seguintes = pilha[-1]
+            for s in seguintes:
+                if not visitado[s]:
+                    visitado[s] = True
+                    pilha.append((s, iter(self.blocos[s].sucessores)))
+                    break
+            else:
+                pilha.pop()
+                ordem.append(n)
+        ordem.reverse()
+        return ordem
+
+    def __repr__(self):
+        return f"GrafoFluxo({self.nome}, {len(self.blocos)} blocos, {len(self.corpo)} instruções)"
+
+
+def grafos_por_funcao(codigo):
+    """
+    Returns:
+        list: um GrafoFluxo por corpo; o primeiro é o do programa principal.
+    """
+    return [GrafoFluxo(corpo, marca, fim) for marca, corpo, fim in separar_corpos(codigo)]
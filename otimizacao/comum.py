@@ -0,0 +1,144 @@
+"""
+Utilidades compartilhadas pelos passes de otimização do TAC.
+"""
+from itertools import count
+
+from intermediario.quadruplas import BINARIAS, Op, Quadrupla, eh_literal, eh_temporario, valor_literal
+
+# Instruções que iniciam e que encerram um bloco básico
+INICIA_BLOCO = frozenset((Op.ROTULO, Op.FUNCAO, Op.FIM_FUNCAO))
+TERMINA_BLOCO = frozenset((Op.SE, Op.SE_NAO, Op.GOTO, Op.RETORNO, Op.FUNCAO, Op.FIM_FUNCAO))
+
+# Instruções que leem apenas arg1
+_LE_ARG1 = frozenset((Op.COPIA, Op.ESCREVA, Op.PARAM, Op.RETORNO, Op.SE, Op.SE_NAO))
+# Instruções que escrevem em `resultado`
+DEFINICOES = BINARIAS | {Op.COPIA, Op.CHAMADA}
+
+
+def eh_variavel(operando):
+    return isinstance(operando, str) and not eh_literal(operando)
+
+
+def usos(q):
+    """Variáveis lidas pela instrução (literais não entram)."""
+    if q.op in BINARIAS:
+        return [o for o in (q.arg1, q.arg2) if eh_variavel(o)]
+    if q.op in _LE_ARG1 and eh_variavel(q.arg1):
+        return [q.arg1]
+    return []
+
+
+# Maior inteiro, em bits, que um passe escreve como literal ao calcular um
+# valor em tempo de compilação; acima disso a conversão para texto passa do
+# limite do Python (sys.get_int_max_str_digits) e o cálculo fica para a execução
+LIMITE_BITS_LITERAL = 4096
+
+
+def cabe_em_literal(valor):
+    return valor.bit_length() <= LIMITE_BITS_LITERAL
+
+
+def pode_falhar(q):
+    """Instrução que pode interromper a execução (divisão por zero): não pode sumir nem ser adiantada."""
+    return q.op == Op.DIV and not (eh_literal(q.arg2) and valor_literal(q.arg2) != 0)
+
+
+def definicao(q):
+    """Variável escrita pela instrução, ou None."""
+    if q.op in DEFINICOES:
+        return q.resultado
+    return None
+
+
+def substituir_usos(q, mapa):
+    """Devolve a instrução com os operandos lidos trocados segundo `mapa` (ou a própria, se nada mudar)."""
+    if q.op in BINARIAS:
+        a = mapa.get(q.arg1, q.arg1)
+        b = mapa.get(q.arg2, q.arg2)
+        if a is q.arg1 and b is q.arg2:
+            return q
+        return Quadrupla(q.op, q.resultado, a, b)
+    if q.op in _LE_ARG1:
+        a = mapa.get(q.arg1, q.arg1)
+        if a is q.arg1:
+            return q
+        return Quadrupla(q.op, q.resultado, a, q.arg2)
+    return q
+
+
+def nomes_livres(codigo, prefixo):
+    """Gerador de nomes `prefixoN` (ex.: _t7, L3) que ainda não aparecem no código."""
+    maior = -1
+    for q in codigo:
+        for operando in (q.resultado, q.arg1, q.arg2):
+            if isinstance(operando, str) and operando.startswith(prefixo) and operando[len(prefixo):].isdigit():
+                maior = max(maior, int(operando[len(prefixo):]))
+    return (f"{prefixo}{n}" for n in count(maior + 1))
+
+
+def renomear(q, mapa):
+    """Como substituir_usos, mas também troca a variável definida pela instrução."""
+    novo = substituir_usos(q, mapa)
+    destino = definicao(novo)
+    if destino in mapa:
+        return Quadrupla(novo.op, mapa[destino], novo.arg1, novo.arg2)
+    return novo
+
+
+class Escopos:
+    """
+    Acompanha, ao percorrer o TAC, quais nomes são locais à função corrente
+    (parâmetros, variáveis locais e temporários). No programa principal só os
+    temporários são locais.
+    """
+
+    def __init__(self):
+        self._pilha = [frozenset()]
+
+    def atualizar(self, q):
+        if q.op == Op.FUNCAO:
+            self._pilha.append(frozenset(q.arg1) | frozenset(q.arg2))
+        elif q.op == Op.FIM_FUNCAO:
+            self._pilha.pop()
+
+    def eh_local(self, nome):
+        return eh_temporario(nome) or nome in self._pilha[-1]
+
+    @property
+    def no_principal(self):
+        return len(self._pilha) == 1
+
+
+
+def separar_corpos(codigo):
+    """
+    Separa o TAC no corpo do programa principal e no de cada função, sem
+    aninhamento (uma função declarada dentro de outra sai do corpo externo).
+
+    Returns:
+        list: triplas (marca FUNCAO, corpo, marca FIM_FUNCAO); a primeira é o
+        programa principal, com as marcas None.
+    """
+    principal = (None, [], None)
+    corpos = [principal]
+    pilha = [principal]
+    for q in codigo:
+        if q.op == Op.FUNCAO:
+            pilha.append((q, [], None))
+        elif q.op == Op.FIM_FUNCAO:
+            marca, corpo, _ = pilha.pop()
+            corpos.append((marca, corpo, q))
+        else:
+            pilha[-1][1].append(q)
+    return corpos
+
+
+def juntar_corpos(corpos):
+    """Inverso de separar_corpos: as funções primeiro, depois o programa principal."""
+    codigo = []
+    for marca, corpo, fim in corpos[1:]:
+        codigo.append(marca)
+        codigo += corpo
+        codigo.append(fim)
+    codigo += corpos[0][1]
+    return codigo
@@ -0,0 +1,180 @@
+"""
+Expansão em linha de funções pequenas.
+
+Cada corpo entre FUNCAO e FIM_FUNCAO (o TAC que declaracao_funcao emitiu) vira
+um molde. Uma chamada `param a1; ...; param an; t := call f, n` a uma função
+com até `limite` instruções é trocada por uma cópia do corpo em que:
+- parâmetros, variáveis locais e temporários de f viram temporários novos
+  do chamador, os parâmetros recebendo cópias dos argumentos;
+- os locais que f lê antes de escrever começam em 0, como no quadro da chamada;
+- os rótulos são renumerados;
+- `return x` vira `t := x; goto Lfim`, e cair do fim do corpo dá `t := 0`.
+
+As funções são expandidas das chamadas para quem chama (componentes
+fortemente conexas do grafo de chamadas, de Tarjan), então um molde já traz
+expandidas as chamadas que ele mesmo faz. Funções recursivas, direta ou
+mutuamente, nunca são expandidas.
+"""
+from intermediario.quadruplas import SALTOS, Op, Quadrupla, eh_temporario, literal
+from otimizacao.cfg import GrafoFluxo
+from otimizacao.comum import definicao, juntar_corpos, nomes_livres, renomear, separar_corpos, usos
+from otimizacao.fluxo_dados import vivacidade
+
+# Tamanho máximo (em instruções) do corpo de uma função expandida
+LIMITE_EXPANSAO = 20
+
+
+class _Molde:
+    __slots__ = ('parametros', 'corpo', 'locais', 'globais', 'iniciais', 'rotulos', 'cai_no_fim')
+
+    def __init__(self, marca, corpo):
+        self.parametros = marca.arg1
+        self.corpo = corpo
+        declarados = frozenset(marca.arg1) | frozenset(marca.arg2)
+        nomes = dict.fromkeys(marca.arg1)
+        for q in corpo:
+            nomes.update(dict.fromkeys(usos(q)))
+            destino = definicao(q)
+            if destino is not None:
+                nomes[destino] = None
+        self.locais = [v for v in nomes if eh_temporario(v) or v in declarados]
+        self.globais = frozenset(v for v in nomes if not (eh_temporario(v) or v in declarados))
+        self.rotulos = [q.resultado for q in corpo if q.op == Op.ROTULO]
+        self.cai_no_fim = not corpo or corpo[-1].op not in (Op.RETORNO, Op.GOTO)
+
+        self.iniciais = []
+        grafo = GrafoFluxo(corpo, marca)
+        if grafo.blocos:
+            vivas = vivacidade(grafo)
+            lidos_antes = set(vivas.universo.itens(vivas.entrada[0]))
+            self.iniciais = [v for v in self.locais if v in lidos_antes and v not in marca.arg1]
+
+    def instanciar(self, argumentos, destino, temporarios, rotulos):
+        mapa = {v: next(temporarios) for v in self.locais}
+        novos_rotulos = {r: next(rotulos) for r in self.rotulos}
+        fim = next(rotulos)
+        codigo = [Quadrupla(Op.COPIA, mapa[p], a) for p, a in zip(self.parametros, argumentos)]
+        codigo += [Quadrupla(Op.COPIA, mapa[v], literal(0)) for v in self.iniciais]
+        salta_para_fim = False
+        ultima = len(self.corpo) - 1
+        for k, q in enumerate(self.corpo):
+            if q.op == Op.RETORNO:
+                if destino is not None:
+                    codigo.append(Quadrupla(Op.COPIA, destino, mapa.get(q.arg1, q.arg1)))
+                if k != ultima:
+                    codigo.append(Quadrupla(Op.GOTO, fim))
+                    salta_para_fim = True
+                continue
+            if q.op in SALTOS or q.op == Op.ROTULO:
+                q = Quadrupla(q.op, novos_rotulos[q.resultado], q.arg1, q.arg2)
+            codigo.append(renomear(q, mapa))
+        if self.cai_no_fim and destino is not None:
+            # o slot de retorno começa em 0
+            codigo.append(Quadrupla(Op.COPIA, destino, literal(0)))
+        if salta_para_fim:
+            codigo.append(Quadrupla(Op.ROTULO, fim))
+        return codigo
+
+
+def _componentes(chamadas):
+    """
+    Componentes fortemente conexas do grafo de chamadas (Tarjan, sem
+    recursão), na ordem em que se completam: quem é chamado vem antes.
+    """
+    indice = {}
+    menor = {}
+    pilha = []
+    na_pilha = set()
+    componentes = []
+
+    def visitar(v):
+        indice[v] = menor[v] = len(indice)
+        pilha.append(v)
+        na_pilha.add(v)
+        return v, iter(chamadas[v])
+
+    for raiz in chamadas:
+        if raiz in indice:
+            continue
+        trabalho = [visitar(raiz)]
+        while trabalho:
+            v, seguintes = trabalho[-1]
+            for w in seguintes:
+                if w not in chamadas:
+                    continue
+                if w not in indice:
+                    trabalho.append(visitar(w))
+                    break
+                if w in na_pilha:
+                    menor[v] = min(menor[v], indice[w])
+            else:
+                trabalho.pop()
+                if trabalho:
+                    u = trabalho[-1][0]
+                    menor[u] = min(menor[u], menor[v])
+                if menor[v] == indice[v]:
+                    componente = []
+                    while True:
+                        w = pilha.pop()
+                        na_pilha.discard(w)
+                        componente.append(w)
+                        if w == v:
+                            break
+                    componentes.append(componente)
+    return componentes
+
+
+def _expandir_corpo(corpo, locais, moldes, temporarios, rotulos, info):
+    novo = []
+    for q in corpo:
+        molde = moldes.get(q.arg1) if q.op == Op.CHAMADA else None
+        if molde is not None:
+            n = q.arg2
+            inicio = len(novo) - n
+            if n == len(molde.parametros) and inicio >= 0 \
+                    and all(p.op == Op.PARAM for p in novo[inicio:]) and not molde.globais & locais:
+                argumentos = [p.arg1 for p in novo[inicio:]]
+                del novo[inicio:]
+                novo += molde.instanciar(argumentos, q.resultado, temporarios, rotulos)
+                info['chamadas_expandidas'] += 1
+                continue
+        novo.append(q)
+    return novo
+
+
+def expandir_funcoes(codigo, limite=None):
+    """
+    Args:
+        codigo (list): lista de Quadrupla.
+        limite (int): tamanho máximo, em instruções, do corpo expandido
+            (None usa LIMITE_EXPANSAO).
+
+    Returns:
+        tuple: (novo código, dict com as contagens do passo)
+    """
+    limite = LIMITE_EXPANSAO if limite is None else limite
+    info = {'chamadas_expandidas': 0, 'funcoes_recursivas': 0}
+    corpos = separar_corpos(codigo)
+    funcoes = {marca.resultado: k for k, (marca, _, _) in enumerate(corpos) if marca is not None}
+    chamadas = {nome: list(dict.fromkeys(q.arg1 for q in corpos[k][1] if q.op == Op.CHAMADA))
+                for nome, k in funcoes.items()}
+    temporarios = nomes_livres(codigo, '_t')
+    rotulos = nomes_livres(codigo, 'L')
+
+    moldes = {}
+    for componente in _componentes(chamadas):
+        for nome in componente:
+            marca, corpo, fim = corpos[funcoes[nome]]
+            corpo = _expandir_corpo(corpo, frozenset(marca.arg1) | frozenset(marca.arg2),
+                                    moldes, temporarios, rotulos, info)
+            corpos[funcoes[nome]] = (marca, corpo, fim)
+        if len(componente) > 1 or componente[0] in chamadas[componente[0]]:
+            info['funcoes_recursivas'] += len(componente)
+            continue
+        marca, corpo, _ = corpos[funcoes[componente[0]]]
+        if len(corpo) <= limite:
+            moldes[componente[0]] = _Molde(marca, corpo)
+
+    marca, corpo, fim = corpos[0]
+    corpos[0] = (marca, _expandir_corpo(corpo, frozenset(), moldes, temporarios, rotulos, info), fim)
+    return juntar_corpos(corpos), info
@@ -0,0 +1,187 @@
+"""
+Limpeza do fluxo de controle gerado por `se` e `enquanto`.
+
+Aplicada a cada corpo (programa principal e funções) até não haver mudança:
+- saltos para saltos passam a ir direto ao destino final;
+- `if t goto L1; goto L2; L1:` vira `ifFalse t goto L2` (e vice-versa);
+- saltos para a instrução seguinte são removidos;
+- código que não é alcançado a partir do início do corpo é removido;
+- rótulos adjacentes são unidos e rótulos sem referência, removidos.
+"""
+from intermediario.quadruplas import DESVIOS, SALTOS, Op, Quadrupla
+from otimizacao.comum import juntar_corpos, separar_corpos
+
+_INVERSO = {Op.SE: Op.SE_NAO, Op.SE_NAO: Op.SE}
+
+
+def _com_alvo(q, alvo):
+    return Quadrupla(q.op, alvo, q.arg1, q.arg2)
+
+
+def _rotulos_seguintes(corpo, i):
+    """Rótulos que aparecem em sequência a partir da posição i."""
+    rotulos = set()
+    while i < len(corpo) and corpo[i].op == Op.ROTULO:
+        rotulos.add(corpo[i].resultado)
+        i += 1
+    return rotulos
+
+
+def _saidas_de_lacos(corpo):
+    """Rótulos logo depois do salto para trás que fecha um laço."""
+    definidos = set()
+    saidas = set()
+    for i, q in enumerate(corpo):
+        if q.op == Op.ROTULO:
+            definidos.add(q.resultado)
+        elif q.op == Op.GOTO and q.resultado in definidos:
+            saidas |= _rotulos_seguintes(corpo, i + 1)
+    return saidas
+
+
+def _encadear_saltos(corpo, info):
+    # rótulo -> posição da primeira instrução depois dele
+    posicao = {}
+    primeira = {}
+    for i, q in enumerate(corpo):
+        if q.op == Op.ROTULO:
+            posicao[q.resultado] = i
+            j = i
+            while j < len(corpo) and corpo[j].op == Op.ROTULO:
+                j += 1
+            if j < len(corpo):
+                primeira[q.resultado] = j
+    # Os saltos que delimitam laços ficam onde estão: a saída continua no
+    # rótulo logo após o laço e o `goto` que fecha o laço não é copiado para
+    # dentro dele. Encadeá-los economiza pouco e desfaz a forma while/break
+    # que o backend Python reconstrói.
+    saidas = _saidas_de_lacos(corpo)
+
+    def resolver(rotulo):
+        vistos = set()
+        while rotulo not in vistos and rotulo not in saidas:
+            vistos.add(rotulo)
+            j = primeira.get(rotulo)
+            if j is None or corpo[j].op != Op.GOTO or posicao[corpo[j].resultado] < j:
+                break
+            rotulo = corpo[j].resultado
+        return rotulo
+
+    resultado = []
+    for q in corpo:
+        if q.op in SALTOS:
+            alvo = resolver(q.resultado)
+            if alvo != q.resultado:
+                q = _com_alvo(q, alvo)
+                info['saltos_encadeados'] += 1
+        resultado.append(q)
+    return resultado
+
+
+def _inverter_e_remover_saltos(corpo, info):
+    resultado = []
+    i = 0
+    while i < len(corpo):
+        q = corpo[i]
+        if q.op in DESVIOS and i + 1 < len(corpo) and corpo[i + 1].op == Op.GOTO \
+                and q.resultado in _rotulos_seguintes(corpo, i + 2):
+            resultado.append(Quadrupla(_INVERSO[q.op], corpo[i + 1].resultado, q.arg1))
+            info['desvios_invertidos'] += 1
+            i += 2
+            continue
+        if q.op in SALTOS and q.resultado in _rotulos_seguintes(corpo, i + 1):
+            info['saltos_removidos'] += 1
+            i += 1
+            continue
+        resultado.append(q)
+        i += 1
+    return resultado
+
+
+def _remover_inalcancaveis(corpo, info):
+    posicao = {q.resultado: i for i, q in enumerate(corpo) if q.op == Op.ROTULO}
+    alcancavel = [False] * len(corpo)
+    pendentes = [0] if corpo else []
+    while pendentes:
+        i = pendentes.pop()
+        while i < len(corpo) and not alcancavel[i]:
+            alcancavel[i] = True
+            q = corpo[i]
+            if q.op in SALTOS:
+                pendentes.append(posicao[q.resultado])
+            if q.op in (Op.GOTO, Op.RETORNO):
+                break
+            i += 1
+
+    resultado = []
+    for q, vivo in zip(corpo, alcancavel):
+        if vivo:
+            resultado.append(q)
+        elif q.op != Op.ROTULO:
+            info['instrucoes_inalcancaveis'] += 1
+    return resultado
+
+
+def _unir_rotulos(corpo, info):
+    # cada rótulo de uma sequência passa a ser o primeiro dela
+    equivalente = {}
+    anterior = None
+    for q in corpo:
+        if q.op == Op.ROTULO:
+            if anterior is None:
+                anterior = q.resultado
+            equivalente[q.resultado] = anterior
+        else:
+            anterior = None
+
+    referenciados = set()
+    resultado = []
+    for q in corpo:
+        if q.op in SALTOS:
+            alvo = equivalente.get(q.resultado, q.resultado)
+            if alvo != q.resultado:
+                q = _com_alvo(q, alvo)
+            referenciados.add(alvo)
+        resultado.append(q)
+
+    limpo = []
+    for q in resultado:
+        if q.op == Op.ROTULO and q.resultado not in referenciados:
+            info['rotulos_removidos'] += 1
+            continue
+        limpo.append(q)
+    return limpo
+
+
+_ETAPAS = (_encadear_saltos, _unir_rotulos, _inverter_e_remover_saltos, _remover_inalcancaveis)
+
+
+def limpar_corpo(corpo, info):
+    while True:
+        antes = list(corpo)
+        for etapa in _ETAPAS:
+            corpo = etapa(corpo, info)
+        if corpo == antes:
+            return corpo
+
+
+def limpar_fluxo(codigo):
+    """
+    Args:
+        codigo (list): lista de Quadrupla.
+
+    Returns:
+        tuple: (novo código, dict com as contagens do passo)
+    """
+    info = {
+        'saltos_encadeados': 0,
+        'desvios_invertidos': 0,
+        'saltos_removidos': 0,
+        'instrucoes_inalcancaveis': 0,
+        'rotulos_removidos': 0,
+    }
+    antes = len(codigo)
+    corpos = [(marca, limpar_corpo(corpo, info), fim) for marca, corpo, fim in separar_corpos(codigo)]
+    codigo = juntar_corpos(corpos)
+    info['instrucoes_removidas'] = antes - len(codigo)
+    return codigo, info
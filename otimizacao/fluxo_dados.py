@@ -0,0 +1,366 @@
+"""
+Resolvedor genérico de análises de fluxo de dados sobre um GrafoFluxo.
+
+Os conjuntos são vetores de bits em inteiros do Python: cada análise numera
+os seus itens (definições, variáveis ou expressões) em um Universo, e união,
+interseção e diferença viram |, & e & ~. Cada uma percorre as palavras das
+máscaras, então custa proporcionalmente à largura do universo (e não à
+quantidade de itens presentes): com 100 mil definições, cerca de 1600
+palavras de 64 bits por operação.
+
+Por isso, em funções com centenas de milhares de instruções, cada máscara
+de uma variável é montada uma vez só (mascara_de_bits) e reaproveitada pelos
+blocos e pelas instruções, e as máscaras por instrução só são calculadas
+quando pedidas (por_instrucao).
+
+    grafo = grafos_por_funcao(codigo)[0]
+    vivas = vivacidade(grafo)
+    for i, mascara in enumerate(vivas.por_instrucao()):
+        print(grafo.corpo[i], vivas.universo.itens(mascara))
+"""
+import heapq
+
+from intermediario.quadruplas import BINARIAS, COMUTATIVAS, Op, eh_literal
+from otimizacao.comum import definicao, usos
+
+
+class Universo:
+    """Numeração dos itens de uma análise: item -> posição do bit."""
+
+    def __init__(self):
+        self.itens_por_bit = []
+        self.bit_do_item = {}
+
+    def bit(self, item):
+        bit = self.bit_do_item.get(item)
+        if bit is None:
+            bit = self.bit_do_item[item] = len(self.itens_por_bit)
+            self.itens_por_bit.append(item)
+        return bit
+
+    def mascara(self, item):
+        return 1 << self.bit(item)
+
+    @property
+    def todos(self):
+        return (1 << len(self.itens_por_bit)) - 1
+
+    def itens(self, mascara):
+        """Itens presentes na máscara, em ordem de bit."""
+        itens = []
+        while mascara:
+            menor = mascara & -mascara
+            itens.append(self.itens_por_bit[menor.bit_length() - 1])
+            mascara ^= menor
+        return itens
+
+    def __len__(self):
+        return len(self.itens_por_bit)
+
+
+def mascara_de_bits(bits):
+    """Máscara com os bits dados, montada de uma vez (sem um | por bit)."""
+    if not bits:
+        return 0
+    buffer = bytearray((max(bits) >> 3) + 1)
+    for bit in bits:
+        buffer[bit >> 3] |= 1 << (bit & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def resolver(grafo, gera, mata, para_frente=True, intersecao=False, fronteira=0, inicial=0):
+    """
+    Resolve um problema de fluxo de dados por lista de trabalho.
+
+    A função de transferência de cada bloco é saida = gera | (entrada & ~mata)
+    (para trás, entrada e saída trocam de papel).
+
+    Args:
+        grafo (GrafoFluxo): grafo de um corpo.
+        gera, mata (list): máscaras por bloco.
+        para_frente (bool): direção da análise.
+        intersecao (bool): operador de encontro (False = união).
+        fronteira (int): valor na entrada do grafo (ou nas saídas, para trás).
+        inicial (int): valor inicial dos demais blocos (o universo todo para
+            interseção).
+
+    Returns:
+        tuple: (entrada, saida), listas de máscaras por bloco.
+    """
+    blocos = grafo.blocos
+    quantidade = len(blocos)
+    entrada = [inicial] * quantidade
+    saida = [inicial] * quantidade
+    if para_frente:
+        anteriores = [b.predecessores for b in blocos]
+        antes, depois = entrada, saida
+        ordem = list(range(quantidade))
+    else:
+        anteriores = [b.sucessores for b in blocos]
+        antes, depois = saida, entrada
+        ordem = list(reversed(range(quantidade)))
+    posicao = [0] * quantidade
+    for p, n in enumerate(ordem):
+        posicao[n] = p
+
+    # A lista de trabalho sai sempre na ordem do código (invertida, para
+    # trás). No código gerado por `se`/`enquanto` o corpo de um laço fica
+    # entre o cabeçalho e a saída, então cada laço converge antes de o valor
+    # seguir adiante. A pós-ordem reversa da busca em profundidade pode
+    # colocar o resto do programa antes do corpo de um laço e, em funções
+    # grandes, reprocessá-lo a cada volta.
+    fila = list(range(quantidade))
+    na_fila = [True] * quantidade
+    seguintes = [b.sucessores for b in blocos] if para_frente else [b.predecessores for b in blocos]
+    while fila:
+        n = ordem[heapq.heappop(fila)]
+        na_fila[n] = False
+        vizinhos = anteriores[n]
+        if not vizinhos or (para_frente and n == 0):
+            valor = fronteira
+            for v in vizinhos:
+                valor = valor & depois[v] if intersecao else valor | depois[v]
+        else:
+            valor = depois[vizinhos[0]]
+            for v in vizinhos[1:]:
+                valor = valor & depois[v] if intersecao else valor | depois[v]
+        antes[n] = valor
+        novo = gera[n] | (valor & ~mata[n])
+        if novo != depois[n]:
+            depois[n] = novo
+            for s in seguintes[n]:
+                if not na_fila[s]:
+                    na_fila[s] = True
+                    heapq.heappush(fila, posicao[s])
+    return entrada, saida
+
+
+class ResultadoFluxo:
+    """Resultado de uma análise: o universo e as máscaras por bloco."""
+
+    def __init__(self, grafo, universo, entrada, saida, transferencia, para_frente):
+        self.grafo = grafo
+        self.universo = universo
+        self.entrada = entrada
+        self.saida = saida
+        self._transferencia = transferencia
+        self._para_frente = para_frente
+
+    def por_instrucao(self):
+        """
+        Máscara antes de cada instrução do corpo (para análises para trás,
+        depois de cada uma: para a vivacidade, as variáveis vivas na entrada
+        de cada instrução).
+        """
+        corpo = self.grafo.corpo
+        mascaras = [0] * len(corpo)
+        transferir = self._transferencia
+        for bloco in self.grafo.blocos:
+            if self._para_frente:
+                atual = self.entrada[bloco.indice]
+                for i in range(bloco.inicio, bloco.fim):
+                    mascaras[i] = atual
+                    atual = transferir(i, atual)
+            else:
+                atual = self.saida[bloco.indice]
+                for i in reversed(range(bloco.inicio, bloco.fim)):
+                    atual = transferir(i, atual)
+                    mascaras[i] = atual
+        return mascaras
+
+
+# ----------------------------------------------------------------------
+# Vivacidade
+# ----------------------------------------------------------------------
+def vivacidade(grafo, interessa=None):
+    """
+    Variáveis vivas (lidas adiante antes de serem reescritas).
+
+    O universo só tem as variáveis lidas em algum bloco antes de serem
+    escritas nele: são as únicas que podem estar vivas na fronteira entre
+    blocos. As demais vivem só dentro de um bloco, da escrita até a última
+    leitura, e ficam de fora das máscaras.
+
+    Args:
+        interessa: filtro opcional das variáveis analisadas (ex.: eh_temporario).
+    """
+    universo = Universo()
+    corpo = grafo.corpo
+    expostas_por_bloco = []
+    for bloco in grafo.blocos:
+        escritas, expostas = set(), set()
+        for i in range(bloco.inicio, bloco.fim):
+            q = corpo[i]
+            for v in usos(q):
+                if v not in escritas and (interessa is None or interessa(v)):
+                    expostas.add(v)
+            destino = definicao(q)
+            if destino is not None:
+                escritas.add(destino)
+        expostas_por_bloco.append(expostas)
+        for v in sorted(expostas):
+            universo.bit(v)
+
+    # por instrução: (bits lidos, bit escrito ou None)
+    bit_do_item = universo.bit_do_item
+    efeitos = []
+    for q in corpo:
+        lidos = tuple(bit_do_item[v] for v in usos(q) if v in bit_do_item)
+        efeitos.append((lidos, bit_do_item.get(definicao(q))))
+
+    gera, mata = [], []
+    for bloco, expostas in zip(grafo.blocos, expostas_por_bloco):
+        escritos = {efeitos[i][1] for i in range(bloco.inicio, bloco.fim)} - {None}
+        gera.append(mascara_de_bits([bit_do_item[v] for v in expostas]))
+        mata.append(mascara_de_bits(escritos))
+
+    entrada, saida = resolver(grafo, gera, mata, para_frente=False)
+
+    def transferir(i, vivas):
+        lidos, escrito = efeitos[i]
+        if escrito is not None:
+            vivas &= ~(1 << escrito)
+        for bit in lidos:
+            vivas |= 1 << bit
+        return vivas
+
+    return ResultadoFluxo(grafo, universo, entrada, saida, transferir, para_frente=False)
+
+
+# ----------------------------------------------------------------------
+# Definições alcançantes
+# ----------------------------------------------------------------------
+def definicoes_alcancantes(grafo):
+    """
+    Definições (índices de instrução no corpo) que alcançam cada ponto sem
+    serem reescritas no caminho. Só as definições explícitas do corpo contam:
+    alterações de globais feitas por funções chamadas não são modeladas.
+    """
+    universo = Universo()
+    corpo = grafo.corpo
+    destinos = [definicao(q) for q in corpo]
+    bits_por_variavel = {}
+    for i, destino in enumerate(destinos):
+        if destino is not None:
+            bits_por_variavel.setdefault(destino, []).append(universo.bit(i))
+    # Matar todas as definições da variável e depois gerar a própria dá o
+    # mesmo resultado que matar só as outras; assim a máscara de cada
+    # variável é uma só, montada uma vez e compartilhada pelos blocos e pelas
+    # instruções. Uma variável com uma definição só não mata nada além dela.
+    por_variavel = {}
+
+    def mortas_por(destino):
+        mortas = por_variavel.get(destino)
+        if mortas is None:
+            bits = bits_por_variavel[destino]
+            mortas = por_variavel[destino] = mascara_de_bits(bits) if len(bits) > 1 else 0
+        return mortas
+
+    gera, mata = [], []
+    for bloco in grafo.blocos:
+        ultima = {}
+        for i in range(bloco.inicio, bloco.fim):
+            if destinos[i] is not None:
+                ultima[destinos[i]] = universo.bit_do_item[i]
+        gera.append(mascara_de_bits(list(ultima.values())))
+        m = 0
+        for destino in ultima:
+            m |= mortas_por(destino)
+        mata.append(m)
+
+    entrada, saida = resolver(grafo, gera, mata, para_frente=True)
+
+    def transferir(i, alcancam):
+        destino = destinos[i]
+        if destino is None:
+            return alcancam
+        return (alcancam & ~mortas_por(destino)) | (1 << universo.bit_do_item[i])
+
+    return ResultadoFluxo(grafo, universo, entrada, saida, transferir, para_frente=True)
+
+
+# ----------------------------------------------------------------------
+# Expressões disponíveis
+# ----------------------------------------------------------------------
+def chave_expressao(q):
+    """(op, arg1, arg2) com os operandos das operações comutativas ordenados."""
+    a, b = q.arg1, q.arg2
+    if q.op in COMUTATIVAS and b < a:
+        a, b = b, a
+    return (q.op, a, b)
+
+
+def expressoes_disponiveis(grafo):
+    """
+    Expressões binárias já calculadas em todo caminho até cada ponto, sem que
+    os operandos tenham sido reescritos depois. Uma chamada invalida as
+    expressões que leem variáveis globais.
+    """
+    universo = Universo()
+    corpo = grafo.corpo
+    bits = [universo.bit(chave_expressao(q)) if q.op in BINARIAS else None for q in corpo]
+
+    def sem_globais(operandos):
+        return all(eh_literal(o) or grafo.eh_local(o) for o in operandos)
+
+    # variável -> bits das expressões que a leem
+    leitoras = {}
+    globais = []
+    for chave, bit in universo.bit_do_item.items():
+        for operando in set(chave[1:]):
+            leitoras.setdefault(operando, []).append(bit)
+        if not sem_globais(chave[1:]):
+            globais.append(bit)
+    mascara_globais = mascara_de_bits(globais)
+    # variável -> máscara das expressões que a leem, montada uma vez
+    por_variavel = {}
+
+    def lidas_por(variavel):
+        mortas = por_variavel.get(variavel)
+        if mortas is None:
+            mortas = por_variavel[variavel] = mascara_de_bits(leitoras.get(variavel, ()))
+        return mortas
+
+    gera, mata = [], []
+    for bloco in grafo.blocos:
+        # de trás para a frente: uma expressão do bloco sai disponível se
+        # nenhuma instrução depois dela reescreve os seus operandos
+        escritas_depois = set()
+        chamada_depois = False
+        geradas = []
+        for i in reversed(range(bloco.inicio, bloco.fim)):
+            q = corpo[i]
+            destino = definicao(q)
+            if destino is not None:
+                escritas_depois.add(destino)
+            if q.op == Op.CHAMADA:
+                chamada_depois = True
+            if bits[i] is not None:
+                operandos = (q.arg1, q.arg2)
+                if any(o in escritas_depois for o in operandos):
+                    continue
+                if chamada_depois and not sem_globais(operandos):
+                    continue
+                geradas.append(bits[i])
+        gera.append(mascara_de_bits(geradas))
+
+        m = mascara_globais if chamada_depois else 0
+        for variavel in escritas_depois:
+            m |= lidas_por(variavel)
+        mata.append(m)
+
+    entrada, saida = resolver(grafo, gera, mata, para_frente=True, intersecao=True,
+                              inicial=universo.todos)
+
+    def transferir(i, disponiveis):
+        q = corpo[i]
+        destino = definicao(q)
+        if destino is not None:
+            disponiveis &= ~lidas_por(destino)
+        if q.op == Op.CHAMADA:
+            disponiveis &= ~mascara_globais
+        if bits[i] is not None and not (corpo[i].resultado in (corpo[i].arg1, corpo[i].arg2)):
+            disponiveis |= 1 << bits[i]
+        return disponiveis
+
+    return ResultadoFluxo(grafo, universo, entrada, saida, transferir, para_frente=True)
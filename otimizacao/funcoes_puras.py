@@ -0,0 +1,253 @@
+"""
+Avaliação em tempo de compilação de chamadas a funções puras.
+
+Uma função é pura quando não tem `escreva`, não escreve nem lê variáveis
+globais e só chama funções puras: o resultado depende apenas dos argumentos.
+Uma chamada `param c1; ...; param cn; t := call f, n` a uma função pura com
+todos os argumentos constantes é executada por um interpretador do TAC e vira
+`t := resultado`.
+
+A avaliação desiste (e a chamada fica como está) quando passa de
+LIMITE_PASSOS instruções, de LIMITE_PROFUNDIDADE chamadas aninhadas ou quando
+a execução falharia (divisão por zero): o erro fica para a execução. Também
+desiste quando um valor calculado passa do que cabe num literal. Os
+resultados, inclusive os das chamadas feitas durante a avaliação, ficam num
+CacheAvaliacoes indexado por (função, argumentos).
+"""
+from collections import OrderedDict
+
+from intermediario.quadruplas import BINARIAS, OPERACOES, Op, Quadrupla, eh_literal, eh_temporario, literal, valor_literal
+from otimizacao.comum import (
+    INICIA_BLOCO,
+    TERMINA_BLOCO,
+    cabe_em_literal,
+    definicao,
+    juntar_corpos,
+    separar_corpos,
+    usos,
+)
+
+# Instruções executadas numa avaliação (somando as chamadas internas)
+LIMITE_PASSOS = 10000
+LIMITE_PROFUNDIDADE = 200
+
+# Valor guardado no cache quando a avaliação desistiu
+DESISTENCIA = type('Desistencia', (), {'__repr__': lambda self: 'DESISTENCIA'})()
+
+
+class _Desistir(Exception):
+    pass
+
+
+class CacheAvaliacoes:
+    """
+    Resultados de chamadas já avaliadas, indexados por (função, argumentos).
+
+    Args:
+        limite (int): quantidade máxima de resultados mantidos (LRU).
+    """
+
+    def __init__(self, limite=1024):
+        self.limite = limite
+        self._memoria = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave):
+        """Resultado guardado (ou DESISTENCIA), ou None se a chamada ainda não foi avaliada."""
+        valor = self._memoria.get(chave)
+        if valor is None:
+            self.falhas += 1
+            return None
+        self._memoria.move_to_end(chave)
+        self.acertos += 1
+        return valor
+
+    def guardar(self, chave, valor):
+        self._memoria[chave] = valor
+        if len(self._memoria) > self.limite:
+            self._memoria.popitem(last=False)
+
+
+def funcoes_puras(corpos):
+    """
+    Args:
+        corpos (list): saída de separar_corpos.
+
+    Returns:
+        set: nomes das funções puras.
+    """
+    chamadas = {}
+    puras = set()
+    for marca, corpo, _ in corpos[1:]:
+        locais = frozenset(marca.arg1) | frozenset(marca.arg2)
+        if all(_sem_efeitos(q, locais) for q in corpo):
+            puras.add(marca.resultado)
+            chamadas[marca.resultado] = {q.arg1 for q in corpo if q.op == Op.CHAMADA}
+    # uma função que chama uma impura também é impura
+    mudou = True
+    while mudou:
+        mudou = False
+        for nome in list(puras):
+            if not chamadas[nome] <= puras:
+                puras.discard(nome)
+                mudou = True
+    return puras
+
+
+def _sem_efeitos(q, locais):
+    if q.op == Op.ESCREVA:
+        return False
+    nomes = usos(q)
+    destino = definicao(q)
+    if destino is not None:
+        nomes.append(destino)
+    return all(eh_temporario(v) or v in locais for v in nomes)
+
+
+class _Funcao:
+    __slots__ = ('parametros', 'corpo', 'rotulos')
+
+    def __init__(self, marca, corpo):
+        self.parametros = marca.arg1
+        self.corpo = corpo
+        self.rotulos = {q.resultado: i for i, q in enumerate(corpo) if q.op == Op.ROTULO}
+
+
+class _Avaliador:
+    def __init__(self, funcoes, cache):
+        self.funcoes = funcoes
+        self.cache = cache
+        self.restantes = 0
+
+    def avaliar(self, nome, argumentos):
+        """Resultado da chamada, ou DESISTENCIA."""
+        self.restantes = LIMITE_PASSOS
+        try:
+            return self.chamar(nome, argumentos, 0)
+        except _Desistir:
+            self.cache.guardar(_chave(nome, argumentos), DESISTENCIA)
+            return DESISTENCIA
+
+    def chamar(self, nome, argumentos, profundidade):
+        chave = _chave(nome, argumentos)
+        valor = self.cache.obter(chave)
+        if valor is DESISTENCIA:
+            raise _Desistir()
+        if valor is None:
+            if profundidade > LIMITE_PROFUNDIDADE:
+                raise _Desistir()
+            valor = self._executar(self.funcoes[nome], argumentos, profundidade)
+            self.cache.guardar(chave, valor)
+        return valor
+
+    def _executar(self, funcao, argumentos, profundidade):
+        quadro = dict(zip(funcao.parametros, argumentos))
+
+        def valor(operando):
+            if eh_literal(operando):
+                return valor_literal(operando)
+            return quadro.get(operando, 0)
+
+        corpo = funcao.corpo
+        pendentes = []
+        pc = 0
+        while pc < len(corpo):
+            self.restantes -= 1
+            if self.restantes < 0:
+                raise _Desistir()
+            q = corpo[pc]
+            pc += 1
+            op = q.op
+            if op in BINARIAS:
+                try:
+                    resultado = OPERACOES[op](valor(q.arg1), valor(q.arg2))
+                except Exception:
+                    raise _Desistir()
+                if not cabe_em_literal(resultado):
+                    raise _Desistir()
+                quadro[q.resultado] = resultado
+            elif op == Op.COPIA:
+                quadro[q.resultado] = valor(q.arg1)
+            elif op == Op.PARAM:
+                pendentes.append(valor(q.arg1))
+            elif op == Op.CHAMADA:
+                chamada = self.funcoes[q.arg1]
+                if q.arg2 != len(chamada.parametros):
+                    raise _Desistir()
+                argumentos = tuple(pendentes[len(pendentes) - q.arg2:])
+                del pendentes[len(pendentes) - q.arg2:]
+                resultado = self.chamar(q.arg1, argumentos, profundidade + 1)
+                if q.resultado is not None:
+                    quadro[q.resultado] = resultado
+            elif op == Op.RETORNO:
+                return valor(q.arg1)
+            elif op == Op.SE:
+                if valor(q.arg1):
+                    pc = funcao.rotulos[q.resultado]
+            elif op == Op.SE_NAO:
+                if not valor(q.arg1):
+                    pc = funcao.rotulos[q.resultado]
+            elif op == Op.GOTO:
+                pc = funcao.rotulos[q.resultado]
+        # ao passar do fim, o valor padrão do slot de retorno
+        return 0
+
+
+def _chave(nome, argumentos):
+    # pelo texto do literal: True e 1 são argumentos diferentes
+    return nome, tuple(literal(a) for a in argumentos)
+
+
+def _avaliar_corpo(corpo, avaliador, info):
+    novo = []
+    constantes = {}  # temporário -> literal, dentro do bloco
+    for q in corpo:
+        if q.op in INICIA_BLOCO:
+            constantes.clear()
+        if q.op == Op.CHAMADA and q.resultado is not None and q.arg1 in avaliador.funcoes:
+            n = q.arg2
+            inicio = len(novo) - n
+            parametros = novo[inicio:] if inicio >= 0 else ()
+            if len(parametros) == n == len(avaliador.funcoes[q.arg1].parametros) \
+                    and all(p.op == Op.PARAM for p in parametros):
+                argumentos = [constantes.get(p.arg1, p.arg1) for p in parametros]
+                if all(eh_literal(a) for a in argumentos):
+                    resultado = avaliador.avaliar(q.arg1, tuple(valor_literal(a) for a in argumentos))
+                    if resultado is not DESISTENCIA:
+                        del novo[inicio:]
+                        q = Quadrupla(Op.COPIA, q.resultado, literal(resultado))
+                        info['chamadas_avaliadas'] += 1
+        destino = definicao(q)
+        if destino is not None:
+            constantes.pop(destino, None)
+            if q.op == Op.COPIA and eh_temporario(destino) and eh_literal(q.arg1):
+                constantes[destino] = q.arg1
+        novo.append(q)
+        if q.op in TERMINA_BLOCO:
+            constantes.clear()
+    return novo
+
+
+def avaliar_funcoes_puras(codigo, cache=None):
+    """
+    Args:
+        codigo (list): lista de Quadrupla.
+        cache (CacheAvaliacoes): resultados já conhecidos; None usa um cache novo.
+            As chaves são os nomes das funções, então o cache só vale para
+            este código.
+
+    Returns:
+        tuple: (novo código, dict com as contagens do passo)
+    """
+    cache = CacheAvaliacoes() if cache is None else cache
+    corpos = separar_corpos(codigo)
+    puras = funcoes_puras(corpos)
+    funcoes = {marca.resultado: _Funcao(marca, corpo) for marca, corpo, _ in corpos[1:]
+               if marca.resultado in puras}
+    info = {'funcoes_puras': len(funcoes), 'chamadas_avaliadas': 0}
+    if funcoes:
+        avaliador = _Avaliador(funcoes, cache)
+        corpos = [(marca, _avaliar_corpo(corpo, avaliador, info), fim) for marca, corpo, fim in corpos]
+    info['acertos_cache'] = cache.acertos
+    return juntar_corpos(corpos), info
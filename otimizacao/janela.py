@@ -0,0 +1,209 @@
+"""
+Otimização por janela (peephole) dirigida por uma tabela de regras.
+
+Cada Regra tem um padrão (as operações de instruções consecutivas) e uma
+função que recebe a janela e o Contexto do corpo e devolve as instruções que a
+substituem, ou None quando a regra não se aplica. A varredura passa as
+instruções para a saída uma a uma e, a cada uma, tenta as regras cujo padrão
+termina na operação dela; as instruções de uma reescrita voltam para a
+entrada, para que as janelas que elas formam com as vizinhas também sejam
+tentadas. Cada varredura é linear no tamanho do corpo, e elas se repetem até
+que nenhuma regra se aplique (uma reescrita pode mudar as contagens de
+leitura que outra regra consulta).
+
+Para acrescentar regras, basta passar outra tabela:
+`otimizar_janela(codigo, REGRAS + (Regra('minha', (Op.COPIA,), funcao),))`.
+Uma reescrita não pode devolver mais instruções do que a janela tinha, senão a
+varredura pode não terminar.
+"""
+from collections import Counter
+
+from intermediario.quadruplas import BINARIAS, DESVIOS, Op, Quadrupla, eh_literal, eh_temporario, literal, valor_literal
+from otimizacao.comum import DEFINICOES, eh_variavel, juntar_corpos, separar_corpos, usos
+
+_INVERSO = {Op.SE: Op.SE_NAO, Op.SE_NAO: Op.SE}
+
+
+class Regra:
+    """
+    Args:
+        nome (str): nome usado nas estatísticas.
+        padrao (tuple): uma operação (Op) ou um conjunto de operações por
+            instrução da janela.
+        reescrever: função (janela, contexto) -> lista de Quadrupla ou None.
+    """
+    __slots__ = ('nome', 'padrao', 'reescrever')
+
+    def __init__(self, nome, padrao, reescrever):
+        self.nome = nome
+        self.padrao = tuple(frozenset((p,)) if isinstance(p, Op) else frozenset(p) for p in padrao)
+        self.reescrever = reescrever
+
+    def __repr__(self):
+        return f"Regra({self.nome}, {len(self.padrao)} instruções)"
+
+
+class Contexto:
+    """Contagem de leituras de cada variável no corpo, mantida em dia a cada reescrita."""
+
+    def __init__(self, corpo):
+        self.leituras = Counter(v for q in corpo for v in usos(q))
+
+    def lido_so_aqui(self, nome):
+        """Temporário com uma única leitura no corpo: morto depois dela."""
+        return eh_temporario(nome) and self.leituras[nome] == 1
+
+    def trocar(self, antigas, novas):
+        for q in antigas:
+            self.leituras.subtract(usos(q))
+        for q in novas:
+            self.leituras.update(usos(q))
+
+
+# ----------------------------------------------------------------------
+# Regras
+# ----------------------------------------------------------------------
+def _expressao_em_copia(janela, contexto):
+    # _t := a op b; x := _t  ->  x := a op b
+    calculo, copia = janela
+    if copia.arg1 == calculo.resultado and contexto.lido_so_aqui(calculo.resultado):
+        return [Quadrupla(calculo.op, copia.resultado, calculo.arg1, calculo.arg2)]
+    return None
+
+
+def _copia_inutil(janela, contexto):
+    # x := x
+    copia, = janela
+    return [] if copia.arg1 == copia.resultado else None
+
+
+# (operação, literal à direita) -> a expressão vale o outro operando
+_NEUTROS_DIREITA = {(Op.SOMA, 0), (Op.SUB, 0), (Op.MULT, 1), (Op.DIV, 1), (Op.E, True)}
+# (operação, literal à esquerda); `x || falso` fica, pois com x = 0 dá falso
+_NEUTROS_ESQUERDA = {(Op.SOMA, 0), (Op.MULT, 1), (Op.E, True), (Op.OU, False)}
+
+
+def _elemento_neutro(janela, contexto):
+    # x := a + 0, a * 1, verdadeiro && a, ...  ->  x := a
+    q, = janela
+    if eh_literal(q.arg2) and (q.op, valor_literal(q.arg2)) in _NEUTROS_DIREITA \
+            and type(valor_literal(q.arg2)) is (bool if q.op == Op.E else int):
+        return [Quadrupla(Op.COPIA, q.resultado, q.arg1)]
+    if eh_literal(q.arg1) and (q.op, valor_literal(q.arg1)) in _NEUTROS_ESQUERDA \
+            and type(valor_literal(q.arg1)) is (bool if q.op in (Op.E, Op.OU) else int):
+        return [Quadrupla(Op.COPIA, q.resultado, q.arg2)]
+    if q.op == Op.MULT and (q.arg1 == '0' or q.arg2 == '0'):
+        return [Quadrupla(Op.COPIA, q.resultado, literal(0))]
+    return None
+
+
+def _condicao_copiada(janela, contexto):
+    # _t := x; if _t goto L  ->  if x goto L
+    copia, desvio = janela
+    if desvio.arg1 == copia.resultado and contexto.lido_so_aqui(copia.resultado):
+        return [Quadrupla(desvio.op, desvio.resultado, copia.arg1)]
+    return None
+
+
+# (comparação, literal) -> se `x comparação literal` equivale a x (True) ou à negação de x (False)
+_COMPARACOES_BOOLEANAS = {
+    (Op.IGUAL, 'verdadeiro'): True,
+    (Op.DIFERENTE, 'falso'): True,
+    (Op.IGUAL, 'falso'): False,
+    (Op.DIFERENTE, 'verdadeiro'): False,
+}
+
+
+def _comparacao_no_desvio(janela, contexto):
+    # _t := x == verdadeiro; if _t goto L  ->  if x goto L (e, com falso, ifFalse)
+    comparacao, desvio = janela
+    if desvio.arg1 != comparacao.resultado or not contexto.lido_so_aqui(comparacao.resultado):
+        return None
+    for x, constante in ((comparacao.arg1, comparacao.arg2), (comparacao.arg2, comparacao.arg1)):
+        mesmo = _COMPARACOES_BOOLEANAS.get((comparacao.op, constante))
+        if mesmo is not None and eh_variavel(x):
+            return [Quadrupla(desvio.op if mesmo else _INVERSO[desvio.op], desvio.resultado, x)]
+    return None
+
+
+def _salto_para_seguinte(janela, contexto):
+    # goto L; L:  ->  L:
+    salto, rotulo = janela
+    return [rotulo] if salto.resultado == rotulo.resultado else None
+
+
+def _desvio_sobre_salto(janela, contexto):
+    # if t goto L1; goto L2; L1:  ->  ifFalse t goto L2; L1:
+    desvio, salto, rotulo = janela
+    if desvio.resultado == rotulo.resultado:
+        return [Quadrupla(_INVERSO[desvio.op], salto.resultado, desvio.arg1), rotulo]
+    return None
+
+
+REGRAS = (
+    Regra('expressao_em_copia', (DEFINICOES, Op.COPIA), _expressao_em_copia),
+    Regra('copia_inutil', (Op.COPIA,), _copia_inutil),
+    Regra('elemento_neutro', (BINARIAS,), _elemento_neutro),
+    Regra('condicao_copiada', (Op.COPIA, DESVIOS), _condicao_copiada),
+    Regra('comparacao_no_desvio', ((Op.IGUAL, Op.DIFERENTE), DESVIOS), _comparacao_no_desvio),
+    Regra('salto_para_seguinte', (DESVIOS | {Op.GOTO}, Op.ROTULO), _salto_para_seguinte),
+    Regra('desvio_sobre_salto', (DESVIOS, Op.GOTO, Op.ROTULO), _desvio_sobre_salto),
+)
+
+
+# ----------------------------------------------------------------------
+# Varredura
+# ----------------------------------------------------------------------
+def _varrer(corpo, por_ultima, contexto, aplicacoes):
+    saida = []
+    entrada = corpo[::-1]
+    mudou = False
+    while entrada:
+        q = entrada.pop()
+        saida.append(q)
+        for regra in por_ultima.get(q.op, ()):
+            n = len(regra.padrao)
+            if n > len(saida):
+                continue
+            janela = saida[-n:]
+            if not all(j.op in p for j, p in zip(janela, regra.padrao)):
+                continue
+            novas = regra.reescrever(janela, contexto)
+            if novas is None:
+                continue
+            del saida[-n:]
+            contexto.trocar(janela, novas)
+            aplicacoes[regra.nome] += 1
+            entrada.extend(reversed(novas))
+            mudou = True
+            break
+    return saida, mudou
+
+
+def otimizar_janela(codigo, regras=REGRAS):
+    """
+    Args:
+        codigo (list): lista de Quadrupla.
+        regras (iterable): tabela de Regra, tentadas na ordem dada.
+
+    Returns:
+        tuple: (novo código, dict com as contagens do passo, por regra em `por_regra`)
+    """
+    por_ultima = {}
+    for regra in regras:
+        for op in regra.padrao[-1]:
+            por_ultima.setdefault(op, []).append(regra)
+    aplicacoes = Counter({regra.nome: 0 for regra in regras})
+
+    antes = len(codigo)
+    corpos = []
+    for marca, corpo, fim in separar_corpos(codigo):
+        contexto = Contexto(corpo)
+        mudou = True
+        while mudou:
+            corpo, mudou = _varrer(corpo, por_ultima, contexto, aplicacoes)
+        corpos.append((marca, corpo, fim))
+    codigo = juntar_corpos(corpos)
+    info = {'aplicacoes': sum(aplicacoes.values()), 'instrucoes_removidas': antes - len(codigo),
+            'por_regra': dict(aplicacoes)}
+    return codigo, info
@@ -0,0 +1,273 @@
+"""
+Otimização de laços: movimentação de código invariante e redução de força.
+
+Os laços naturais saem das arestas de volta do grafo de fluxo (o `goto` para o
+rótulo de início que `enquanto` gera): o cabeçalho domina a origem da aresta
+e o corpo são os blocos que chegam a ela sem passar pelo cabeçalho. O
+pré-cabeçalho é o ponto logo antes do rótulo do cabeçalho, quando o laço só é
+alcançado de fora caindo nele.
+
+Uma instrução `x := a op b` sai do laço para o pré-cabeçalho quando:
+- os operandos são literais, não são escritos no laço ou vêm de outra
+  instrução invariante já movida;
+- x é local (temporário, parâmetro ou variável local), é escrito uma única vez
+  no laço e não está vivo na entrada do cabeçalho;
+- x não está vivo nas saídas do laço ou a instrução domina todas as saídas;
+- não é uma divisão que possa falhar (o laço pode não executar nenhuma vez).
+Globais só contam como invariantes em laços sem chamadas.
+
+Redução de força: para uma variável de indução básica `i := i ± c` (única
+escrita de i no laço, c literal), cada `t := i * k` com k literal vira
+`t := s`, com `s := i * k` no pré-cabeçalho e `s := s ± c*k` logo depois do
+incremento de i.
+"""
+from intermediario.quadruplas import BINARIAS, SALTOS, Op, Quadrupla, eh_literal, literal, valor_literal
+from otimizacao.cfg import grafos_por_funcao
+from otimizacao.comum import definicao, eh_variavel, juntar_corpos, nomes_livres, pode_falhar
+from otimizacao.fluxo_dados import vivacidade
+from otimizacao.ssa import dominadores
+
+
+class Laco:
+    __slots__ = ('cabecalho', 'blocos', 'saidas', 'destinos_saida')
+
+    def __init__(self, cabecalho, blocos):
+        self.cabecalho = cabecalho
+        self.blocos = blocos
+        self.saidas = []           # blocos do laço com aresta para fora
+        self.destinos_saida = []   # blocos de fora alcançados por essas arestas
+
+    def __repr__(self):
+        return f"Laco(cabecalho={self.cabecalho}, {len(self.blocos)} blocos)"
+
+
+class _ArvoreDominadores:
+    """Consulta `a domina b` em tempo constante pela numeração da árvore."""
+
+    def __init__(self, idom):
+        filhos = [[] for _ in idom]
+        raiz = None
+        for n, pai in enumerate(idom):
+            if pai is None:
+                continue
+            if pai == n:
+                raiz = n
+            else:
+                filhos[pai].append(n)
+        self.entrada = [-1] * len(idom)
+        self.saida = [-1] * len(idom)
+        relogio = 0
+        pilha = [(raiz, False)] if raiz is not None else []
+        while pilha:
+            n, saindo = pilha.pop()
+            if saindo:
+                self.saida[n] = relogio
+                relogio += 1
+                continue
+            self.entrada[n] = relogio
+            relogio += 1
+            pilha.append((n, True))
+            pilha.extend((f, False) for f in filhos[n])
+
+    def domina(self, a, b):
+        return self.entrada[a] != -1 and self.entrada[b] != -1 \
+            and self.entrada[a] <= self.entrada[b] and self.saida[b] <= self.saida[a]
+
+
+def lacos_naturais(grafo, arvore=None):
+    """
+    Laços naturais do grafo, um por cabeçalho, dos mais externos para os mais
+    internos.
+    """
+    if arvore is None:
+        arvore = _ArvoreDominadores(dominadores(grafo))
+    blocos = grafo.blocos
+    corpos = {}
+    for bloco in blocos:
+        for s in bloco.sucessores:
+            if arvore.domina(s, bloco.indice):
+                corpo = corpos.setdefault(s, {s})
+                pendentes = [bloco.indice]
+                while pendentes:
+                    n = pendentes.pop()
+                    if n not in corpo:
+                        corpo.add(n)
+                        pendentes.extend(blocos[n].predecessores)
+
+    lacos = []
+    for cabecalho, corpo in corpos.items():
+        laco = Laco(cabecalho, corpo)
+        for n in sorted(corpo):
+            for s in blocos[n].sucessores:
+                if s not in corpo:
+                    if not laco.saidas or laco.saidas[-1] != n:
+                        laco.saidas.append(n)
+                    laco.destinos_saida.append(s)
+        lacos.append(laco)
+    lacos.sort(key=lambda laco: (-len(laco.blocos), laco.cabecalho))
+    return lacos
+
+
+def _tem_pre_cabecalho(grafo, laco):
+    """O laço só é alcançado de fora caindo no rótulo do cabeçalho (ou é o início do corpo)."""
+    cabecalho = grafo.blocos[laco.cabecalho]
+    de_fora = [p for p in cabecalho.predecessores if p not in laco.blocos]
+    if laco.cabecalho == 0:
+        return not de_fora
+    if de_fora != [laco.cabecalho - 1]:
+        return False
+    # um salto para o rótulo pularia o código posto antes dele
+    ultima = grafo.corpo[grafo.blocos[laco.cabecalho - 1].fim - 1]
+    return not (ultima.op in SALTOS and grafo.bloco_do_rotulo[ultima.resultado] == laco.cabecalho)
+
+
+class _Otimizacao:
+    def __init__(self, grafo, temporarios, info):
+        self.grafo = grafo
+        self.corpo = grafo.corpo
+        self.temporarios = temporarios
+        self.info = info
+        self.arvore = _ArvoreDominadores(dominadores(grafo))
+        self.vivas = vivacidade(grafo)
+        self.bloco_de = [0] * len(self.corpo)
+        for bloco in grafo.blocos:
+            for i in range(bloco.inicio, bloco.fim):
+                self.bloco_de[i] = bloco.indice
+        self.movidas = set()     # índices das instruções tiradas do lugar
+        self.antes_de = {}       # índice -> instruções inseridas antes dele
+        self.depois_de = {}      # índice -> instruções inseridas depois dele
+        self.trocadas = {}       # índice -> nova instrução
+
+    def viva_na_entrada(self, nome, n):
+        bit = self.vivas.universo.bit_do_item.get(nome)
+        return bit is not None and self.vivas.entrada[n] >> bit & 1
+
+    def otimizar(self):
+        for laco in lacos_naturais(self.grafo, self.arvore):
+            if not _tem_pre_cabecalho(self.grafo, laco):
+                continue
+            self.info['lacos'] += 1
+            indices = [i for n in sorted(laco.blocos)
+                       for i in range(self.grafo.blocos[n].inicio, self.grafo.blocos[n].fim)
+                       if i not in self.movidas]
+            escritas = {}
+            tem_chamada = False
+            for i in indices:
+                destino = definicao(self.corpo[i])
+                if destino is not None:
+                    escritas[destino] = escritas.get(destino, 0) + 1
+                tem_chamada = tem_chamada or self.corpo[i].op == Op.CHAMADA
+            pre_cabecalho = self.grafo.blocos[laco.cabecalho].inicio
+            movidas = self._mover_invariantes(laco, indices, escritas, tem_chamada)
+            reduzidas = self._reduzir_forca(laco, indices, escritas, tem_chamada)
+            if movidas or reduzidas:
+                self.antes_de.setdefault(pre_cabecalho, []).extend(movidas + reduzidas)
+
+    def _invariante(self, operando, escritas, tem_chamada, movidos):
+        if not eh_variavel(operando):
+            return True
+        if operando in movidos:
+            return True
+        if operando in escritas:
+            return False
+        return self.grafo.eh_local(operando) or not tem_chamada
+
+    def _mover_invariantes(self, laco, indices, escritas, tem_chamada):
+        movidos = set()
+        escolhidas = []
+        mudou = True
+        while mudou:
+            mudou = False
+            for i in indices:
+                q = self.corpo[i]
+                if i in self.movidas or not (q.op in BINARIAS or q.op == Op.COPIA) or pode_falhar(q):
+                    continue
+                destino = q.resultado
+                if not self.grafo.eh_local(destino) or escritas.get(destino) != 1 \
+                        or self.viva_na_entrada(destino, laco.cabecalho):
+                    continue
+                if not all(self._invariante(o, escritas, tem_chamada, movidos) for o in (q.arg1, q.arg2)
+                           if o is not None):
+                    continue
+                bloco = self.bloco_de[i]
+                if any(self.viva_na_entrada(destino, s) for s in laco.destinos_saida) \
+                        and not all(self.arvore.domina(bloco, s) for s in laco.saidas):
+                    continue
+                self.movidas.add(i)
+                movidos.add(destino)
+                escolhidas.append(i)
+                mudou = True
+        self.info['invariantes_movidas'] += len(escolhidas)
+        return [self.corpo[i] for i in sorted(escolhidas)]
+
+    def _reduzir_forca(self, laco, indices, escritas, tem_chamada):
+        # variáveis de indução básicas: i -> (índice do incremento, passo)
+        inducao = {}
+        for i in indices:
+            q = self.corpo[i]
+            destino = definicao(q)
+            if destino is None or escritas.get(destino) != 1 or i in self.movidas or i in self.trocadas:
+                continue
+            if not (self.grafo.eh_local(destino) or not tem_chamada):
+                continue
+            if q.op == Op.SOMA and q.arg1 == destino and _inteiro(q.arg2):
+                inducao[destino] = (i, valor_literal(q.arg2))
+            elif q.op == Op.SOMA and q.arg2 == destino and _inteiro(q.arg1):
+                inducao[destino] = (i, valor_literal(q.arg1))
+            elif q.op == Op.SUB and q.arg1 == destino and _inteiro(q.arg2):
+                inducao[destino] = (i, -valor_literal(q.arg2))
+
+        iniciais = []
+        reduzidos = {}  # (i, k) -> temporário que guarda i * k
+        for i in indices:
+            q = self.corpo[i]
+            if q.op != Op.MULT or i in self.movidas or i in self.trocadas:
+                continue
+            if q.arg1 in inducao and _inteiro(q.arg2):
+                variavel, fator = q.arg1, q.arg2
+            elif q.arg2 in inducao and _inteiro(q.arg1):
+                variavel, fator = q.arg2, q.arg1
+            else:
+                continue
+            k = valor_literal(fator)
+            guarda = reduzidos.get((variavel, k))
+            if guarda is None:
+                guarda = reduzidos[(variavel, k)] = next(self.temporarios)
+                iniciais.append(Quadrupla(Op.MULT, guarda, variavel, fator))
+                incremento, passo = inducao[variavel]
+                self.depois_de.setdefault(incremento, []).append(
+                    Quadrupla(Op.SOMA, guarda, guarda, literal(passo * k)))
+            self.trocadas[i] = Quadrupla(Op.COPIA, q.resultado, guarda)
+            self.info['reducoes_de_forca'] += 1
+        return iniciais
+
+    def corpo_novo(self):
+        novo = []
+        for i, q in enumerate(self.corpo):
+            novo.extend(self.antes_de.get(i, ()))
+            if i not in self.movidas:
+                novo.append(self.trocadas.get(i, q))
+            novo.extend(self.depois_de.get(i, ()))
+        return novo
+
+
+def _inteiro(operando):
+    return eh_literal(operando) and type(valor_literal(operando)) is int
+
+
+def otimizar_lacos(codigo):
+    """
+    Args:
+        codigo (list): lista de Quadrupla.
+
+    Returns:
+        tuple: (novo código, dict com as contagens do passo)
+    """
+    info = {'lacos': 0, 'invariantes_movidas': 0, 'reducoes_de_forca': 0}
+    temporarios = nomes_livres(codigo, '_t')
+    corpos = []
+    for grafo in grafos_por_funcao(codigo):
+        otimizacao = _Otimizacao(grafo, temporarios, info)
+        otimizacao.otimizar()
+        corpos.append((grafo.marca, otimizacao.corpo_novo(), grafo.fim))
+    return juntar_corpos(corpos), info
@@ -0,0 +1,99 @@
+"""
+Numeração de valores local (eliminação de subexpressões comuns por bloco
+básico).
+
+Cada valor calculado no bloco recebe um número; duas operações com a mesma
+operação e os mesmos números nos operandos calculam o mesmo valor, e a segunda
+vira uma cópia da variável que ainda guarda o resultado da primeira. Uma
+atribuição (`:=`) dá um número novo à variável escrita e uma chamada invalida
+os números das variáveis globais, que a função chamada pode ter alterado.
+As cópias geradas são eliminadas depois pela propagação de cópias.
+"""
+from itertools import count
+
+from intermediario.quadruplas import BINARIAS, COMUTATIVAS, Op, Quadrupla, eh_literal
+from otimizacao.comum import INICIA_BLOCO, TERMINA_BLOCO, Escopos
+
+
+class _Bloco:
+    def __init__(self, numeros, escopos):
+        self.numeros = numeros
+        self.escopos = escopos
+        self.valor_de = {}    # variável (ou literal) -> número do valor
+        self.expressoes = {}  # (op, número, número) -> número do resultado
+        self.guardado = {}    # número -> variáveis que o guardam
+        self.globais = set()  # globais com número no bloco
+
+    def _registrar(self, nome):
+        if not eh_literal(nome) and not self.escopos.eh_local(nome):
+            self.globais.add(nome)
+
+    def numero(self, operando):
+        numero = self.valor_de.get(operando)
+        if numero is None:
+            numero = self.valor_de[operando] = next(self.numeros)
+            self._registrar(operando)
+        return numero
+
+    def atribuir(self, variavel, numero):
+        self.valor_de[variavel] = numero
+        self.guardado.setdefault(numero, []).append(variavel)
+        self._registrar(variavel)
+
+    def quem_guarda(self, numero):
+        for variavel in self.guardado.get(numero, ()):
+            if self.valor_de.get(variavel) == numero:
+                return variavel
+        return None
+
+    def esquecer_globais(self):
+        for variavel in self.globais:
+            self.valor_de.pop(variavel, None)
+        self.globais.clear()
+
+
+def numerar_valores(codigo):
+    """
+    Args:
+        codigo (list): lista de Quadrupla.
+
+    Returns:
+        tuple: (novo código, dict com as contagens do passo)
+    """
+    info = {'subexpressoes_eliminadas': 0}
+    numeros = count()
+    escopos = Escopos()
+    bloco = _Bloco(numeros, escopos)
+    resultado = []
+
+    for q in codigo:
+        if q.op in INICIA_BLOCO:
+            escopos.atualizar(q)
+            bloco = _Bloco(numeros, escopos)
+            resultado.append(q)
+            continue
+
+        if q.op in BINARIAS:
+            a, b = bloco.numero(q.arg1), bloco.numero(q.arg2)
+            if q.op in COMUTATIVAS and b < a:
+                a, b = b, a
+            chave = (q.op, a, b)
+            numero = bloco.expressoes.get(chave)
+            guarda = bloco.quem_guarda(numero) if numero is not None else None
+            if guarda is not None:
+                q = Quadrupla(Op.COPIA, q.resultado, guarda)
+                info['subexpressoes_eliminadas'] += 1
+            else:
+                numero = bloco.expressoes[chave] = next(numeros)
+            bloco.atribuir(q.resultado, numero)
+        elif q.op == Op.COPIA:
+            bloco.atribuir(q.resultado, bloco.numero(q.arg1))
+        elif q.op == Op.CHAMADA:
+            bloco.esquecer_globais()
+            if q.resultado is not None:
+                bloco.atribuir(q.resultado, next(numeros))
+
+        resultado.append(q)
+        if q.op in TERMINA_BLOCO:
+            bloco = _Bloco(numeros, escopos)
+    return resultado, info
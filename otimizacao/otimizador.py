@@ -0,0 +1,75 @@
+"""
+Ponto de entrada das otimizações do TAC, organizado por nível (-O0, -O1, ...).
+"""
+from intermediario.enderecamento import verificar_aninhamento
+from otimizacao.alocacao_temporarios import alocar_temporarios
+from otimizacao.expansao_funcoes import expandir_funcoes
+from otimizacao.fluxo_controle import limpar_fluxo
+from otimizacao.funcoes_puras import avaliar_funcoes_puras
+from otimizacao.janela import otimizar_janela
+from otimizacao.lacos import otimizar_lacos
+from otimizacao.numeracao_valores import numerar_valores
+from otimizacao.propagacao_condicional import propagar_constantes_condicional
+from otimizacao.propagacao_constantes import propagar_constantes
+
+# Passes executados, em ordem, em cada nível de otimização
+PASSES = {
+    0: (),
+    1: (propagar_constantes, otimizar_janela, propagar_constantes_condicional, avaliar_funcoes_puras, otimizar_lacos,
+        numerar_valores, propagar_constantes, limpar_fluxo, otimizar_janela),
+    2: (expandir_funcoes, propagar_constantes, otimizar_janela, propagar_constantes_condicional, avaliar_funcoes_puras,
+        otimizar_lacos, numerar_valores, propagar_constantes, limpar_fluxo, otimizar_janela, alocar_temporarios),
+}
+NIVEL_MAXIMO = max(PASSES)
+
+
+def otimizar(codigo, nivel=1, registradores=None, limite_expansao=None):
+    """
+    Aplica os passes do nível pedido ao código de três endereços.
+
+    Args:
+        registradores (int): limite de temporários por função na alocação
+            (nível 2 em diante); os excedentes são derramados para a memória.
+        limite_expansao (int): tamanho máximo, em instruções, das funções
+            expandidas em linha (nível 2 em diante); None usa o padrão.
+
+    Returns:
+        tuple: (novo código, relatório {nome do passo: contagens})
+    """
+    if nivel not in PASSES:
+        raise ValueError(f"Nível de otimização inválido: {nivel}. Use de 0 a {NIVEL_MAXIMO}.")
+    verificar_aninhamento(codigo)
+    relatorio = {}
+    antes = len(codigo)
+    for passo in PASSES[nivel]:
+        if passo is alocar_temporarios:
+            codigo, info = passo(codigo, registradores)
+        elif passo is expandir_funcoes:
+            codigo, info = passo(codigo, limite_expansao)
+        else:
+            codigo, info = passo(codigo)
+        anterior = relatorio.get(passo.__name__)
+        if anterior is not None:
+            # um passo repetido soma as contagens
+            info = {nome: _somar(anterior[nome], valor) for nome, valor in info.items()}
+        relatorio[passo.__name__] = info
+    relatorio['total'] = {'instrucoes_antes': antes, 'instrucoes_depois': len(codigo),
+                          'instrucoes_removidas': antes - len(codigo)}
+    return codigo, relatorio
+
+
+def _somar(anterior, valor):
+    if isinstance(valor, dict):
+        return {chave: _somar(anterior.get(chave, 0), v) for chave, v in valor.items()}
+    return anterior + valor if isinstance(valor, int) else valor
+
+
+def formatar_relatorio(relatorio):
+    linhas = []
+    for passo, info in relatorio.items():
+        contagens = ', '.join(f"{nome}={valor}" for nome, valor in info.items() if not isinstance(valor, dict))
+        linhas.append(f"  {passo}: {contagens}")
+        for nome, valor in info.items():
+            if isinstance(valor, dict):
+                linhas.append(f"    {nome}: " + ', '.join(f"{chave}={v}" for chave, v in valor.items()))
+    return '\n'.join(linhas)
@@ -0,0 +1,220 @@
+"""
+Propagação de constantes condicional esparsa (SCCP, Wegman e Zadeck) sobre a
+forma SSA de cada corpo.
+
+Cada versão começa indefinida e só desce no reticulado (indefinida ->
+constante -> variável); um bloco só é avaliado quando alguma aresta que chega
+a ele se mostra executável. Assim, `x := 0; enquanto (x > 0) { ... }` tem o
+corpo do laço removido: a aresta de volta nunca é executável, a φ de `x` no
+cabeçalho fica com o valor 0 e o desvio do laço sempre sai. Depois da análise
+os usos constantes viram literais, os desvios com condição constante viram
+`goto` (ou somem), os blocos não executáveis são removidos e o corpo volta ao
+TAC comum por sair_ssa.
+"""
+from intermediario.quadruplas import BINARIAS, DESVIOS, OPERACOES, Op, Quadrupla, eh_literal, literal, valor_literal
+from otimizacao.cfg import grafos_por_funcao
+from otimizacao.comum import cabe_em_literal, definicao, juntar_corpos, substituir_usos, usos
+from otimizacao.ssa import FormaSSA, sair_ssa
+
+# Extremos do reticulado; as constantes são os próprios valores (int ou bool)
+INDEFINIDO = type('Indefinido', (), {'__repr__': lambda self: 'INDEFINIDO'})()
+VARIAVEL = type('Variavel', (), {'__repr__': lambda self: 'VARIAVEL'})()
+
+
+def _iguais(a, b):
+    # True == 1 em Python, mas são constantes diferentes
+    return a is b or (type(a) is type(b) and a == b)
+
+
+def encontro(a, b):
+    if a is INDEFINIDO:
+        return b
+    if b is INDEFINIDO or _iguais(a, b):
+        return a
+    return VARIAVEL
+
+
+def _avaliar_binaria(op, a, b):
+    # só o operando da esquerda decide sozinho: `x && falso` é o próprio x
+    # quando x é falso (0, numa booleana nunca atribuída)
+    if op == Op.E and a is False:
+        return False
+    if op == Op.OU and a is True:
+        return True
+    if a is VARIAVEL or b is VARIAVEL:
+        return VARIAVEL
+    if a is INDEFINIDO or b is INDEFINIDO:
+        return INDEFINIDO
+    try:
+        valor = OPERACOES[op](a, b)
+    except Exception:
+        # a divisão por zero fica para o erro de execução
+        return VARIAVEL
+    return valor if cabe_em_literal(valor) else VARIAVEL
+
+
+class _Propagacao:
+    def __init__(self, forma):
+        self.forma = forma
+        grafo = forma.grafo
+        self.corpo = forma.corpo
+        self.blocos = grafo.blocos
+        self.bloco_de = [0] * len(self.corpo)
+        for bloco in self.blocos:
+            for i in range(bloco.inicio, bloco.fim):
+                self.bloco_de[i] = bloco.indice
+
+        # as versões definidas no corpo começam indefinidas; as demais (valor
+        # de entrada e globais alteradas por chamadas) são variáveis
+        self.valor = {}
+        self.usuarios = {}  # versão -> [('phi', bloco, Phi) ou ('instrucao', i)]
+        for n, phis in enumerate(forma.phis):
+            for phi in phis:
+                self.valor[phi.resultado] = INDEFINIDO
+                for argumento in phi.argumentos:
+                    if argumento is not None:
+                        self.usuarios.setdefault(argumento, []).append(('phi', n, phi))
+        for i, q in enumerate(self.corpo):
+            destino = definicao(q)
+            if destino is not None:
+                self.valor[destino] = INDEFINIDO
+            for v in usos(q):
+                self.usuarios.setdefault(v, []).append(('instrucao', i))
+
+        self.visitado = [False] * len(self.blocos)
+        self.arestas = set()
+
+    def valor_de(self, operando):
+        if eh_literal(operando):
+            return valor_literal(operando)
+        return self.valor.get(operando, VARIAVEL)
+
+    def resolver(self):
+        fluxo = [(None, 0)] if self.blocos else []
+        ssa = []
+        while fluxo or ssa:
+            while fluxo:
+                origem, destino = fluxo.pop()
+                if (origem, destino) in self.arestas:
+                    continue
+                self.arestas.add((origem, destino))
+                if not self.visitado[destino]:
+                    self.visitado[destino] = True
+                    bloco = self.blocos[destino]
+                    for phi in self.forma.phis[destino]:
+                        self._avaliar_phi(destino, phi, ssa)
+                    for i in range(bloco.inicio, bloco.fim):
+                        self._avaliar(i, ssa, fluxo)
+                    if self.corpo[bloco.fim - 1].op not in DESVIOS:
+                        fluxo.extend((destino, s) for s in self._saidas(bloco))
+                else:
+                    for phi in self.forma.phis[destino]:
+                        self._avaliar_phi(destino, phi, ssa)
+            while ssa and not fluxo:
+                for tipo, n, *resto in self.usuarios.get(ssa.pop(), ()):
+                    if tipo == 'phi':
+                        if self.visitado[n]:
+                            self._avaliar_phi(n, resto[0], ssa)
+                    elif self.visitado[self.bloco_de[n]]:
+                        self._avaliar(n, ssa, fluxo)
+
+    def _mudar(self, nome, novo, ssa):
+        antigo = self.valor[nome]
+        if not _iguais(antigo, novo):
+            self.valor[nome] = novo
+            ssa.append(nome)
+
+    def _avaliar_phi(self, n, phi, ssa):
+        bloco = self.blocos[n]
+        valor = INDEFINIDO
+        for k, argumento in enumerate(phi.argumentos):
+            origem = bloco.predecessores[k] if k < len(bloco.predecessores) else None
+            if (origem, n) in self.arestas:
+                valor = encontro(valor, self.valor_de(argumento))
+        self._mudar(phi.resultado, valor, ssa)
+
+    def _avaliar(self, i, ssa, fluxo):
+        q = self.corpo[i]
+        if q.op in BINARIAS:
+            self._mudar(q.resultado, _avaliar_binaria(q.op, self.valor_de(q.arg1), self.valor_de(q.arg2)), ssa)
+        elif q.op == Op.COPIA:
+            self._mudar(q.resultado, self.valor_de(q.arg1), ssa)
+        elif q.op == Op.CHAMADA:
+            if q.resultado is not None:
+                self._mudar(q.resultado, VARIAVEL, ssa)
+        elif q.op in DESVIOS:
+            n = self.bloco_de[i]
+            fluxo.extend((n, s) for s in self._saidas(self.blocos[n]))
+
+    def _saidas(self, bloco):
+        """Blocos seguintes que a última instrução do bloco pode alcançar, dado o valor atual da condição."""
+        seguinte = [bloco.indice + 1] if bloco.indice + 1 < len(self.blocos) else []
+        ultima = self.corpo[bloco.fim - 1]
+        if ultima.op == Op.RETORNO:
+            return []
+        if ultima.op == Op.GOTO:
+            return [self.forma.grafo.bloco_do_rotulo[ultima.resultado]]
+        if ultima.op not in DESVIOS:
+            return seguinte
+        alvo = [self.forma.grafo.bloco_do_rotulo[ultima.resultado]]
+        condicao = self.valor_de(ultima.arg1)
+        if condicao is INDEFINIDO:
+            return []
+        if condicao is VARIAVEL:
+            return alvo + seguinte
+        return alvo if bool(condicao) == (ultima.op == Op.SE) else seguinte
+
+
+def propagar_corpo(grafo, info):
+    """
+    Returns:
+        list: o corpo em TAC, já fora da SSA.
+    """
+    forma = FormaSSA(grafo)
+    propagacao = _Propagacao(forma)
+    propagacao.resolver()
+
+    constantes = {}
+    for nome, valor in propagacao.valor.items():
+        if valor is not INDEFINIDO and valor is not VARIAVEL:
+            constantes[nome] = literal(valor)
+
+    corpo = forma.corpo
+    for bloco in grafo.blocos:
+        if not propagacao.visitado[bloco.indice]:
+            info['blocos_removidos'] += 1
+            continue
+        for i in range(bloco.inicio, bloco.fim):
+            q = corpo[i]
+            if q.op in DESVIOS and (q.arg1 in constantes or eh_literal(q.arg1)):
+                info['desvios_resolvidos'] += 1
+                condicao = valor_literal(constantes.get(q.arg1, q.arg1))
+                corpo[i] = Quadrupla(Op.GOTO, q.resultado) if condicao == (q.op == Op.SE) else None
+                continue
+            destino = definicao(q)
+            if destino in constantes and q.op != Op.CHAMADA:
+                if q.op != Op.COPIA or q.arg1 != constantes[destino]:
+                    info['constantes_propagadas'] += 1
+                corpo[i] = Quadrupla(Op.COPIA, destino, constantes[destino])
+                continue
+            novo = substituir_usos(q, constantes)
+            if novo is not q:
+                info['constantes_propagadas'] += 1
+            corpo[i] = novo
+    return sair_ssa(forma, (n for n, visitado in enumerate(propagacao.visitado) if visitado))
+
+
+def propagar_constantes_condicional(codigo):
+    """
+    Args:
+        codigo (list): lista de Quadrupla.
+
+    Returns:
+        tuple: (novo código, dict com as contagens do passo)
+    """
+    info = {'constantes_propagadas': 0, 'desvios_resolvidos': 0, 'blocos_removidos': 0}
+    antes = len(codigo)
+    corpos = [(grafo.marca, propagar_corpo(grafo, info), grafo.fim) for grafo in grafos_por_funcao(codigo)]
+    codigo = juntar_corpos(corpos)
+    info['instrucoes_removidas'] = antes - len(codigo)
+    return codigo, info
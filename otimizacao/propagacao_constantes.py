@@ -0,0 +1,187 @@
+"""
+Dobramento de constantes e propagação de constantes e cópias no TAC.
+
+Dentro de cada bloco básico, os operandos são trocados pelo valor constante ou
+pela variável de que são cópia; operações com todos os operandos constantes
+(aritméticas, relacionais, && e ||) são avaliadas em tempo de compilação, e
+desvios com condição constante viram `goto` ou somem. Ao final, as definições
+de temporários que nunca são lidos são removidas, e o par `_tN := expr;
+x := _tN` que toda atribuição gera vira `x := expr`.
+"""
+from collections import Counter
+
+from intermediario.quadruplas import (
+    BINARIAS,
+    DESVIOS,
+    OPERACOES,
+    Op,
+    Quadrupla,
+    eh_literal,
+    eh_temporario,
+    literal,
+    valor_literal,
+)
+from otimizacao.comum import (
+    INICIA_BLOCO,
+    TERMINA_BLOCO,
+    Escopos,
+    cabe_em_literal,
+    definicao,
+    pode_falhar,
+    substituir_usos,
+    usos,
+)
+
+
+def _dobrar(q):
+    if not (eh_literal(q.arg1) and eh_literal(q.arg2)):
+        return None
+    a = valor_literal(q.arg1)
+    b = valor_literal(q.arg2)
+    if q.op == Op.DIV and b == 0:
+        # a divisão por zero fica para o erro de execução
+        return None
+    valor = OPERACOES[q.op](a, b)
+    if not cabe_em_literal(valor):
+        return None
+    return literal(valor)
+
+
+class _Valores(dict):
+    """nome -> literal ou variável de que é cópia, com o índice inverso das cópias."""
+
+    def __init__(self):
+        super().__init__()
+        self.copias_de = {}  # variável -> nomes que são cópia dela
+
+    def definir(self, nome, valor):
+        self[nome] = valor
+        self.copias_de.setdefault(valor, set()).add(nome)
+
+    def esquecer(self, nome):
+        valor = self.pop(nome, None)
+        if valor is not None:
+            self.copias_de[valor].discard(nome)
+        for copia in self.copias_de.pop(nome, ()):
+            del self[copia]
+
+    def clear(self):
+        super().clear()
+        self.copias_de.clear()
+
+
+def _propagar(codigo, info):
+    resultado = []
+    valores = _Valores()
+    escopos = Escopos()
+
+    for q in codigo:
+        op = q.op
+        if op in INICIA_BLOCO:
+            valores.clear()
+            escopos.atualizar(q)
+            resultado.append(q)
+            continue
+
+        q = substituir_usos(q, valores)
+
+        if op in BINARIAS:
+            valor = _dobrar(q)
+            if valor is not None:
+                q = Quadrupla(Op.COPIA, q.resultado, valor)
+                info['dobradas'] += 1
+        elif op in DESVIOS and eh_literal(q.arg1):
+            info['desvios_resolvidos'] += 1
+            if valor_literal(q.arg1) == (op == Op.SE):
+                q = Quadrupla(Op.GOTO, q.resultado)
+            else:
+                continue
+
+        destino = definicao(q)
+        if destino is not None:
+            valores.esquecer(destino)
+        if q.op == Op.CHAMADA:
+            # a função chamada pode alterar qualquer variável global
+            for chave in [c for c, v in valores.items()
+                          if not escopos.eh_local(c) or (not eh_literal(v) and not escopos.eh_local(v))]:
+                valores.esquecer(chave)
+        elif q.op == Op.COPIA and q.arg1 != destino:
+            valores.definir(destino, q.arg1)
+
+        resultado.append(q)
+        if q.op in TERMINA_BLOCO:
+            valores.clear()
+    return resultado
+
+
+def remover_temporarios_mortos(codigo, info=None):
+    """
+    Remove definições de temporários que nunca são lidos (chamadas são
+    mantidas, sem o destino). Divisões que podem falhar ficam, para que o
+    erro de execução continue acontecendo.
+    """
+    leituras = Counter()
+    definicoes = {}
+    for i, q in enumerate(codigo):
+        leituras.update(usos(q))
+        destino = definicao(q)
+        if destino is not None and eh_temporario(destino) and not pode_falhar(q):
+            definicoes.setdefault(destino, []).append(i)
+
+    # remover uma definição pode deixar sem leitura os temporários que ela lia
+    removida = [False] * len(codigo)
+    pendentes = [t for t in definicoes if not leituras[t]]
+    removidas = 0
+    while pendentes:
+        for i in definicoes.pop(pendentes.pop(), ()):
+            removida[i] = True
+            removidas += 1
+            if codigo[i].op == Op.CHAMADA:
+                continue
+            for lido in usos(codigo[i]):
+                leituras[lido] -= 1
+                if not leituras[lido] and lido in definicoes:
+                    pendentes.append(lido)
+
+    if info is not None:
+        info['temporarios_removidos'] = info.get('temporarios_removidos', 0) + removidas
+    novo = []
+    for q, morta in zip(codigo, removida):
+        if not morta:
+            novo.append(q)
+        elif q.op == Op.CHAMADA:
+            novo.append(Quadrupla(Op.CHAMADA, None, q.arg1, q.arg2))
+    return novo
+
+
+def coalescer_copias(codigo):
+    """Troca `_tN := expr` seguido de `x := _tN` por `x := expr` quando _tN não é lido em outro lugar."""
+    leituras = Counter()
+    for q in codigo:
+        leituras.update(usos(q))
+    resultado = []
+    for q in codigo:
+        if (q.op == Op.COPIA and resultado and eh_temporario(q.arg1) and leituras[q.arg1] == 1
+                and definicao(resultado[-1]) == q.arg1):
+            anterior = resultado[-1]
+            resultado[-1] = Quadrupla(anterior.op, q.resultado, anterior.arg1, anterior.arg2)
+            continue
+        resultado.append(q)
+    return resultado
+
+
+def propagar_constantes(codigo):
+    """
+    Args:
+        codigo (list): lista de Quadrupla.
+
+    Returns:
+        tuple: (novo código, dict com as contagens do passo)
+    """
+    info = {'dobradas': 0, 'desvios_resolvidos': 0, 'temporarios_removidos': 0}
+    antes = len(codigo)
+    codigo = _propagar(codigo, info)
+    codigo = remover_temporarios_mortos(codigo, info)
+    codigo = coalescer_copias(codigo)
+    info['instrucoes_removidas'] = antes - len(codigo)
+    return codigo, info
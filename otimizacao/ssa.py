@@ -0,0 +1,325 @@
+"""
+Forma SSA (atribuição estática única) de um corpo do TAC.
+
+Sobre o GrafoFluxo do corpo: árvore de dominadores (Cooper, Harvey e
+Kennedy), fronteiras de dominância, funções φ nos rótulos de junção de
+`se`/`enquanto` e renomeação pela árvore de dominadores. Cada definição de
+`x` passa a ser uma versão `x.N` (o ponto não aparece em identificadores);
+`x.0` é o valor na entrada do corpo.
+
+Só recebem φ as variáveis vivas na entrada do bloco de junção (SSA podada,
+com a vivacidade de otimizacao.fluxo_dados). Uma chamada pode alterar as
+variáveis globais que o corpo lê; a versão que ela define para cada global só
+é criada quando alguma leitura posterior precisa dela, para que corpos com
+muitas chamadas e muitas globais não criem globais × chamadas versões.
+
+Os passes sobre a SSA só trocam operandos por constantes e removem blocos,
+sem mover definições: as versões de uma variável nunca ficam vivas ao mesmo
+tempo, e sair_ssa volta cada versão ao nome original e descarta as φ.
+"""
+from intermediario.quadruplas import Op, Quadrupla
+from otimizacao.comum import definicao, eh_variavel, renomear, substituir_usos, usos
+from otimizacao.fluxo_dados import vivacidade
+
+SEPARADOR = '.'
+
+
+def versao(nome, numero):
+    return f"{nome}{SEPARADOR}{numero}"
+
+
+def nome_original(nome):
+    return nome.split(SEPARADOR, 1)[0]
+
+
+class Phi:
+    """
+    resultado := φ(argumentos), um argumento por predecessor do bloco (na
+    ordem de bloco.predecessores) e, no bloco de entrada que também é alvo de
+    saltos, mais um para o valor que chega do início do corpo.
+    """
+    __slots__ = ('variavel', 'resultado', 'argumentos')
+
+    def __init__(self, variavel, quantidade):
+        self.variavel = variavel
+        self.resultado = variavel
+        self.argumentos = [None] * quantidade
+
+    def __repr__(self):
+        return f"{self.resultado} := phi({', '.join(map(str, self.argumentos))})"
+
+
+def dominadores(grafo, ordem=None):
+    """
+    Dominador imediato de cada bloco (o da entrada é ela mesma; blocos
+    inalcançáveis ficam com None).
+    """
+    ordem = grafo.ordem_reversa_pos() if ordem is None else ordem
+    blocos = grafo.blocos
+    idom = [None] * len(blocos)
+    if not ordem:
+        return idom
+    posicao = [0] * len(blocos)
+    for p, n in enumerate(ordem):
+        posicao[n] = p
+    idom[ordem[0]] = ordem[0]
+
+    def intersecao(a, b):
+        while a != b:
+            while posicao[a] > posicao[b]:
+                a = idom[a]
+            while posicao[b] > posicao[a]:
+                b = idom[b]
+        return a
+
+    mudou = True
+    while mudou:
+        mudou = False
+        for n in ordem[1:]:
+            novo = None
+            for p in blocos[n].predecessores:
+                if idom[p] is not None:
+                    novo = p if novo is None else intersecao(p, novo)
+            if idom[n] != novo:
+                idom[n] = novo
+                mudou = True
+    return idom
+
+
+def fronteiras_dominancia(grafo, idom):
+    fronteiras = [[] for _ in grafo.blocos]
+    for bloco in grafo.blocos:
+        n = bloco.indice
+        if idom[n] is None or len(bloco.predecessores) < 2 and n != 0:
+            continue
+        for p in bloco.predecessores:
+            corredor = p
+            # a entrada domina tudo, mas é fronteira de quem salta de volta para ela
+            while idom[corredor] is not None and (corredor != idom[n] or n == 0):
+                if not fronteiras[corredor] or fronteiras[corredor][-1] != n:
+                    fronteiras[corredor].append(n)
+                if corredor == idom[corredor]:
+                    break
+                corredor = idom[corredor]
+    return fronteiras
+
+
+def _fronteira_iterada(fronteiras, origens):
+    resultado = set()
+    pendentes = list(origens)
+    vistos = set(origens)
+    while pendentes:
+        for f in fronteiras[pendentes.pop()]:
+            if f not in resultado:
+                resultado.add(f)
+                if f not in vistos:
+                    vistos.add(f)
+                    pendentes.append(f)
+    return resultado
+
+
+class FormaSSA:
+    """
+    Args:
+        grafo (GrafoFluxo): grafo do corpo; o corpo original não é alterado.
+
+    Atributos:
+        corpo (list): instruções renomeadas, nas mesmas posições do corpo.
+        phis (list): lista de Phi de cada bloco.
+        idom (list): dominador imediato de cada bloco.
+        alcancaveis (list): índices dos blocos alcançáveis, em pós-ordem reversa.
+        globais_lidas (frozenset): globais lidas no corpo, que as chamadas invalidam.
+    """
+
+    def __init__(self, grafo):
+        self.grafo = grafo
+        self.corpo = list(grafo.corpo)
+        self.phis = [[] for _ in grafo.blocos]
+        self.alcancaveis = grafo.ordem_reversa_pos()
+        self.idom = dominadores(grafo, self.alcancaveis)
+        self.entrada_com_saltos = bool(grafo.blocos and grafo.blocos[0].predecessores)
+        self.globais_lidas = frozenset(
+            v for q in grafo.corpo for v in usos(q) if not grafo.eh_local(v))
+        self._contador = {}
+        self._posicionar_phis()
+        self._renomear()
+
+    def argumentos_phi(self, bloco):
+        return len(bloco.predecessores) + (1 if bloco.indice == 0 and self.entrada_com_saltos else 0)
+
+    def _posicionar_phis(self):
+        grafo = self.grafo
+        if not self.alcancaveis:
+            return
+        fronteiras = fronteiras_dominancia(grafo, self.idom)
+        vivas = vivacidade(grafo)
+        universo = vivas.universo
+
+        blocos_que_definem = {}
+        blocos_com_chamada = []
+        for bloco in grafo.blocos:
+            if self.idom[bloco.indice] is None:
+                continue
+            for i in range(bloco.inicio, bloco.fim):
+                q = grafo.corpo[i]
+                destino = definicao(q)
+                if destino is not None and destino in universo.bit_do_item:
+                    lista = blocos_que_definem.setdefault(destino, [])
+                    if not lista or lista[-1] != bloco.indice:
+                        lista.append(bloco.indice)
+                if q.op == Op.CHAMADA and (not blocos_com_chamada or blocos_com_chamada[-1] != bloco.indice):
+                    blocos_com_chamada.append(bloco.indice)
+
+        colocar = [set() for _ in grafo.blocos]
+        for v, origens in blocos_que_definem.items():
+            bit = universo.bit_do_item[v]
+            for n in _fronteira_iterada(fronteiras, origens):
+                if vivas.entrada[n] >> bit & 1:
+                    colocar[n].add(v)
+        if blocos_com_chamada and self.globais_lidas:
+            # a fronteira iterada de uma união é a união das fronteiras: a
+            # das chamadas é calculada uma vez só para todas as globais
+            for n in _fronteira_iterada(fronteiras, blocos_com_chamada):
+                for v in universo.itens(vivas.entrada[n]):
+                    if v in self.globais_lidas:
+                        colocar[n].add(v)
+        for bloco in grafo.blocos:
+            quantidade = self.argumentos_phi(bloco)
+            self.phis[bloco.indice] = [Phi(v, quantidade) for v in sorted(colocar[bloco.indice])]
+
+    def _nova_versao(self, nome):
+        numero = self._contador.get(nome, 0) + 1
+        self._contador[nome] = numero
+        return versao(nome, numero)
+
+    def _renomear(self):
+        grafo = self.grafo
+        corpo = self.corpo
+        blocos = grafo.blocos
+        filhos = [[] for _ in blocos]
+        for n in self.alcancaveis[1:]:
+            filhos[self.idom[n]].append(n)
+
+        # nome -> pilha de (versão, sequência em que foi definida)
+        pilhas = {}
+        chamadas = []  # (sequência, índice da instrução) no caminho da árvore
+        invalidadas = {}  # (chamada, global) -> versão definida pela chamada
+        sequencia = [0]
+
+        def pilha_de(nome):
+            pilha = pilhas.get(nome)
+            if pilha is None:
+                pilha = pilhas[nome] = [(versao(nome, 0), 0)]
+            return pilha
+
+        def definir(nome, empilhados):
+            nova = self._nova_versao(nome)
+            sequencia[0] += 1
+            pilha_de(nome).append((nova, sequencia[0]))
+            empilhados.append(nome)
+            return nova
+
+        def ler(nome, empilhados):
+            pilha = pilha_de(nome)
+            atual, definida_em = pilha[-1]
+            if chamadas and chamadas[-1][0] > definida_em and nome in self.globais_lidas:
+                momento, i = chamadas[-1]
+                atual = invalidadas.get((i, nome))
+                if atual is None:
+                    atual = invalidadas[(i, nome)] = self._nova_versao(nome)
+                pilha.append((atual, momento))
+                empilhados.append(nome)
+            return atual
+
+        saida_virtual = self.entrada_com_saltos
+        pendentes = [(self.alcancaveis[0], False)] if self.alcancaveis else []
+        desfazer = {}
+        while pendentes:
+            n, saindo = pendentes.pop()
+            if saindo:
+                empilhados, chamadas_no_bloco = desfazer.pop(n)
+                for nome in empilhados:
+                    pilhas[nome].pop()
+                del chamadas[len(chamadas) - chamadas_no_bloco:]
+                continue
+
+            empilhados = []
+            chamadas_no_bloco = 0
+            bloco = blocos[n]
+            if n == 0 and saida_virtual:
+                for phi in self.phis[0]:
+                    phi.argumentos[-1] = versao(phi.variavel, 0)
+            for phi in self.phis[n]:
+                phi.resultado = definir(phi.variavel, empilhados)
+            for i in range(bloco.inicio, bloco.fim):
+                q = corpo[i]
+                lidos = usos(q)
+                if lidos:
+                    q = substituir_usos(q, {v: ler(v, empilhados) for v in lidos})
+                if q.op == Op.CHAMADA:
+                    # a chamada altera as globais antes de o resultado ser escrito
+                    sequencia[0] += 1
+                    chamadas.append((sequencia[0], i))
+                    chamadas_no_bloco += 1
+                destino = definicao(q)
+                if destino is not None:
+                    q = Quadrupla(q.op, definir(destino, empilhados), q.arg1, q.arg2)
+                corpo[i] = q
+            for s in bloco.sucessores:
+                k = blocos[s].predecessores.index(n)
+                for phi in self.phis[s]:
+                    phi.argumentos[k] = ler(phi.variavel, empilhados)
+            desfazer[n] = (empilhados, chamadas_no_bloco)
+            pendentes.append((n, True))
+            pendentes.extend((f, False) for f in reversed(filhos[n]))
+
+    def listagem(self):
+        """Texto da forma SSA, com as φ logo depois dos rótulos de cada bloco."""
+        linhas = []
+        for bloco in self.grafo.blocos:
+            i = bloco.inicio
+            while i < bloco.fim and self.corpo[i].op == Op.ROTULO:
+                linhas.append(str(self.corpo[i]))
+                i += 1
+            linhas.extend(repr(phi) for phi in self.phis[bloco.indice])
+            linhas.extend(str(q) for q in self.corpo[i:bloco.fim] if q is not None)
+        return linhas
+
+
+def sair_ssa(forma, blocos=None):
+    """
+    Volta da SSA para o TAC comum: as φ são descartadas e cada versão volta ao
+    nome original.
+
+    Args:
+        forma (FormaSSA): forma SSA (possivelmente já transformada).
+        blocos (iterable): índices dos blocos mantidos, em qualquer ordem;
+            None mantém todos. Instruções trocadas por None são descartadas.
+
+    Returns:
+        list: o corpo em TAC, com os blocos na ordem original.
+    """
+    manter = None if blocos is None else set(blocos)
+    mapa = _OriginalDe()
+    corpo = []
+    for bloco in forma.grafo.blocos:
+        if manter is not None and bloco.indice not in manter:
+            continue
+        for i in range(bloco.inicio, bloco.fim):
+            q = forma.corpo[i]
+            if q is not None:
+                corpo.append(renomear(q, mapa))
+    return corpo
+
+
+class _OriginalDe:
+    """Mapa versão -> nome original, no formato que renomear espera."""
+
+    def get(self, nome, padrao=None):
+        return nome_original(nome) if eh_variavel(nome) else padrao
+
+    def __contains__(self, nome):
+        return eh_variavel(nome) and SEPARADOR in nome
+
+    def __getitem__(self, nome):
+        return nome_original(nome)
@@ -1,9 +1,118 @@
-class TabelaSimbolos:
-    def __init__(self, escopo='global', anterior=None, tipo_retorno=None):
-        self.simbolos = {}
-        self.escopo = escopo
-        self.anterior = anterior # para referência ao escopo anterior
+from intermediario.enderecamento import SLOT_RETORNO, enderecar
+from intermediario.quadruplas import OPERADORES_BINARIOS, PREFIXO_TEMPORARIO, Op, Quadrupla, eh_literal, eh_temporario, formatar
+from lexico.analisador_lexico import FluxoTokens, IndiceLinhas
+from sintatico.cache_funcoes import EntradaCache, chave_declaracao, fim_declaracao
+from sintatico.cursor_tokens import CursorTokens
+
+
+# Precedência dos operadores binários nas expressões (maior liga mais forte).
+# `e` e `ou` ficam no mesmo nível e associam à esquerda, como os demais; os
+# relacionais não se encadeiam.
+NIVEL_LOGICO, NIVEL_RELACIONAL, NIVEL_ADITIVO, NIVEL_MULTIPLICATIVO = 1, 2, 3, 4
+PRECEDENCIA = {
+    'AND': NIVEL_LOGICO, 'OR': NIVEL_LOGICO,
+    'IGUAL': NIVEL_RELACIONAL, 'DIFERENTE': NIVEL_RELACIONAL, 'MENOR': NIVEL_RELACIONAL,
+    'MAIOR': NIVEL_RELACIONAL, 'MENORIGUAL': NIVEL_RELACIONAL, 'MAIORIGUAL': NIVEL_RELACIONAL,
+    'SOMA': NIVEL_ADITIVO, 'SUB': NIVEL_ADITIVO,
+    'MULT': NIVEL_MULTIPLICATIVO, 'DIV': NIVEL_MULTIPLICATIVO,
+}
+# Operadores prefixados, que ligam mais forte que os binários:
+# token -> (símbolo, tipo do operando e do resultado, descrição para o erro)
+UNARIOS = {'SUB': ('-', 'INT', 'um inteiro'), 'NOT': ('!', 'BOOL', 'um booleano')}
+# Tipo dos dois operandos de cada nível; os relacionais aceitam quaisquer tipos iguais
+TIPOS_OPERANDOS = {NIVEL_LOGICO: 'BOOL', NIVEL_ADITIVO: 'INT', NIVEL_MULTIPLICATIVO: 'INT'}
+OPERANDOS_LITERAIS = {'NUMERO': 'INT', 'STRING_LITERAL': 'STRING', 'TRUE': 'BOOL', 'FALSE': 'BOOL'}
+
+# Marcas da pilha de operadores de Parser.expressao, onde os binários guardam o nível (>= 1)
+_GRUPO, _CHAMADA, _UNARIO = 0, -1, -2
+
+
+class Simbolo:
+    """
+    Entrada da tabela de símbolos; `nivel` é a profundidade do escopo que a
+    declarou e `slot`, a posição de variáveis e parâmetros na área global ou
+    no quadro da função (None para funções e procedimentos).
+    """
+    __slots__ = ('nome', 'tipo', 'categoria', 'parametros', 'retorno', 'nivel', 'slot')
+
+    def __init__(self, nome, tipo, categoria, parametros=None, retorno=None, nivel=0, slot=None):
+        self.nome = nome
+        self.tipo = tipo
+        self.categoria = categoria
+        self.parametros = parametros
+        self.retorno = retorno
+        self.nivel = nivel
+        self.slot = slot
+
+    def __repr__(self):
+        return f"Simbolo({self.nome}, {self.tipo}, {self.categoria})"
+
+    def assinatura(self):
+        return self.nome, self.tipo, self.categoria, self.parametros, self.retorno
+
+
+class Escopo:
+    __slots__ = ('nome', 'tipo_retorno', 'nomes', 'proximo_slot')
+
+    def __init__(self, nome, tipo_retorno=None, primeiro_slot=0):
+        self.nome = nome
         self.tipo_retorno = tipo_retorno
+        self.nomes = []  # declarados neste escopo, desfeitos ao sair dele
+        self.proximo_slot = primeiro_slot
+
+
+class TabelaSimbolos:
+    """
+    Pilha de escopos achatada: cada nome aponta para a pilha das suas
+    declarações (a do topo é a visível) e cada escopo guarda os nomes que
+    declarou. Entrar num escopo e buscar um nome custam O(1); sair custa o
+    número de nomes do escopo.
+    """
+
+    def __init__(self, escopo='global', estatisticas=None):
+        self.ligacoes = {}
+        self.escopos = [Escopo(escopo)]
+        self.estatisticas = estatisticas
+        # globais declaradas por predeclarar e ainda não encontradas no código
+        self.predeclarados = set()
+
+    @property
+    def escopo(self):
+        return self.escopos[-1].nome
+
+    def entrar_escopo(self, nome, tipo_retorno=None):
+        # no quadro da função, os slots começam depois do valor de retorno
+        self.escopos.append(Escopo(nome, tipo_retorno, SLOT_RETORNO + 1))
+
+    def sair_escopo(self):
+        escopo = self.escopos.pop()
+        for nome in escopo.nomes:
+            pilha = self.ligacoes[nome]
+            pilha.pop()
+            if not pilha:
+                del self.ligacoes[nome]
+        return escopo
+
+    def tipo_retorno(self):
+        """Tipo de retorno da função mais interna, ou None fora de funções."""
+        for escopo in reversed(self.escopos):
+            if escopo.tipo_retorno is not None:
+                return escopo.tipo_retorno
+        return None
+
+    def simbolos(self):
+        """Símbolos declarados no escopo atual, na ordem de declaração (e dos slots)."""
+        return [self.ligacoes[nome][-1] for nome in self.escopos[-1].nomes]
+
+
+    def obter(self, nome):
+        """Símbolo visível com esse nome, ou None."""
+        pilha = self.ligacoes.get(nome)
+        if self.estatisticas is not None:
+            # escopos entre o atual e o da declaração, como numa cadeia de tabelas
+            profundidade = len(self.escopos) - pilha[-1].nivel if pilha else len(self.escopos)
+            self.estatisticas.registrar_busca(profundidade)
+        return pilha[-1] if pilha else None
 
 
     def verificarCondicao(self, identificador):
@@ -14,63 +123,88 @@ class TabelaSimbolos:
             identificador (str): Nome do identificador a ser buscado.
 
         Returns:
-            dict: Entrada correspondente na tabela de símbolos, se encontrada.
+            Simbolo: Entrada correspondente na tabela de símbolos, se encontrada.
 
         Raises:
             Exception: Se o identificador não for encontrado.
         """
-        # Primeiro, verifica no escopo atual
-        if identificador in self.simbolos:
-            return self.simbolos[identificador]
-
-        # Se não estiver no escopo atual, busca no escopo anterior (escopo global ou mais acima)
-        if self.anterior:
-            return self.anterior.verificarCondicao(identificador)
-
-        # Se não for encontrado, lança um erro
-        raise Exception(f"Erro semântico: identificador '{identificador}' não declarado no escopo '{self.escopo}'.")
-
+        return self.buscar(identificador)
 
-    def adicionar(self, nome, tipo, categoria, parametros=None, retorno=None):
-        if self.existe(nome):
-            raise Exception(f"Erro semântico: identificador '{nome}' já declarado no escopo '{self.escopo}'.")
 
-        self.simbolos[nome] = {
-            'tipo': tipo,
-            'categoria': categoria,
-            'parametros': parametros,
-            'retorno': retorno
-        }
-
-
-    def buscar(self, nome):
-        if nome in self.simbolos:
-            return self.simbolos[nome]
-        elif self.anterior:  # Busca no escopo anterior
-            return self.anterior.buscar(nome)
-        else:
-            raise Exception(f"Erro semântico: identificador '{nome}' não declarado no escopo '{self.escopo}'.")
+    def predeclarar(self, assinaturas):
+        """
+        Declara no escopo global, antes da análise, os símbolos
+        (nome, tipo, categoria, parametros, retorno) da pré-varredura. A
+        primeira declaração de cada um no código, com a mesma assinatura, só
+        devolve o símbolo já existente; as seguintes são repetições.
+        """
+        for assinatura in assinaturas:
+            nome, tipo, categoria, parametros, retorno = assinatura
+            self.adicionar(nome, tipo, categoria, parametros, retorno, nivel=0)
+            self.predeclarados.add(nome)
+
+    def adicionar(self, nome, tipo, categoria, parametros=None, retorno=None, nivel=None):
+        # nivel: escopo que recebe a declaração (None é o atual; 0, o global)
+        nivel = len(self.escopos) - 1 if nivel is None else nivel
+        if eh_temporario(nome):
+            raise Exception(f"Erro semântico: identificador '{nome}' tem a forma _tN ou _tmN, "
+                            f"reservada aos temporários.")
+        pilha = self.ligacoes.setdefault(nome, [])
+        if nome in self.predeclarados and nivel == 0 \
+                and pilha[0].assinatura() == (nome, tipo, categoria, parametros, retorno):
+            self.predeclarados.discard(nome)
+            return pilha[0]
+        # a pilha está ordenada por nível: o primeiro já é visível no escopo de destino.
+        # Uma global predeclarada que o código ainda não alcançou não conta
+        # dentro dos corpos, como na análise sequencial, em que ela nem existe.
+        visiveis = pilha[1:] if nivel > 0 and nome in self.predeclarados else pilha
+        if visiveis and visiveis[0].nivel <= nivel:
+            raise Exception(f"Erro semântico: identificador '{nome}' já declarado no escopo '{self.escopos[nivel].nome}'.")
+
+        escopo = self.escopos[nivel]
+        slot = None
+        if categoria in ('variavel', 'parametro'):
+            slot = escopo.proximo_slot
+            escopo.proximo_slot += 1
+
+        posicao = len(pilha)
+        while posicao and pilha[posicao - 1].nivel > nivel:
+            posicao -= 1
+        simbolo = Simbolo(nome, tipo, categoria, parametros, retorno, nivel, slot)
+        pilha.insert(posicao, simbolo)
+        escopo.nomes.append(nome)
+        return simbolo
+
+
+    def buscar(self, nome, mensagem=None):
+        """Símbolo visível com esse nome; sem ele, Exception com `mensagem` (ou a padrão)."""
+        simbolo = self.obter(nome)
+        if simbolo is not None:
+            return simbolo
+        raise Exception(mensagem or f"Erro semântico: identificador '{nome}' não declarado no escopo '{self.escopos[0].nome}'.")
 
 
     def existe(self, nome):
-        if nome in self.simbolos:
-            return True
-        elif self.anterior:
-            return self.anterior.existe(nome)
-        return False
-
-    def entrar_escopo(self, nome, tipo_retorno=None):
-        self.escopos.append({
-            'nome': nome,
-            'simbolos': {},
-            'retorno': tipo_retorno
-        })
+        return nome in self.ligacoes
 
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
+    def __init__(self, tokens, codigo=None, estatisticas=None, cache=None):
+        # tokens pode ser uma lista, um FluxoTokens ou um gerador (ex.: gerar_tokens)
+        # cache: CacheFuncoes opcional; precisa dos tokens indexáveis (lista ou FluxoTokens)
+        if cache is not None and not isinstance(tokens, (list, FluxoTokens)):
+            raise ValueError("O cache de funções precisa da lista de tokens (analisar_codigo ou analisar_codigo_compacto).")
+        self.cache = cache
+        self.lista_tokens = tokens if isinstance(tokens, (list, FluxoTokens)) else None
+        # posição do token inicial -> (fim, função que devolve a EntradaCache), na compilação em duas fases
+        self.declaracoes_prontas = {}
+        if isinstance(tokens, FluxoTokens):
+            self.indice_linhas = tokens.indice_linhas
+        else:
+            self.indice_linhas = IndiceLinhas(codigo) if codigo is not None else None
+        self.tokens = tokens if isinstance(tokens, CursorTokens) else CursorTokens(tokens)
         self.pos = 0
-        self.tabela = TabelaSimbolos()
+        self.estatisticas = estatisticas
+        self.tabela = TabelaSimbolos(estatisticas=estatisticas)
         self.linha_atual = 1
         # self.avaliando_argumentos = False
 
@@ -79,7 +213,7 @@ class Parser:
         self.label_count = 0
 
     def novo_temp(self):
-        temp = f"_t{self.temp_count}"
+        temp = f"{PREFIXO_TEMPORARIO}{self.temp_count}"
         self.temp_count += 1
         return temp
 
@@ -88,12 +222,17 @@ class Parser:
         self.label_count += 1
         return label
 
+    def emitir(self, op, resultado=None, arg1=None, arg2=None):
+        q = Quadrupla(op, resultado, arg1, arg2)
+        self.codigo_intermediario.append(q)
+        return q
+
 
     def token_atual(self):
-        if self.pos < len(self.tokens):
-            return self.tokens[self.pos]
-            # return token.tipo, token.lexema
-        return ('EOF', '')
+        return self.tokens.espiar()
+
+    def proximo_token(self):
+        return self.tokens.espiar(1)
 
     def posicao_token(self):
         return self.pos # Ou a variável correta que armazena a posição
@@ -104,26 +243,51 @@ class Parser:
         tipo = token.tipo
         lexema = token.lexema
         if tipo == esperado:
+            self.tokens.avancar()
             self.pos += 1
             return True
         else:
             self.erro(f"Esperado '{esperado}', mas encontrado '{tipo}' ({lexema})")
 
     def erro(self, msg):
+        inicio = self.token_atual().inicio
+        if self.indice_linhas is not None and inicio is not None:
+            linha, coluna = self.indice_linhas.localizar(inicio)
+            raise SyntaxError(f"Erro sintático na linha {linha}, coluna {coluna} (token {self.pos}): {msg}")
         raise SyntaxError(f"Erro sintático na posição {self.pos}: {msg}")
 
-    def analisar(self):
+    def analisar(self, imprimir=True):
         self.programa()
 
+        if self.estatisticas is not None:
+            self.estatisticas.registrar_parser(self)
+
         if self.token_atual().tipo != 'EOF':
             token = self.token_atual()
             print(f"Token atual na posição {self.pos}: {token}")
             self.erro(f"Tokens inesperados após 'fim de programa'. Encontrado '{token.tipo}' ({token.lexema})")
 
+        if not imprimir:
+            return
+
         print("\n✓ Código analisado com sucesso!")
         print("\nCódigo de três endereços gerado:")
-        for linha in self.codigo_intermediario:
-            print(linha)
+        for quadrupla in self.codigo_intermediario:
+            print(formatar(quadrupla))
+
+    def slots_globais(self):
+        """Nomes das variáveis globais, na ordem dos slots que a tabela atribuiu."""
+        return [simbolo.nome for simbolo in self.tabela.simbolos() if simbolo.slot is not None]
+
+    def codigo_enderecado(self):
+        """
+        O TAC atual (já otimizado, se for o caso) na forma endereçada, com as
+        globais nos slots da tabela de símbolos.
+
+        Returns:
+            ProgramaEnderecado
+        """
+        return enderecar(self.codigo_intermediario, self.slots_globais())
 
 
     def programa(self):
@@ -140,28 +304,59 @@ class Parser:
                 self.comando()
 
 
-    def expressao_multiplicacao(self):
-        self.expressao_unaria()
-        while self.token_atual().tipo in ('MULT', 'DIV'):
-            self.consumir(self.token_atual().tipo)
-            self.expressao_unaria()
-
-    def expressao_unaria(self):
-        if self.token_atual().tipo in ('SUB', 'NEGACAO'):
-            self.consumir(self.token_atual().tipo)
-        self.expressao_fator()
-
-
-
     def declaracao(self):
         token = self.token_atual()
         tipo = token.tipo
         if tipo in ('INT', 'BOOL', 'STRING'):
             self.declaracao_variaveis()
         elif tipo == 'FUN':
-            self.declaracao_funcao()
+            self.declaracao_global(self.declaracao_funcao)
         elif tipo == 'PROC':
-            self.declaracao_procedimento()
+            self.declaracao_global(self.declaracao_procedimento)
+
+    def declaracao_global(self, declarar):
+        # declarações do escopo global: já compiladas (duas fases), do cache ou analisadas aqui
+        if len(self.tabela.escopos) > 1:
+            return declarar()
+        pronta = self.declaracoes_prontas.pop(self.pos, None)
+        if pronta is not None:
+            fim, obter = pronta
+            return self.emendar(obter(), fim)
+        if self.cache is None:
+            return declarar()
+        fim = fim_declaracao(self.lista_tokens, self.pos)
+        if fim is None:
+            return declarar()
+
+        def assinatura(nome):
+            pilha = self.tabela.ligacoes.get(nome)
+            return pilha[-1].assinatura() if pilha else None
+
+        chave = chave_declaracao(self.lista_tokens, self.pos, fim, assinatura)
+        entrada = self.cache.obter(chave)
+        if entrada is not None:
+            return self.emendar(entrada, fim)
+
+        inicio_codigo = len(self.codigo_intermediario)
+        temporarios, rotulos = self.temp_count, self.label_count
+        globais = self.tabela.escopos[0].nomes
+        inicio_globais = len(globais)
+        declarar()
+        # a global é a primeira da pilha (ordenada por nível)
+        simbolos = [self.tabela.ligacoes[nome][0].assinatura() for nome in globais[inicio_globais:]]
+        self.cache.guardar(chave, EntradaCache.do_codigo(
+            self.codigo_intermediario[inicio_codigo:], temporarios, rotulos,
+            self.temp_count - temporarios, self.label_count - rotulos, simbolos))
+
+    def emendar(self, entrada, fim):
+        """Acrescenta uma declaração já compilada (EntradaCache) e pula os tokens dela, até `fim`."""
+        for nome, tipo, categoria, parametros, retorno in entrada.simbolos:
+            self.tabela.adicionar(nome, tipo, categoria, parametros, retorno, nivel=0)
+        self.codigo_intermediario += entrada.codigo(self.temp_count, self.label_count)
+        self.temp_count += entrada.temporarios
+        self.label_count += entrada.rotulos
+        self.tokens.pular(fim - self.pos)
+        self.pos = fim
 
     def declaracao_variaveis(self):
         tipo_token = self.token_atual().tipo
@@ -211,62 +406,34 @@ class Parser:
         self.tipo()
         self.consumir('LBRACE')
 
-        # Criar novo escopo e adicionar à tabela de símbolos
-        escopo_anterior = self.tabela
-        self.tabela = TabelaSimbolos(escopo=nome, anterior=escopo_anterior, tipo_retorno=tipo_retorno)
+        # Criar novo escopo na tabela de símbolos
+        self.tabela.entrar_escopo(nome, tipo_retorno)
 
         # Adicionar parâmetros à tabela da função (escopo local)
         for param_nome, param_tipo in parametros:
             self.tabela.adicionar(param_nome, param_tipo, 'parametro')
 
         # Registrar a função no escopo global
-        escopo_anterior.adicionar(nome, tipo_retorno, 'funcao', parametros, tipo_retorno)
+        self.tabela.adicionar(nome, tipo_retorno, 'funcao', parametros, tipo_retorno, nivel=0)
 
+        marca = self.emitir_inicio_funcao(nome, parametros)
         self.corpo()
         self.consumir('RBRACE')
+        self.emitir_fim_funcao(marca)
 
         # Restaurar escopo anterior
-        self.tabela = escopo_anterior
-
-
-    def expressao_primaria(self):
-        token = self.token_atual()
-        tipo = token.tipo
-        lexema = token.lexema
-
-        if tipo == 'NUMERO':
-            self.consumir('NUMERO')
-            return { 'tipo': 'INT', 'lugar': lexema }
-
-        elif tipo == 'STRING_LITERAL':
-            self.consumir('STRING_LITERAL')
-            return { 'tipo': 'STRING', 'lugar': lexema }
-
-        elif tipo in ('TRUE', 'FALSE'):
-            self.consumir(tipo)
-            return { 'tipo': 'BOOL', 'lugar': lexema }
-
-        elif tipo == 'ID':
-            nome = lexema
-            if not self.tabela.existe(nome):
-                self.erro(f"Identificador '{nome}' não declarado.")
-
-            if self.pos + 1 < len(self.tokens) and self.tokens[self.pos + 1].tipo == 'LPAREN':
-                return self.chamada_funcao_com_retorno()
-
-            simbolo = self.tabela.buscar(nome)
-            self.consumir('ID')
-            return { 'tipo': simbolo['tipo'], 'lugar': nome }
+        self.tabela.sair_escopo()
 
-        elif tipo == 'LPAREN':
-            self.consumir('LPAREN')
-            resultado = self.expressao()
-            self.consumir('RPAREN')
-            return resultado
+    def emitir_inicio_funcao(self, nome, parametros):
+        marca = Quadrupla(Op.FUNCAO, nome, tuple(p for p, _ in parametros), ())
+        self.codigo_intermediario.append(marca)
+        return marca
 
-        else:
-            self.erro(f"Expressão inválida: {lexema}")
-            return { 'tipo': 'ERRO', 'lugar': '?' }
+    def emitir_fim_funcao(self, marca):
+        # as variáveis locais só são conhecidas depois de analisar o corpo
+        marca.arg2 = tuple(simbolo.nome for simbolo in self.tabela.simbolos()
+                           if simbolo.categoria == 'variavel')
+        self.emitir(Op.FIM_FUNCAO, marca.resultado)
 
 
     def declaracao_procedimento(self):
@@ -275,8 +442,7 @@ class Parser:
         self.consumir('ID')
         self.consumir('LPAREN')
 
-        escopo_anterior = self.tabela
-        self.tabela = TabelaSimbolos(escopo=nome, anterior=escopo_anterior)
+        self.tabela.entrar_escopo(nome)
 
         parametros = self.parametros()
 
@@ -285,13 +451,15 @@ class Parser:
 
         self.consumir('RPAREN')
 
-        escopo_anterior.adicionar(nome, 'VOID', 'procedimento', parametros)
+        self.tabela.adicionar(nome, 'VOID', 'procedimento', parametros, nivel=0)
 
+        marca = self.emitir_inicio_funcao(nome, parametros)
         self.consumir('LBRACE')
         self.corpo()
         self.consumir('RBRACE')
+        self.emitir_fim_funcao(marca)
 
-        self.tabela = escopo_anterior
+        self.tabela.sair_escopo()
 
 
     def parametros(self):
@@ -317,7 +485,7 @@ class Parser:
         lexema = token.lexema
 
         if tipo == 'ID':
-            proximo_tipo = self.tokens[self.pos + 1].tipo
+            proximo_tipo = self.proximo_token().tipo
 
             if proximo_tipo == 'ATRIBUICAO':
                 self.atribuicao()
@@ -342,21 +510,22 @@ class Parser:
     def chamada_procedimento(self):
         nome = self.token_atual().lexema
 
-        if not self.tabela.existe(nome):
-            raise Exception(f"Erro semântico: procedimento ou função '{nome}' não declarado.")
-
-        simbolo = self.tabela.buscar(nome)
+        simbolo = self.tabela.buscar(nome, f"Erro semântico: procedimento ou função '{nome}' não declarado.")
 
-        if simbolo['categoria'] not in ('funcao', 'procedimento'):
+        if simbolo.categoria not in ('funcao', 'procedimento'):
             raise Exception(f"Erro semântico: '{nome}' não é uma função nem procedimento.")
 
         self.consumir('ID')
         self.consumir('LPAREN')
 
-        self.argumentos()
+        args = self.argumentos()
 
         self.consumir('RPAREN')
 
+        for arg in args:
+            self.emitir(Op.PARAM, None, arg['lugar'])
+        self.emitir(Op.CHAMADA, None, nome, len(args))
+
     def argumentos(self):
         args = []
         if self.token_atual().tipo != 'RPAREN':
@@ -380,10 +549,7 @@ class Parser:
     def atribuicao(self):
         nome = self.token_atual().lexema
 
-        if not self.tabela.existe(nome):
-            raise Exception(f"Identificador '{nome}' não declarado.")
-
-        simbolo = self.tabela.buscar(nome)
+        simbolo = self.tabela.buscar(nome, f"Identificador '{nome}' não declarado.")
         self.consumir('ID')
         self.consumir('ATRIBUICAO')
 
@@ -392,10 +558,10 @@ class Parser:
         if not resultado or 'tipo' not in resultado or 'lugar' not in resultado:
             raise Exception("Erro interno: expressão inválida ou incompleta durante atribuição.")
 
-        if not self.tipos_compativeis(simbolo['tipo'], resultado['tipo']):
-            raise Exception(f"Atribuição inválida: esperado '{simbolo['tipo']}', recebeu '{resultado['tipo']}'.")
+        if not self.tipos_compativeis(simbolo.tipo, resultado['tipo']):
+            raise Exception(f"Atribuição inválida: esperado '{simbolo.tipo}', recebeu '{resultado['tipo']}'.")
 
-        self.codigo_intermediario.append(f"{nome} := {resultado['lugar']}")
+        self.emitir(Op.COPIA, nome, resultado['lugar'])
 
         # garante que o ponto e vírgula seja consumido corretamente
         if self.token_atual().tipo == 'PONTOVIRGULA':
@@ -405,10 +571,10 @@ class Parser:
 
 
     def obter_tipo_retorno_funcao(self):
-        for escopo in reversed(self.escopos):
-            if 'retorno' in escopo and escopo['retorno'] is not None:
-                return escopo['retorno']
-        raise Exception("Comando 'retorna' fora de uma função com tipo de retorno.")
+        tipo_retorno = self.tabela.tipo_retorno()
+        if tipo_retorno is None:
+            raise Exception("Comando 'retorna' fora de uma função com tipo de retorno.")
+        return tipo_retorno
 
     def comando_escreva(self):
         self.consumir('PRINT')
@@ -417,38 +583,37 @@ class Parser:
         self.consumir('RPAREN')
         self.consumir('PONTOVIRGULA')
 
-        self.codigo_intermediario.append(f"escreva({resultado['lugar']})")
+        self.emitir(Op.ESCREVA, None, resultado['lugar'])
 
 
     def comando_condicional(self):
         self.consumir('IF')
         self.consumir('LPAREN')
-        cond = self.expressao()  # retorno: {'tipo', 'lugar'}
+        cond = self.condicao()
         self.consumir('RPAREN')
 
         if cond['tipo'] != 'BOOL':
             self.erro("A condição do 'se' deve ser booleana.")
 
+        desvios = self.desvios(cond)
         label_verdadeiro = self.novo_label()
         label_falso = self.novo_label()
         label_fim = self.novo_label()
 
-        # if condicao goto L_verdadeiro
-        self.codigo_intermediario.append(f"if {cond['lugar']} goto {label_verdadeiro}")
-        self.codigo_intermediario.append(f"goto {label_falso}")
-
         # L_verdadeiro:
-        self.codigo_intermediario.append(f"{label_verdadeiro}:")
+        self.remendar(desvios['verdadeiros'], label_verdadeiro)
+        self.emitir(Op.ROTULO, label_verdadeiro)
 
         self.consumir('LBRACE')
         self.corpo()
         self.consumir('RBRACE')
 
         # depois do bloco verdadeiro, ir pro fim (caso tenha else)
-        self.codigo_intermediario.append(f"goto {label_fim}")
+        self.emitir(Op.GOTO, label_fim)
 
         # L_falso:
-        self.codigo_intermediario.append(f"{label_falso}:")
+        self.remendar(desvios['falsos'], label_falso)
+        self.emitir(Op.ROTULO, label_falso)
 
         if self.token_atual().tipo == 'ELSE':
             self.consumir('ELSE')
@@ -457,7 +622,7 @@ class Parser:
             self.consumir('RBRACE')
 
         # L_fim:
-        self.codigo_intermediario.append(f"{label_fim}:")
+        self.emitir(Op.ROTULO, label_fim)
 
 
     def comando_enquanto(self):
@@ -468,227 +633,309 @@ class Parser:
         label_corpo = self.novo_label()
         label_fim = self.novo_label()
 
-        self.codigo_intermediario.append(f"{label_inicio}:")
+        self.emitir(Op.ROTULO, label_inicio)
 
-        cond = self.expressao()  # retorno: {'tipo', 'lugar'}
+        cond = self.condicao()
         if cond['tipo'] != 'BOOL':
             self.erro("A condição do 'enquanto' deve ser booleana.")
 
         self.consumir('RPAREN')
 
-        self.codigo_intermediario.append(f"if {cond['lugar']} goto {label_corpo}")
-        self.codigo_intermediario.append(f"goto {label_fim}")
-        self.codigo_intermediario.append(f"{label_corpo}:")
+        desvios = self.desvios(cond)
+        self.remendar(desvios['verdadeiros'], label_corpo)
+        self.remendar(desvios['falsos'], label_fim)
+        self.emitir(Op.ROTULO, label_corpo)
 
         self.consumir('LBRACE')
         self.corpo()
         self.consumir('RBRACE')
 
-        self.codigo_intermediario.append(f"goto {label_inicio}")
-        self.codigo_intermediario.append(f"{label_fim}:")
-
-    def comando_retorno(self):
-        self.consumir('RETURN')
-        valor = self.expressao()
-
-        escopo_funcao = self.tabela
-        while escopo_funcao and escopo_funcao.tipo_retorno is None:
-            escopo_funcao = escopo_funcao.anterior
-
-        if escopo_funcao is None:
-            raise Exception("Comando 'return' fora de função")
-
-        if valor['tipo'] != escopo_funcao.tipo_retorno:
-            raise Exception(f"Tipo de retorno incompatível: esperado {escopo_funcao.tipo_retorno}, mas encontrado {valor['tipo']}")
-
-        self.codigo_intermediario.append(f"return {valor['lugar']}")
-
-
-    def expressao(self):
-        esquerda = self.expressao_termo()
+        self.emitir(Op.GOTO, label_inicio)
+        self.emitir(Op.ROTULO, label_fim)
 
-        # Operadores aritméticos (+ e -)
-        while self.pos < len(self.tokens) and self.token_atual().tipo in ('SOMA', 'SUB'):
-            operador = self.token_atual().tipo
-            self.consumir(operador)
+    # ------------------------------------------------------------------
+    # Condições em código de desvios
+    # ------------------------------------------------------------------
+    # Em `se` e `enquanto`, `e`/`ou` não calculam um temporário: cada operando
+    # vira desvios ainda sem destino (listas de verdadeiros e falsos), que são
+    # remendados quando o destino é conhecido. O operando da direita só é
+    # avaliado quando o da esquerda não decide a condição, inclusive as
+    # chamadas de função nele.
 
-            direita = self.expressao_termo()
-
-            if esquerda['tipo'] != 'INT' or direita['tipo'] != 'INT':
-                self.erro(f"Operador '{operador}' espera inteiros, mas recebeu {esquerda['tipo']} e {direita['tipo']}")
-
-            op_simbolo = '+' if operador == 'SOMA' else '-'
-            temp = self.novo_temp()
-            self.codigo_intermediario.append(f"{temp} := {esquerda['lugar']} {op_simbolo} {direita['lugar']}")
-            esquerda = { 'tipo': 'INT', 'lugar': temp }
-
-        # Operadores relacionais
-        if self.token_atual() and self.token_atual().tipo in ('IGUAL', 'DIFERENTE', 'MENOR', 'MAIOR', 'MENORIGUAL', 'MAIORIGUAL'):
-            operador = self.token_atual().tipo
-            self.consumir(operador)
-
-            direita = self.expressao_termo()
-
-            if esquerda['tipo'] != direita['tipo']:
-                self.erro(f"Operador relacional '{operador}' usado com tipos incompatíveis: {esquerda['tipo']} e {direita['tipo']}")
-
-            op_map = {
-                'IGUAL': '==',
-                'DIFERENTE': '!=',
-                'MENOR': '<',
-                'MAIOR': '>',
-                'MENORIGUAL': '<=',
-                'MAIORIGUAL': '>='
-            }
-            temp = self.novo_temp()
-            self.codigo_intermediario.append(f"{temp} := {esquerda['lugar']} {op_map[operador]} {direita['lugar']}")
-            esquerda = { 'tipo': 'BOOL', 'lugar': temp }
-
-        # Operadores lógicos (AND, OR)
-        while self.pos < len(self.tokens) and self.token_atual().tipo in ('AND', 'OR'):
-            operador = self.token_atual().tipo
-            self.consumir(operador)
-
-            direita = self.expressao_termo()
-
-            if esquerda['tipo'] != 'BOOL' or direita['tipo'] != 'BOOL':
-                self.erro(f"Operador lógico '{operador}' espera booleanos, mas recebeu {esquerda['tipo']} e {direita['tipo']}")
-
-            op = '&&' if operador == 'AND' else '||'
-            temp = self.novo_temp()
-            self.codigo_intermediario.append(f"{temp} := {esquerda['lugar']} {op} {direita['lugar']}")
-            esquerda = { 'tipo': 'BOOL', 'lugar': temp }
-
-        return esquerda
-
-    def expressao_or(self):
-        self.expressao_and()
-        while self.token_atual().tipo == 'OR':
-            self.consumir('OR')
-            self.expressao_and()
-
-    def expressao_and(self):
-        self.expressao_relacional()
-        while self.token_atual().tipo == 'AND':
-            self.consumir('AND')
-            self.expressao_relacional()
-
-    def expressao_relacional(self):
-        self.expressao_soma()
-        while self.token_atual().tipo in ('IGUAL', 'DIFERENTE', 'MENOR', 'MAIOR', 'MENORIGUAL', 'MAIORIGUAL'):
-            self.consumir(self.token_atual().tipo)
-            self.expressao_soma()
-
-    def expressao_soma(self):
-        self.expressao_termo()
-        while self.token_atual().tipo in ('SOMA', 'SUB'):
-            self.consumir(self.token_atual().tipo)
-            self.expressao_termo()
-
-    def expressao_termo(self):
-        esquerda = self.expressao_fator()
-
-        while self.pos < len(self.tokens) and self.token_atual().tipo in ('MULT', 'DIV'):
-            operador = self.token_atual().tipo
-            self.consumir(operador)
-
-            direita = self.expressao_fator()
-
-            if esquerda['tipo'] != 'INT' or direita['tipo'] != 'INT':
-                self.erro(f"Operador '{operador}' espera inteiros, mas recebeu {esquerda['tipo']} e {direita['tipo']}")
-
-            op = '*' if operador == 'MULT' else '/'
-            temp = self.novo_temp()
-            self.codigo_intermediario.append(f"{temp} := {esquerda['lugar']} {op} {direita['lugar']}")
-            esquerda = { 'tipo': 'INT', 'lugar': temp }
-
-        return esquerda
-
-
-    def chamada_funcao_com_retorno(self):
-        nome = self.token_atual().lexema
-        simbolo = self.tabela.buscar(nome)
-
-        if simbolo['categoria'] != 'funcao':
-            raise Exception(f"Erro semântico: '{nome}' não é uma função.")
-
-        self.consumir('ID')
-        self.consumir('LPAREN')
-
-        parametros_esperados = simbolo.get('parametros', [])
-        argumentos_recebidos = []
-
-        # self.avaliando_argumentos = True
-        if self.token_atual().tipo != 'RPAREN':
+    def condicao(self):
+        """
+        Returns:
+            dict: {'tipo', 'lugar'} quando a condição não tem `e`/`ou` no
+            nível mais externo, ou {'tipo': 'BOOL', 'verdadeiros', 'falsos'}
+            com os desvios pendentes.
+        """
+        # Um operando entre parênteses é outra condição, a menos que continue
+        # numa conta ou comparação, como em `(a + b) > c`; um `!` logo antes
+        # dos parênteses só troca os desvios dela. As condições de fora ficam
+        # em `abertas` como (esquerda, pendente, negar), onde pendente é o
+        # (operador, desvios da esquerda) que espera o operando da direita.
+        abertas = []
+        esquerda = pendente = None
+        while True:
+            tipo = self.token_atual().tipo
+            if tipo == 'LPAREN' or (tipo == 'NOT' and self.tokens.espiar(1).tipo == 'LPAREN'):
+                if tipo == 'NOT':
+                    self.consumir('NOT')
+                self.consumir('LPAREN')
+                abertas.append((esquerda, pendente, tipo == 'NOT'))
+                esquerda = pendente = None
+                continue
+
+            operando = self.expressao(logicos=False)
             while True:
-                valor = self.expressao()
-                argumentos_recebidos.append(valor)
-                if self.token_atual().tipo != 'VIRGULA':
+                esquerda = operando if pendente is None else self.juntar_condicoes(esquerda, pendente, operando)
+                pendente = None
+
+                operador = self.token_atual().tipo
+                if operador in ('AND', 'OR'):
+                    self.consumir(operador)
+                    desvios = self.desvios(esquerda)
+                    label_direita = self.novo_label()
+                    # `e` só avalia a direita se a esquerda for verdadeira; `ou`, se for falsa
+                    self.remendar(desvios['verdadeiros' if operador == 'AND' else 'falsos'], label_direita)
+                    self.emitir(Op.ROTULO, label_direita)
+                    pendente = (operador, desvios)
                     break
-                self.consumir('VIRGULA')
-        # self.avaliando_argumentos = False
-
-        self.consumir('RPAREN')
-
-        if len(argumentos_recebidos) != len(parametros_esperados):
-            raise Exception(f"Erro semântico: função '{nome}' espera {len(parametros_esperados)} argumentos, mas recebeu {len(argumentos_recebidos)}.")
-
-        for (param_nome, param_tipo), arg in zip(parametros_esperados, argumentos_recebidos):
-            if param_tipo != arg['tipo']:
-                raise Exception(f"Erro semântico: tipo de argumento incompatível. Esperado '{param_tipo}', mas recebeu '{arg['tipo']}'.")
-
-            self.codigo_intermediario.append(f"param {arg['lugar']}")
 
+                if not abertas:
+                    return esquerda
+                self.consumir('RPAREN')
+                operando = esquerda
+                esquerda, pendente, negar = abertas.pop()
+                if negar:
+                    operando = self.negar_condicao(operando)
+                if PRECEDENCIA.get(self.token_atual().tipo, 0) >= NIVEL_RELACIONAL:
+                    operando = self.expressao(self.valor_condicao(operando), logicos=False)
+
+    def juntar_condicoes(self, esquerda, pendente, direita):
+        operador, desvios = pendente
+        if esquerda['tipo'] != 'BOOL' or direita['tipo'] != 'BOOL':
+            self.erro(f"Operador lógico '{operador}' espera booleanos, mas recebeu {esquerda['tipo']} e {direita['tipo']}")
+
+        desvios_direita = self.desvios(direita)
+        if operador == 'AND':
+            return {'tipo': 'BOOL', 'verdadeiros': desvios_direita['verdadeiros'],
+                    'falsos': desvios['falsos'] + desvios_direita['falsos']}
+        return {'tipo': 'BOOL', 'verdadeiros': desvios['verdadeiros'] + desvios_direita['verdadeiros'],
+                'falsos': desvios_direita['falsos']}
+
+    def negar_condicao(self, cond):
+        """`!` aplicado a uma condição: com desvios, basta trocar os verdadeiros pelos falsos."""
+        if 'lugar' in cond:
+            tipo, lugar = self.operacao_unaria('NOT', (cond['tipo'], cond['lugar']))
+            return {'tipo': tipo, 'lugar': lugar}
+        return {'tipo': cond['tipo'], 'verdadeiros': cond['falsos'], 'falsos': cond['verdadeiros']}
+
+    def desvios(self, cond):
+        """Desvios pendentes da condição; um valor vira `if lugar goto _; goto _`."""
+        if 'lugar' not in cond:
+            return cond
+        se_verdadeiro = self.emitir(Op.SE, None, cond['lugar'])
+        se_falso = self.emitir(Op.GOTO, None)
+        return {'tipo': cond['tipo'], 'verdadeiros': [se_verdadeiro], 'falsos': [se_falso]}
+
+    def valor_condicao(self, cond):
+        """Temporário com o valor (verdadeiro/falso) de uma condição em desvios."""
+        if 'lugar' in cond:
+            return cond
         temp = self.novo_temp()
-        self.codigo_intermediario.append(f"{temp} := call {nome}, {len(argumentos_recebidos)}")
-
-        return { 'tipo': simbolo['retorno'], 'lugar': temp }
-
+        label_verdadeiro = self.novo_label()
+        label_falso = self.novo_label()
+        label_fim = self.novo_label()
+        self.remendar(cond['verdadeiros'], label_verdadeiro)
+        self.emitir(Op.ROTULO, label_verdadeiro)
+        self.emitir(Op.COPIA, temp, 'verdadeiro')
+        self.emitir(Op.GOTO, label_fim)
+        self.remendar(cond['falsos'], label_falso)
+        self.emitir(Op.ROTULO, label_falso)
+        self.emitir(Op.COPIA, temp, 'falso')
+        self.emitir(Op.ROTULO, label_fim)
+        return {'tipo': 'BOOL', 'lugar': temp}
+
+    @staticmethod
+    def remendar(desvios, label):
+        for q in desvios:
+            q.resultado = label
 
-    def expressao_fator(self):
-        token = self.token_atual()
-        tipo = token.tipo
-        lexema = token.lexema
+    def comando_retorno(self):
+        self.consumir('RETURN')
+        valor = self.expressao()
 
-        if tipo == 'ID':
-            if not self.tabela.existe(lexema):
-                self.erro(f"Variável '{lexema}' não declarada.")
+        tipo_retorno = self.obter_tipo_retorno_funcao()
+        if valor['tipo'] != tipo_retorno:
+            raise Exception(f"Tipo de retorno incompatível: esperado {tipo_retorno}, mas encontrado {valor['tipo']}")
 
-            # if (not self.avaliando_argumentos
-            #     and self.pos + 1 < len(self.tokens)
-            #     and self.tokens[self.pos + 1].tipo == 'LPAREN'):
-            #     return self.chamada_funcao_com_retorno()
+        self.emitir(Op.RETORNO, None, valor['lugar'])
 
-            if self.pos + 1 < len(self.tokens) and self.tokens[self.pos + 1].tipo == 'LPAREN':
-                return self.chamada_funcao_com_retorno()
 
+    def expressao(self, esquerda=None, logicos=True):
+        """
+        Analisa uma expressão por precedência de operadores (PRECEDENCIA), com
+        pilhas explícitas de operandos e de operadores. Parênteses e
+        argumentos de chamada abrem um grupo na pilha de operadores em vez de
+        uma chamada recursiva, então o aninhamento não tem limite de
+        profundidade. Cada operação é emitida ao ser reduzida, na mesma ordem
+        da análise descendente.
 
-            simbolo = self.tabela.buscar(lexema)
-            self.consumir('ID')
-            return { 'tipo': simbolo['tipo'], 'lugar': lexema }
+        Args:
+            esquerda (dict): primeiro operando, já analisado.
+            logicos (bool): False para antes de `e`/`ou`, que ficam para quem chama.
 
-        elif tipo == 'NUMERO':
-            self.consumir('NUMERO')
-            return { 'tipo': 'INT', 'lugar': lexema }
+        Returns:
+            dict: {'tipo', 'lugar'}
+        """
+        espiar = self.tokens.espiar
+        avancar = self.tokens.avancar
+        operandos = []  # (tipo, lugar)
+        # (nivel, token) de cada binário, (_UNARIO, token), (_GRUPO,) ou
+        # (_CHAMADA, simbolo, nome, argumentos); a base é o grupo da expressão toda
+        operadores = [(_GRUPO,)]
+        # nível mínimo dos binários de cada grupo aberto; o da base vem de `logicos`
+        minimos = []
+        minimo = NIVEL_LOGICO if logicos else NIVEL_RELACIONAL
+        valor = None if esquerda is None else (esquerda['tipo'], esquerda['lugar'])
+
+        while True:
+            if valor is None:
+                token = espiar()
+                tipo = token.tipo
+                if tipo in UNARIOS:
+                    avancar()
+                    self.pos += 1
+                    operadores.append((_UNARIO, tipo))
+                    continue
+                if tipo == 'LPAREN':
+                    avancar()
+                    self.pos += 1
+                    operadores.append((_GRUPO,))
+                    minimos.append(minimo)
+                    minimo = NIVEL_LOGICO
+                    continue
+                if tipo == 'ID':
+                    nome = token.lexema
+                    simbolo = self.tabela.obter(nome)
+                    if simbolo is None:
+                        self.erro(f"Variável '{nome}' não declarada.")
+                    if espiar(1).tipo == 'LPAREN':
+                        if simbolo.categoria != 'funcao':
+                            raise Exception(f"Erro semântico: '{nome}' não é uma função.")
+                        avancar()
+                        avancar()
+                        self.pos += 2
+                        if espiar().tipo != 'RPAREN':
+                            operadores.append((_CHAMADA, simbolo, nome, []))
+                            minimos.append(minimo)
+                            minimo = NIVEL_LOGICO
+                            continue
+                        self.consumir('RPAREN')
+                        valor = self.chamada_funcao(simbolo, nome, [])
+                    else:
+                        avancar()
+                        self.pos += 1
+                        valor = (simbolo.tipo, nome)
+                elif tipo in OPERANDOS_LITERAIS:
+                    avancar()
+                    self.pos += 1
+                    valor = (OPERANDOS_LITERAIS[tipo], token.lexema)
+                else:
+                    self.erro(f"Token inesperado na expressão: {tipo}")
+
+            # os prefixos pendentes ligam mais forte que qualquer binário
+            while operadores[-1][0] == _UNARIO:
+                valor = self.operacao_unaria(operadores.pop()[1], valor)
+            operandos.append(valor)
+            valor = None
+
+            # depois de um operando: outro binário do grupo, ou o fim do grupo
+            while True:
+                tipo = espiar().tipo
+                nivel = PRECEDENCIA.get(tipo, 0)
+                if nivel >= minimo:
+                    # reduz os de precedência maior e, associando à esquerda, os do mesmo nível
+                    while operadores[-1][0] >= nivel:
+                        if nivel == NIVEL_RELACIONAL == operadores[-1][0]:
+                            break  # relacionais não se encadeiam: o grupo termina antes deste
+                        self.reduzir(operadores, operandos)
+                    else:
+                        avancar()
+                        self.pos += 1
+                        operadores.append((nivel, tipo))
+                        break
+
+                while operadores[-1][0] > 0:
+                    self.reduzir(operadores, operandos)
+                if not minimos:
+                    tipo, lugar = operandos.pop()
+                    return {'tipo': tipo, 'lugar': lugar}
+                grupo = operadores[-1]
+                if grupo[0] == _CHAMADA:
+                    grupo[3].append(operandos.pop())
+                    if tipo == 'VIRGULA':
+                        self.consumir('VIRGULA')
+                        break
+                    self.consumir('RPAREN')
+                    valor = self.chamada_funcao(grupo[1], grupo[2], grupo[3])
+                else:
+                    self.consumir('RPAREN')
+                    valor = operandos.pop()
+                # o grupo fechado é um operando do grupo de fora
+                operadores.pop()
+                minimo = minimos.pop()
+                break
+
+    def reduzir(self, operadores, operandos):
+        nivel, operador = operadores.pop()
+        tipo_direita, direita = operandos.pop()
+        tipo_esquerda, esquerda = operandos[-1]
+        tipo = TIPOS_OPERANDOS.get(nivel, tipo_esquerda)
+        if tipo_esquerda != tipo or tipo_direita != tipo:
+            if nivel == NIVEL_RELACIONAL:
+                self.erro(f"Operador relacional '{operador}' usado com tipos incompatíveis: {tipo_esquerda} e {tipo_direita}")
+            if nivel == NIVEL_LOGICO:
+                self.erro(f"Operador lógico '{operador}' espera booleanos, mas recebeu {tipo_esquerda} e {tipo_direita}")
+            self.erro(f"Operador '{operador}' espera inteiros, mas recebeu {tipo_esquerda} e {tipo_direita}")
 
-        elif tipo == 'STRING_LITERAL':
-            self.consumir('STRING_LITERAL')
-            return { 'tipo': 'STRING', 'lugar': lexema }
+        temp = self.novo_temp()
+        self.emitir(OPERADORES_BINARIOS[operador], temp, esquerda, direita)
+        operandos[-1] = ('BOOL' if nivel <= NIVEL_RELACIONAL else 'INT', temp)
 
-        elif tipo in ('TRUE', 'FALSE'):
-            self.consumir(tipo)
-            return { 'tipo': 'BOOL', 'lugar': lexema }
+    def operacao_unaria(self, operador, valor):
+        # -x vira 0 - x e !x, x == falso; com um literal, o resultado já é o literal
+        simbolo, tipo, descricao = UNARIOS[operador]
+        tipo_valor, lugar = valor
+        if tipo_valor != tipo:
+            self.erro(f"Operador '{simbolo}' espera {descricao}, mas recebeu {tipo_valor}")
 
-        elif tipo == 'LPAREN':
-            self.consumir('LPAREN')
-            resultado = self.expressao()
-            self.consumir('RPAREN')
-            return resultado
+        if eh_literal(lugar):
+            if operador == 'SUB':
+                return tipo, lugar[1:] if lugar.startswith('-') else '-' + lugar
+            return tipo, 'falso' if lugar == 'verdadeiro' else 'verdadeiro'
 
+        temp = self.novo_temp()
+        if operador == 'SUB':
+            self.emitir(Op.SUB, temp, '0', lugar)
         else:
-            self.erro(f"Token inesperado na expressão: {tipo}")
-            return { 'tipo': 'ERRO', 'lugar': '?' }
+            self.emitir(Op.IGUAL, temp, lugar, 'falso')
+        return tipo, temp
 
+    def chamada_funcao(self, simbolo, nome, argumentos):
+        """Confere os argumentos já analisados, (tipo, lugar), e emite os `param` e a chamada."""
+        parametros_esperados = simbolo.parametros
+        if len(argumentos) != len(parametros_esperados):
+            raise Exception(f"Erro semântico: função '{nome}' espera {len(parametros_esperados)} argumentos, mas recebeu {len(argumentos)}.")
 
+        for (_, param_tipo), (tipo, lugar) in zip(parametros_esperados, argumentos):
+            if param_tipo != tipo:
+                raise Exception(f"Erro semântico: tipo de argumento incompatível. Esperado '{param_tipo}', mas recebeu '{tipo}'.")
 
+            self.emitir(Op.PARAM, None, lugar)
+
+        temp = self.novo_temp()
+        self.emitir(Op.CHAMADA, temp, nome, len(argumentos))
 
+        return simbolo.retorno, temp
@@ -0,0 +1,237 @@
+"""
+Cache em disco do TAC de cada `funcao`/`procedimento` declarado no escopo global.
+
+A chave de uma declaração é o hash dos seus tokens (tipo e lexema, do `funcao`
+ou `procedimento` até a `}` final) e das assinaturas dos símbolos globais que
+esses tokens nomeiam: o tipo das globais e os parâmetros e o retorno das
+funções já declaradas. Mudar espaços e quebras de linha não muda a chave;
+mudar a assinatura de uma função chamada, sim.
+
+A entrada guarda o TAC emitido pela declaração, com temporários e rótulos
+numerados a partir de _t0 e L0, e os símbolos que ela acrescentou ao escopo
+global (a própria função e as declaradas dentro dela). Num acerto o Parser
+acrescenta esses símbolos, emenda o TAC renumerado a partir dos seus contadores
+e pula os tokens. Declarações com erro não são guardadas.
+
+Cada entrada é um arquivo JSON no diretório do cache. Quando o diretório passa
+de `limite_bytes`, as entradas usadas há mais tempo (pela data de modificação,
+renovada a cada acerto) são removidas. Mudanças no que o Parser emite devem
+incrementar VERSAO, o que invalida as entradas antigas.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+from intermediario.quadruplas import SALTOS, Op, Quadrupla
+
+VERSAO = 1
+
+LIMITE_PADRAO = 64 * 1024 * 1024
+
+
+class EntradaCache:
+    """
+    Atributos:
+        temporarios (int): temporários alocados pela declaração.
+        rotulos (int): rótulos alocados pela declaração.
+        simbolos (list): (nome, tipo, categoria, parametros, retorno) de cada
+            símbolo acrescentado ao escopo global, na ordem.
+        linhas (list): o TAC da declaração como listas [op, resultado, arg1,
+            arg2], com _t0 e L0 como primeiros nomes.
+    """
+    __slots__ = ('temporarios', 'rotulos', 'simbolos', 'linhas')
+
+    def __init__(self, temporarios, rotulos, simbolos, linhas):
+        self.temporarios = temporarios
+        self.rotulos = rotulos
+        self.simbolos = simbolos
+        self.linhas = linhas
+
+    @classmethod
+    def do_codigo(cls, codigo, primeiro_temporario, primeiro_rotulo, temporarios, rotulos, simbolos):
+        """Entrada com o TAC emitido a partir de _t{primeiro_temporario} e L{primeiro_rotulo}."""
+        instrucoes = [(q.op.value, q.resultado, q.arg1, q.arg2) for q in codigo]
+        linhas = _renumerar(instrucoes, _mapa('_t', primeiro_temporario, 0, temporarios),
+                            _mapa('L', primeiro_rotulo, 0, rotulos), _linha)
+        return cls(temporarios, rotulos, simbolos, linhas)
+
+    def codigo(self, primeiro_temporario, primeiro_rotulo):
+        """O TAC da entrada, com temporários a partir de _t{primeiro_temporario} e rótulos a partir de L{primeiro_rotulo}."""
+        return _renumerar(self.linhas, _mapa('_t', 0, primeiro_temporario, self.temporarios),
+                          _mapa('L', 0, primeiro_rotulo, self.rotulos), _quadrupla)
+
+    def como_dict(self):
+        return {'temporarios': self.temporarios, 'rotulos': self.rotulos,
+                'simbolos': self.simbolos, 'linhas': self.linhas}
+
+    @classmethod
+    def de_dict(cls, dados):
+        simbolos = [(nome, tipo, categoria, None if parametros is None else [tuple(p) for p in parametros], retorno)
+                    for nome, tipo, categoria, parametros, retorno in dados['simbolos']]
+        return cls(dados['temporarios'], dados['rotulos'], simbolos, dados['linhas'])
+
+
+class CacheFuncoes:
+    """
+    Args:
+        diretorio (str): onde ficam as entradas; é criado se não existir.
+        limite_bytes (int): tamanho máximo do diretório (LRU).
+    """
+
+    def __init__(self, diretorio, limite_bytes=LIMITE_PADRAO):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        os.makedirs(diretorio, exist_ok=True)
+        self._tamanho = None  # medido na primeira gravação
+        self.acertos = 0
+        self.falhas = 0
+        self.gravacoes = 0
+        self.remocoes = 0
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave + '.json')
+
+    def obter(self, chave):
+        """EntradaCache guardada com essa chave, ou None."""
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                entrada = EntradaCache.de_dict(json.load(arquivo))
+            os.utime(caminho)
+        except (OSError, ValueError, KeyError, TypeError):
+            # ausente, removida por outro processo ou corrompida
+            self.falhas += 1
+            return None
+        self.acertos += 1
+        return entrada
+
+    def guardar(self, chave, entrada):
+        texto = json.dumps(entrada.como_dict(), ensure_ascii=False, separators=(',', ':'))
+        # escrita atômica: quem ler ao mesmo tempo vê a entrada inteira ou nenhuma
+        descritor, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+        with os.fdopen(descritor, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto)
+        os.replace(temporario, self._caminho(chave))
+        self.gravacoes += 1
+        if self._tamanho is None:
+            self._tamanho = sum(tamanho for _, tamanho, _ in self._entradas())
+        else:
+            self._tamanho += len(texto.encode('utf-8'))
+        if self._tamanho > self.limite_bytes:
+            self._remover_antigas()
+
+    def _entradas(self):
+        with os.scandir(self.diretorio) as itens:
+            for item in itens:
+                if item.name.endswith('.json'):
+                    try:
+                        estado = item.stat()
+                    except OSError:
+                        continue
+                    yield item.path, estado.st_size, estado.st_mtime
+
+    def _remover_antigas(self):
+        entradas = sorted(self._entradas(), key=lambda e: e[2])
+        self._tamanho = sum(tamanho for _, tamanho, _ in entradas)
+        for caminho, tamanho, _ in entradas:
+            if self._tamanho <= self.limite_bytes:
+                break
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+            self._tamanho -= tamanho
+            self.remocoes += 1
+
+    @property
+    def taxa_acertos(self):
+        consultas = self.acertos + self.falhas
+        return self.acertos / consultas if consultas else 0.0
+
+    def resumo(self):
+        return (f"Cache de funções: {self.acertos} acertos, {self.falhas} falhas "
+                f"({self.taxa_acertos:.0%}), {self.gravacoes} gravadas, {self.remocoes} removidas")
+
+
+def fim_declaracao(tokens, inicio):
+    """Índice logo depois da `}` que fecha a declaração iniciada em `inicio`, ou None."""
+    profundidade = 0
+    i = inicio
+    while True:
+        tipo = tokens[i].tipo
+        if tipo == 'EOF':
+            return None
+        if tipo == 'LBRACE':
+            profundidade += 1
+        elif tipo == 'RBRACE':
+            profundidade -= 1
+            if profundidade == 0:
+                return i + 1
+        i += 1
+
+
+def chave_declaracao(tokens, inicio, fim, assinatura):
+    """
+    Args:
+        tokens: lista (ou FluxoTokens) com os tokens do programa.
+        inicio, fim (int): intervalo de tokens da declaração.
+        assinatura: função nome -> tupla com a assinatura do símbolo global
+            visível com esse nome, ou None.
+
+    Returns:
+        str: hash hexadecimal.
+    """
+    partes = [f"v{VERSAO}"]
+    nomes = set()
+    for i in range(inicio, fim):
+        token = tokens[i]
+        partes.append(token.tipo)
+        partes.append(token.lexema)
+        if token.tipo == 'ID':
+            nomes.add(token.lexema)
+    partes.append(json.dumps([a for a in map(assinatura, sorted(nomes)) if a is not None]))
+    return hashlib.sha256('\0'.join(partes).encode()).hexdigest()
+
+
+# Op pelo valor, mais rápido que Op(valor)
+_OPERACOES = tuple(sorted(Op))
+_COM_ROTULO = frozenset(op.value for op in SALTOS | {Op.ROTULO})
+_CHAMADA, _FUNCAO, _FIM_FUNCAO = Op.CHAMADA.value, Op.FUNCAO.value, Op.FIM_FUNCAO.value
+
+
+def _linha(op, resultado, arg1, arg2):
+    return [op, resultado, arg1, arg2]
+
+
+def _quadrupla(op, resultado, arg1, arg2):
+    return Quadrupla(_OPERACOES[op], resultado, arg1, arg2)
+
+
+def _mapa(prefixo, de, para, quantidade):
+    if de == para:
+        return {}
+    return {f"{prefixo}{de + i}": f"{prefixo}{para + i}" for i in range(quantidade)}
+
+
+def _renumerar(instrucoes, temporarios, rotulos, criar):
+    """
+    Troca os nomes das instruções (valor da op, resultado, arg1, arg2) pelos
+    dos mapas e monta cada uma com `criar`. Cada mapa só vale nas posições do
+    seu tipo de nome, pois uma variável pode se chamar L3.
+    """
+    temporario = temporarios.get
+    rotulo = rotulos.get
+    saida = []
+    for op, resultado, arg1, arg2 in instrucoes:
+        if op in _COM_ROTULO:
+            saida.append(criar(op, rotulo(resultado, resultado), temporario(arg1, arg1), None))
+        elif op == _CHAMADA:
+            saida.append(criar(op, temporario(resultado, resultado), arg1, arg2))
+        elif op == _FUNCAO:
+            saida.append(criar(op, resultado, tuple(arg1), tuple(arg2)))
+        elif op == _FIM_FUNCAO:
+            saida.append(criar(op, resultado, None, None))
+        else:
+            saida.append(criar(op, temporario(resultado, resultado), temporario(arg1, arg1), temporario(arg2, arg2)))
+    return saida
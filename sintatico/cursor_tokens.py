@@ -0,0 +1,62 @@
+from collections import deque
+from itertools import islice
+
+from lexico.analisador_lexico import Token
+
+
+class CursorTokens:
+    """
+    Cursor sobre um fluxo de tokens com lookahead limitado.
+
+    Os tokens ainda não consumidos ficam em um buffer circular de tamanho fixo,
+    de modo que o Parser pode ler de um gerador sem materializar a lista toda.
+
+    Args:
+        tokens: lista ou iterável de Token (por exemplo, gerar_tokens()).
+        lookahead (int): quantos tokens além do atual podem ser espiados.
+    """
+    __slots__ = ('_fonte', '_buffer', '_capacidade', '_inicio', '_quantidade', '_eof')
+
+    def __init__(self, tokens, lookahead=1):
+        self._fonte = iter(tokens)
+        self._capacidade = lookahead + 1
+        self._buffer = [None] * self._capacidade
+        self._inicio = 0
+        self._quantidade = 0
+        self._eof = None
+
+    def _preencher(self):
+        if self._eof is not None:
+            token = self._eof
+        else:
+            token = next(self._fonte, None)
+            if token is None:
+                token = Token('EOF', 'EOF')
+            if token.tipo == 'EOF':
+                # depois do EOF o cursor continua devolvendo o mesmo token
+                self._eof = token
+        indice = (self._inicio + self._quantidade) % self._capacidade
+        self._buffer[indice] = token
+        self._quantidade += 1
+
+    def espiar(self, distancia=0):
+        if distancia >= self._capacidade:
+            raise ValueError(f"Lookahead máximo é {self._capacidade - 1}, pedido {distancia}.")
+        while self._quantidade <= distancia:
+            self._preencher()
+        return self._buffer[(self._inicio + distancia) % self._capacidade]
+
+    def avancar(self):
+        token = self.espiar()
+        self._buffer[self._inicio] = None
+        self._inicio = (self._inicio + 1) % self._capacidade
+        self._quantidade -= 1
+        return token
+
+    def pular(self, quantidade):
+        """Avança `quantidade` tokens, sem criar as entradas do buffer dos que não foram espiados."""
+        while quantidade and self._quantidade:
+            self.avancar()
+            quantidade -= 1
+        if quantidade and self._eof is None:
+            deque(islice(self._fonte, quantidade), maxlen=0)
@@ -0,0 +1,227 @@
+"""
+Compilação em duas fases, com os corpos das funções analisados em paralelo.
+
+1. A pré-varredura percorre os tokens sem analisar expressões e coleta as
+   variáveis globais e as assinaturas de todas as funções e procedimentos,
+   que são declarados na tabela de símbolos antes da análise
+   (TabelaSimbolos.predeclarar). Assim uma função pode chamar outra declarada
+   mais adiante, e os corpos podem ser analisados em qualquer ordem.
+2. Cada declaração de função ou procedimento do escopo global vira uma tarefa
+   de um ProcessPoolExecutor: o trabalhador analisa só os tokens dela, com
+   um Parser próprio, e devolve o TAC como uma EntradaCache (temporários e
+   rótulos a partir de _t0 e L0). Enquanto isso o Parser principal analisa o
+   programa; ao chegar a cada declaração ele espera o resultado dela e o
+   emenda renumerado a partir dos seus contadores (Parser.emendar).
+
+As declarações são emendadas na ordem do código, então o TAC de um programa
+que também compila sem a pré-declaração é o mesmo da compilação sequencial, e
+o erro reportado é o primeiro na ordem do código. Com um cache de funções, as
+declarações encontradas nele nem chegam aos trabalhadores.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from lexico.analisador_lexico import analisar_codigo
+from sintatico.analisador_sintatico import Parser
+from sintatico.cache_funcoes import EntradaCache, chave_declaracao
+
+_TIPOS = ('INT', 'BOOL', 'STRING')
+
+# Código-fonte e símbolos predeclarados de cada trabalhador (definidos em _iniciar)
+_contexto = {}
+
+
+class PreVarredura:
+    """
+    Atributos:
+        simbolos (list): assinaturas (nome, tipo, categoria, parametros,
+            retorno) das variáveis globais e das funções e procedimentos, na
+            ordem do código.
+        declaracoes (list): (inicio, fim, simbolos) de cada declaração de
+            função ou procedimento do escopo global: o intervalo dos tokens
+            e as assinaturas das funções declaradas nele (ela e as internas).
+    """
+    __slots__ = ('simbolos', 'declaracoes')
+
+    def __init__(self):
+        self.simbolos = []
+        self.declaracoes = []
+
+
+def _assinatura(tokens, i):
+    """(assinatura, índice da `{` do corpo) da declaração em `i`, ou (None, i) se ela estiver malformada."""
+    categoria = 'funcao' if tokens[i].tipo == 'FUN' else 'procedimento'
+    i += 1
+    if tokens[i].tipo != 'ID':
+        return None, i
+    nome = tokens[i].lexema
+    i += 1
+    if tokens[i].tipo != 'LPAREN':
+        return None, i
+    i += 1
+    parametros = []
+    if tokens[i].tipo != 'RPAREN':
+        while True:
+            if tokens[i].tipo not in _TIPOS or tokens[i + 1].tipo != 'ID':
+                return None, i
+            parametros.append((tokens[i + 1].lexema, tokens[i].tipo))
+            i += 2
+            if tokens[i].tipo != 'VIRGULA':
+                break
+            i += 1
+    if tokens[i].tipo != 'RPAREN':
+        return None, i
+    i += 1
+    if categoria == 'funcao':
+        if tokens[i].tipo != 'DOISPONTOS' or tokens[i + 1].tipo not in _TIPOS:
+            return None, i
+        retorno = tokens[i + 1].tipo
+        assinatura = (nome, retorno, categoria, parametros, retorno)
+        i += 2
+    else:
+        assinatura = (nome, 'VOID', categoria, parametros, None)
+    if tokens[i].tipo != 'LBRACE':
+        return None, i
+    return assinatura, i
+
+
+def prevarrer(tokens):
+    """
+    Args:
+        tokens: lista (ou FluxoTokens) com os tokens do programa.
+
+    Returns:
+        PreVarredura. Declarações malformadas ou repetidas ficam de fora: o
+        Parser as reporta ao chegar nelas.
+    """
+    varredura = PreVarredura()
+    vistos = set()
+
+    def registrar(assinatura):
+        if assinatura[0] not in vistos:
+            vistos.add(assinatura[0])
+            varredura.simbolos.append(assinatura)
+
+    chaves = []        # para cada `{` aberta: se ela abre o corpo de uma função
+    em_funcao = 0      # quantas das chaves abertas são corpos de função
+    aberta = None      # (inicio, simbolos, profundidade) da declaração global em curso
+    i = 0
+    while True:
+        tipo = tokens[i].tipo
+        if tipo == 'EOF':
+            break
+        if tipo in ('FUN', 'PROC'):
+            assinatura, corpo = _assinatura(tokens, i)
+            if assinatura is None:
+                i = corpo
+                continue
+            registrar(assinatura)
+            if em_funcao == 0:
+                aberta = (i, [], len(chaves))
+            aberta[1].append(assinatura)
+            chaves.append(True)
+            em_funcao += 1
+            i = corpo + 1
+            continue
+        if tipo == 'LBRACE':
+            chaves.append(False)
+        elif tipo == 'RBRACE' and chaves:
+            if chaves.pop():
+                em_funcao -= 1
+            if aberta is not None and len(chaves) == aberta[2]:
+                varredura.declaracoes.append((aberta[0], i + 1, aberta[1]))
+                aberta = None
+        elif tipo in _TIPOS and em_funcao == 0:
+            # variáveis fora das funções são globais, mesmo dentro de se/enquanto
+            i += 1
+            while tokens[i].tipo == 'ID':
+                registrar((tokens[i].lexema, tipo, 'variavel', None, None))
+                i += 1
+                if tokens[i].tipo != 'VIRGULA':
+                    break
+                i += 1
+            continue
+        i += 1
+    return varredura
+
+
+def _iniciar(codigo, simbolos):
+    _contexto.update(codigo=codigo, simbolos=simbolos)
+
+
+def compilar_declaracao(posicao, inicio, fim, simbolos):
+    """
+    Analisa, num trabalhador, uma declaração de função ou procedimento do escopo global.
+
+    Args:
+        posicao (int): índice do primeiro token no programa (para as mensagens de erro).
+        inicio, fim (int): trecho da declaração no código-fonte.
+        simbolos (list): assinaturas das funções declaradas no trecho.
+
+    Returns:
+        EntradaCache
+    """
+    codigo = _contexto['codigo']
+    parser = Parser(analisar_codigo(codigo, inicio, fim), codigo)
+    parser.pos = posicao
+    parser.tabela.predeclarar(_contexto['simbolos'])
+    parser.declaracao()
+    if parser.token_atual().tipo != 'EOF':
+        parser.erro("Erro interno: a declaração não termina onde a pré-varredura indicou.")
+    return EntradaCache.do_codigo(parser.codigo_intermediario, 0, 0, parser.temp_count, parser.label_count,
+                                  simbolos)
+
+
+def analisar_em_duas_fases(parser, trabalhadores=None, imprimir=True):
+    """
+    Como parser.analisar(), mas em duas fases (ver o início do módulo).
+
+    Args:
+        parser (Parser): ainda não usado, criado com a lista de tokens e o código-fonte.
+        trabalhadores (int): processos para os corpos; None usa os.cpu_count().
+            Com 1, só há a pré-declaração: os corpos são analisados pelo
+            próprio Parser, na ordem.
+    """
+    tokens = parser.lista_tokens
+    if tokens is None or parser.indice_linhas is None or parser.pos != 0:
+        raise ValueError("A compilação em duas fases precisa de um Parser novo, com a lista de tokens e o código-fonte.")
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    if trabalhadores < 1:
+        raise ValueError(f"Número de trabalhadores inválido: {trabalhadores}.")
+
+    varredura = prevarrer(tokens)
+    parser.tabela.predeclarar(varredura.simbolos)
+    if trabalhadores == 1:
+        return parser.analisar(imprimir)
+
+    def assinatura(nome):
+        pilha = parser.tabela.ligacoes.get(nome)
+        return pilha[-1].assinatura() if pilha else None
+
+    def preparar(posicao, fim, simbolos):
+        chave = None
+        if parser.cache is not None:
+            chave = chave_declaracao(tokens, posicao, fim, assinatura)
+            entrada = parser.cache.obter(chave)
+            if entrada is not None:
+                return lambda: entrada
+        futuro = executor.submit(compilar_declaracao, posicao, tokens[posicao].inicio,
+                                 tokens[fim - 1].inicio + 1, simbolos)
+
+        def concluir():
+            entrada = futuro.result()
+            if chave is not None:
+                parser.cache.guardar(chave, entrada)
+            return entrada
+
+        return concluir
+
+    codigo = parser.indice_linhas.codigo
+    with ProcessPoolExecutor(trabalhadores, initializer=_iniciar, initargs=(codigo, varredura.simbolos)) as executor:
+        try:
+            for posicao, fim, simbolos in varredura.declaracoes:
+                parser.declaracoes_prontas[posicao] = (fim, preparar(posicao, fim, simbolos))
+            parser.analisar(imprimir)
+        finally:
+            # num erro, as tarefas que ainda não começaram não servem para nada
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,14 @@
+import pytest
+
+from compilador import compilar, executar
+
+
+@pytest.fixture
+def rodar():
+    """Compila e executa um programa; devolve (linhas escritas, parser)."""
+    def rodar(codigo, nivel_otimizacao=0, backend='vm', **opcoes):
+        parser = compilar(codigo, nivel_otimizacao=nivel_otimizacao, **opcoes)
+        saida = []
+        executar(parser, saida=lambda *valores: saida.append(' '.join(map(str, valores))), backend=backend)
+        return saida, parser
+    return rodar
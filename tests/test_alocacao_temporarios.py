@@ -0,0 +1,70 @@
+import pytest
+
+from compilador import compilar, executar
+from intermediario.quadruplas import eh_temporario
+from otimizacao.alocacao_temporarios import _varredura, alocar_temporarios
+
+PROGRAMA = """inicio_programa main
+inteiro a, b;
+funcao f(inteiro w, inteiro x, inteiro y, inteiro z): inteiro {
+    retorna (w + x) * (y + z) + (w - x) * (y - z);
+}
+a = 1;
+b = 2;
+escreva(f(a, b, 3, 4) + a * b);
+fim_programa
+"""
+
+
+def _executar(parser, codigo):
+    parser.codigo_intermediario = codigo
+    saida = []
+    executar(parser, saida=lambda *valores: saida.append(' '.join(map(str, valores))))
+    return saida
+
+
+def test_varredura_sem_limite_reaproveita():
+    intervalos = {'a': [0, 3], 'b': [1, 2], 'c': [4, 6]}
+    assert _varredura(intervalos) == ({'a': 0, 'b': 1, 'c': 0}, [])
+
+
+def test_varredura_derrama_o_que_termina_mais_tarde():
+    intervalos = {'a': [0, 9], 'b': [1, 2], 'c': [3, 4]}
+    atribuido, derramados = _varredura(intervalos, limite=1)
+    assert derramados == ['a']
+    assert atribuido == {'b': 0, 'c': 0}
+
+
+def test_varredura_derrama_o_novo_quando_termina_depois():
+    intervalos = {'a': [0, 3], 'b': [1, 9]}
+    assert _varredura(intervalos, limite=1) == ({'a': 0}, ['b'])
+
+
+@pytest.mark.parametrize('registradores, derramados', [(None, 0), (1, 4), (2, 1), (3, 0)])
+def test_derramados_e_saida(registradores, derramados):
+    parser = compilar(PROGRAMA)
+    original = parser.codigo_intermediario
+    novo, info = alocar_temporarios(original, registradores)
+    assert info['derramados'] == derramados
+    # f tem três temporários vivos ao mesmo tempo; o principal, dois
+    assert info['max_vivos_por_funcao'] == {'<principal>': 2, 'f': 3}
+    assert info['max_vivos'] == 3
+    assert info['temporarios_antes'] == 10
+    if registradores is not None:
+        registros = {v for q in novo for v in (q.resultado, q.arg1, q.arg2)
+                     if isinstance(v, str) and eh_temporario(v) and not v.startswith('_tm')}
+        assert len(registros) <= registradores
+    assert _executar(parser, novo) == _executar(compilar(PROGRAMA), original) == ['24']
+
+
+@pytest.mark.parametrize('registradores', [1, 2])
+@pytest.mark.parametrize('backend', ['vm', 'python'])
+def test_limite_no_compilador_mantem_a_saida(rodar, registradores, backend):
+    saida, parser = rodar(PROGRAMA, nivel_otimizacao=2, registradores=registradores, backend=backend)
+    assert saida == ['24']
+    assert parser.relatorio_otimizacao['alocar_temporarios']['max_vivos_por_funcao']['f'] == 3
+
+
+def test_registradores_deve_ser_positivo():
+    with pytest.raises(ValueError):
+        alocar_temporarios(compilar(PROGRAMA).codigo_intermediario, 0)
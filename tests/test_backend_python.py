@@ -0,0 +1,115 @@
+import pytest
+
+from compilador import compilar
+from execucao import backend_python
+from execucao.backend_python import BackendPython, CacheCodigo
+from intermediario.quadruplas import Op, Quadrupla
+
+PROGRAMA = """inicio_programa main
+inteiro i, s;
+funcao passo(inteiro v): inteiro {
+    se (v > 2) {
+        retorna v;
+    }
+    retorna 0 - 1;
+}
+procedimento mostra(inteiro n) {
+    enquanto (n > 0) {
+        se (n == 2) {
+            escreva(n * 10);
+        } senao {
+            escreva(n);
+        }
+        n = n - 1;
+    }
+}
+i = 0;
+s = 0;
+enquanto (i < 5) {
+    s = s + passo(i);
+    i = i + 1;
+}
+escreva(s);
+mostra(3);
+fim_programa
+"""
+ESPERADO = ['4', '3', '20', '1']
+
+# x := 0; if verdadeiro goto L1; L0: escreva x; L1: x := x + 1; if x < 3 goto L0; escreva x
+# (o salto entra no meio do laço: o fluxo não vira if/while)
+IRREDUTIVEL = [
+    Quadrupla(Op.COPIA, 'x', '0'),
+    Quadrupla(Op.SE, 'L1', 'verdadeiro'),
+    Quadrupla(Op.ROTULO, 'L0'),
+    Quadrupla(Op.ESCREVA, None, 'x'),
+    Quadrupla(Op.ROTULO, 'L1'),
+    Quadrupla(Op.SOMA, 'x', 'x', '1'),
+    Quadrupla(Op.MENOR, '_t0', 'x', '3'),
+    Quadrupla(Op.SE, 'L0', '_t0'),
+    Quadrupla(Op.ESCREVA, None, 'x'),
+]
+
+
+def _executar(codigo, cache=None):
+    saida = []
+    backend = BackendPython(codigo, saida=saida.append, cache=cache or CacheCodigo())
+    globais = backend.executar()
+    return saida, globais, backend
+
+
+@pytest.mark.parametrize('nivel', [0, 1, 2])
+def test_reconstroi_if_e_while(rodar, nivel):
+    parser = compilar(PROGRAMA, nivel_otimizacao=nivel)
+    saida, globais, backend = _executar(parser.codigo_intermediario)
+    assert all(backend.estruturadas.values())
+    assert 'while True:' in backend.fonte and 'else:' in backend.fonte
+    assert '_b = ' not in backend.fonte
+    assert saida == ESPERADO
+    assert rodar(PROGRAMA, nivel_otimizacao=nivel, backend='vm')[0] == ESPERADO
+    assert globais == {'i': 5, 's': 4}
+
+
+def test_fluxo_irredutivel_usa_o_despacho():
+    saida, globais, backend = _executar(IRREDUTIVEL)
+    assert backend.estruturadas == {'<principal>': False}
+    assert '_b = ' in backend.fonte
+    assert saida == ['1', '2', '3']
+    assert globais == {'x': 3}
+
+
+@pytest.mark.parametrize('nivel', [0, 2])
+def test_despacho_forcado_da_a_mesma_saida(monkeypatch, nivel):
+    def recusar(*_):
+        raise backend_python._NaoEstruturavel()
+
+    monkeypatch.setattr(backend_python._GeradorFuncao, 'regiao', recusar)
+    codigo = compilar(PROGRAMA, nivel_otimizacao=nivel).codigo_intermediario
+    saida, globais, backend = _executar(codigo)
+    assert not any(backend.estruturadas.values())
+    assert saida == ESPERADO
+    assert globais == {'i': 5, 's': 4}
+
+
+def test_cache_em_memoria_lru():
+    cache = CacheCodigo(limite=1)
+    primeiro = cache.obter("a = 1\n")
+    assert cache.obter("a = 1\n") is primeiro
+    assert (cache.acertos, cache.falhas) == (1, 1)
+    cache.obter("b = 2\n")
+    # o limite de 1 objeto tirou o primeiro da memória
+    assert cache.obter("a = 1\n") is not primeiro
+    assert (cache.acertos, cache.falhas) == (1, 3)
+
+
+def test_cache_em_disco_entre_execucoes(tmp_path):
+    codigo = compilar(PROGRAMA).codigo_intermediario
+    cache = CacheCodigo(diretorio=str(tmp_path))
+    assert _executar(codigo, cache)[0] == ESPERADO
+    funcoes = cache.falhas
+    assert (cache.acertos, funcoes) == (0, 3)
+    assert len(list(tmp_path.glob('*.marshal'))) == funcoes
+
+    # outro processo: memória vazia, objetos lidos do disco com marshal
+    cache = CacheCodigo(diretorio=str(tmp_path))
+    assert _executar(codigo, cache)[0] == ESPERADO
+    assert (cache.acertos, cache.falhas) == (funcoes, 0)
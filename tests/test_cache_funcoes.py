@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+from compilador import compilar
+from intermediario.quadruplas import Op, Quadrupla
+from lexico.analisador_lexico import analisar_codigo
+from sintatico.cache_funcoes import CacheFuncoes, EntradaCache, chave_declaracao, fim_declaracao
+
+DOBRO = """funcao dobro(inteiro x): inteiro {
+    se (x > 0) {
+        retorna x * 2 + 1;
+    }
+    retorna x * 2;
+}
+"""
+
+MOSTRA = """procedimento mostra(inteiro v) {
+    escreva(dobro(v) + 1);
+}
+"""
+
+
+def _programa(*declaracoes, corpo="mostra(3);\nescreva(dobro(0 - 2));\n"):
+    return "inicio_programa main\n" + ''.join(declaracoes) + corpo + "fim_programa\n"
+
+
+def test_acerto_na_segunda_compilacao(tmp_path, rodar):
+    programa = _programa(DOBRO, MOSTRA)
+    cache = CacheFuncoes(str(tmp_path))
+    primeiro = compilar(programa, cache=cache).codigo_intermediario
+    assert (cache.acertos, cache.falhas, cache.gravacoes) == (0, 2, 2)
+
+    # outro processo: um cache novo sobre o mesmo diretório
+    cache = CacheFuncoes(str(tmp_path))
+    saida, parser = rodar(programa, cache=cache)
+    assert (cache.acertos, cache.falhas, cache.gravacoes) == (2, 0, 0)
+    assert parser.codigo_intermediario == primeiro
+    assert saida == ['8', '-4']
+
+
+def test_emenda_renumera_temporarios_e_rotulos(tmp_path):
+    cache = CacheFuncoes(str(tmp_path))
+    compilar(_programa(DOBRO, corpo="escreva(dobro(1));\n"), cache=cache)
+    # agora dobro vem do cache depois de uma função que já usou _t e L
+    programa = _programa(DOBRO.replace('dobro', 'antes'), DOBRO, MOSTRA)
+    com_cache = compilar(programa, cache=cache).codigo_intermediario
+    assert cache.acertos == 1
+    assert com_cache == compilar(programa).codigo_intermediario
+
+
+def test_renumerar_so_troca_nomes_nas_posicoes_do_tipo():
+    # a variável L0 e o temporário _t5 coexistem com o rótulo L2
+    codigo = [
+        Quadrupla(Op.SOMA, '_t5', 'L0', '1'),
+        Quadrupla(Op.SE_NAO, 'L2', '_t5'),
+        Quadrupla(Op.CHAMADA, '_t6', 'f', 0),
+        Quadrupla(Op.ROTULO, 'L2'),
+    ]
+    entrada = EntradaCache.do_codigo(codigo, 5, 2, 2, 1, [])
+    assert entrada.linhas[0] == [Op.SOMA.value, '_t0', 'L0', '1']
+    assert entrada.codigo(5, 2) == codigo
+    assert entrada.codigo(9, 0) == [
+        Quadrupla(Op.SOMA, '_t9', 'L0', '1'),
+        Quadrupla(Op.SE_NAO, 'L0', '_t9'),
+        Quadrupla(Op.CHAMADA, '_t10', 'f', 0),
+        Quadrupla(Op.ROTULO, 'L0'),
+    ]
+
+
+def _chave(fonte, assinatura):
+    tokens = analisar_codigo(fonte)
+    return chave_declaracao(tokens, 0, fim_declaracao(tokens, 0), assinatura)
+
+
+def test_chave_muda_com_a_assinatura_da_funcao_chamada():
+    def assinatura(retorno):
+        return lambda nome: (nome, retorno, 'funcao', [('x', 'inteiro')], retorno) if nome == 'dobro' else None
+
+    chave = _chave(MOSTRA, assinatura('inteiro'))
+    assert _chave(MOSTRA.replace('\n    ', ' '), assinatura('inteiro')) == chave
+    assert _chave(MOSTRA, assinatura('booleano')) != chave
+
+
+def test_mudar_a_funcao_chamada_invalida_quem_chama(tmp_path):
+    cache = CacheFuncoes(str(tmp_path))
+    compilar(_programa(DOBRO, MOSTRA), cache=cache)
+    # mostra não muda, mas dobro passa a receber dois parâmetros
+    outra = "funcao dobro(inteiro x, inteiro y): inteiro {\n    retorna x * 2;\n}\n"
+    with pytest.raises(Exception, match="espera 2 argumentos"):
+        compilar(_programa(outra, MOSTRA, corpo=""), cache=cache)
+    assert cache.acertos == 0
+
+
+def _entrada(tamanho):
+    return EntradaCache(0, 0, [], [[Op.ESCREVA.value, None, 'x' * tamanho, None]])
+
+
+def test_remove_as_entradas_usadas_ha_mais_tempo(tmp_path):
+    cache = CacheFuncoes(str(tmp_path), limite_bytes=1000)
+    for i, chave in enumerate(('a', 'b', 'c')):
+        cache.guardar(chave, _entrada(200))
+        os.utime(tmp_path / f"{chave}.json", (i, i))
+    # o acerto renova a mais antiga
+    assert cache.obter('a') is not None
+    cache.guardar('d', _entrada(300))
+    assert sorted(os.listdir(tmp_path)) == ['a.json', 'c.json', 'd.json']
+    assert cache.remocoes == 1
+    assert cache.obter('b') is None
+    assert (cache.acertos, cache.falhas) == (1, 1)
@@ -0,0 +1,42 @@
+import pytest
+
+from intermediario.quadruplas import Op
+
+# f conta as chamadas em n: com curto-circuito, só a segunda condição chama f
+PROGRAMA = """inicio_programa main
+inteiro n;
+booleano a;
+funcao f(): booleano {
+    n = n + 1;
+    retorna verdadeiro;
+}
+a = falso;
+se (!(a e f())) {
+    escreva(1);
+}
+se (!(!(a ou verdadeiro) ou f())) {
+    escreva(2);
+} senao {
+    escreva(3);
+}
+enquanto (!(n > 0 ou f())) {
+    escreva(4);
+}
+se (!(a) == verdadeiro e !(n > 5)) {
+    escreva(5);
+}
+escreva(n);
+fim_programa
+"""
+
+
+@pytest.mark.parametrize('nivel', [0, 1, 2])
+@pytest.mark.parametrize('backend', ['vm', 'python'])
+def test_negacao_de_grupo_mantem_curto_circuito(rodar, nivel, backend):
+    saida, _ = rodar(PROGRAMA, nivel_otimizacao=nivel, backend=backend)
+    assert saida == ['1', '3', '5', '1']
+
+
+def test_negacao_de_grupo_nao_calcula_o_valor(rodar):
+    _, parser = rodar(PROGRAMA)
+    assert not any(q.op in (Op.E, Op.OU) for q in parser.codigo_intermediario)
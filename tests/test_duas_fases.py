@@ -0,0 +1,40 @@
+import pytest
+
+from compilador import compilar
+from intermediario.quadruplas import listagem
+
+# globais declaradas depois das funções, com o mesmo nome de parâmetros e locais delas
+SOMBRAS = """inicio_programa main
+funcao f(inteiro x): inteiro {
+    inteiro y;
+    y = x * 2;
+    retorna y + 1;
+}
+procedimento p(inteiro g) {
+    booleano x;
+    x = g > 3;
+    escreva(x);
+}
+inteiro x, y;
+booleano g;
+x = 3;
+y = f(x);
+g = y > 6;
+escreva(y);
+p(y);
+fim_programa
+"""
+
+
+@pytest.mark.parametrize('trabalhadores', [1, 2])
+def test_duas_fases_aceita_locais_com_nome_de_global_posterior(rodar, trabalhadores):
+    esperado, sequencial = rodar(SOMBRAS)
+    saida, duas_fases = rodar(SOMBRAS, duas_fases=True, trabalhadores=trabalhadores)
+    assert saida == esperado == ['7', 'verdadeiro']
+    assert listagem(duas_fases.codigo_intermediario) == listagem(sequencial.codigo_intermediario)
+
+
+def test_duas_fases_ainda_rejeita_local_repetido():
+    codigo = SOMBRAS.replace("    inteiro y;\n", "    inteiro y, y;\n")
+    with pytest.raises(Exception, match="'y' já declarado"):
+        compilar(codigo, duas_fases=True, trabalhadores=1)
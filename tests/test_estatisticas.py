@@ -0,0 +1,70 @@
+import io
+import pstats
+
+from compilador import compilar, executar
+from instrumentacao.estatisticas import Estatisticas, perfilar
+from lexico.analisador_lexico import analisar_codigo
+
+PROGRAMA = """inicio_programa main
+inteiro a, b;
+a = 3;
+b = 0;
+enquanto (a > 0) {
+    b = b + a * 2;
+    a = a - 1;
+}
+escreva(b);
+fim_programa
+"""
+
+
+def test_fases_e_contadores_da_compilacao():
+    chamadas = []
+    estatisticas = Estatisticas(ganchos=[lambda nome, medidas: chamadas.append(nome)])
+    parser = compilar(PROGRAMA, estatisticas=estatisticas, nivel_otimizacao=1)
+    executar(parser, saida=lambda *_: None, estatisticas=estatisticas)
+
+    nomes = ['lexico', 'sintatico', 'otimizacao', 'carga_vm', 'execucao']
+    assert list(estatisticas.fases) == nomes
+    assert chamadas == nomes
+    for medidas in estatisticas.fases.values():
+        assert medidas['segundos'] >= 0
+        assert medidas['pico_memoria_bytes'] > 0
+
+    sem_otimizacao = compilar(PROGRAMA)
+    contadores = estatisticas.contadores
+    assert contadores['tokens_lexados'] == len(analisar_codigo(PROGRAMA)) == 44
+    # todos menos o EOF
+    assert contadores['tokens_consumidos'] == 43
+    # os contadores do Parser são os da análise, antes da otimização
+    assert contadores['temporarios'] == sem_otimizacao.temp_count == 4
+    assert contadores['rotulos'] == 3
+    assert contadores['linhas_tac'] == len(sem_otimizacao.codigo_intermediario)
+    assert contadores['instrucoes_removidas'] == \
+        contadores['linhas_tac'] - len(parser.codigo_intermediario)
+    assert (contadores['buscas_simbolos'], contadores['profundidade_max_escopo']) == (9, 1)
+
+    relatorio = estatisticas.relatorio()
+    assert all(nome in relatorio for nome in nomes)
+    assert 'escopos_por_busca' in relatorio
+
+
+def test_fase_acumula_e_sem_memoria():
+    estatisticas = Estatisticas(medir_memoria=False)
+    for _ in range(2):
+        with estatisticas.fase('passo'):
+            pass
+    estatisticas.contar('passos', 2)
+    assert list(estatisticas.fases) == ['passo']
+    assert 'pico_memoria_bytes' not in estatisticas.fases['passo']
+    assert estatisticas.como_dict()['contadores']['passos'] == 2
+
+
+def test_perfilar(tmp_path):
+    caminho = tmp_path / 'perfil.prof'
+    saida = io.StringIO()
+    with perfilar(str(caminho), limite=5, saida=saida):
+        compilar(PROGRAMA)
+    assert 'compilar' in saida.getvalue()
+    funcoes = {nome for _, _, nome in pstats.Stats(str(caminho)).stats}
+    assert {'compilar', 'analisar'} <= funcoes
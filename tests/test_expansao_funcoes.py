@@ -0,0 +1,24 @@
+import pytest
+
+from intermediario.quadruplas import Op
+
+PROGRAMA = """inicio_programa main
+inteiro a;
+funcao soma(inteiro x): inteiro {
+    retorna x + a;
+}
+a = 3;
+escreva(soma(a));
+fim_programa
+"""
+
+
+def _chamadas(parser):
+    return sum(q.op == Op.CHAMADA for q in parser.codigo_intermediario)
+
+
+@pytest.mark.parametrize('limite, chamadas', [(None, 0), (0, 1)])
+def test_compilar_repassa_o_limite_de_expansao(rodar, limite, chamadas):
+    saida, parser = rodar(PROGRAMA, nivel_otimizacao=2, limite_expansao=limite)
+    assert saida == ['6']
+    assert _chamadas(parser) == chamadas
@@ -0,0 +1,83 @@
+from intermediario.quadruplas import Op, Quadrupla
+from otimizacao.cfg import grafos_por_funcao
+from otimizacao.fluxo_dados import definicoes_alcancantes, expressoes_disponiveis
+
+# x := 1; t := x + y; ifFalse c goto L1; x := 2; L1: u := y + x; escreva u
+DESVIO = [
+    Quadrupla(Op.COPIA, 'x', '1'),
+    Quadrupla(Op.SOMA, 't', 'x', 'y'),
+    Quadrupla(Op.SE_NAO, 'L1', 'c'),
+    Quadrupla(Op.COPIA, 'x', '2'),
+    Quadrupla(Op.ROTULO, 'L1'),
+    Quadrupla(Op.SOMA, 'u', 'y', 'x'),
+    Quadrupla(Op.ESCREVA, None, 'u'),
+]
+
+# x := 0; L0: ifFalse c goto L1; x := x + 1; goto L0; L1: escreva x
+LACO = [
+    Quadrupla(Op.COPIA, 'x', '0'),
+    Quadrupla(Op.ROTULO, 'L0'),
+    Quadrupla(Op.SE_NAO, 'L1', 'c'),
+    Quadrupla(Op.SOMA, 'x', 'x', '1'),
+    Quadrupla(Op.GOTO, 'L0'),
+    Quadrupla(Op.ROTULO, 'L1'),
+    Quadrupla(Op.ESCREVA, None, 'x'),
+]
+
+
+def _grafo(codigo):
+    return grafos_por_funcao(codigo)[0]
+
+
+def _por_instrucao(resultado):
+    return [sorted(resultado.universo.itens(m), key=str) for m in resultado.por_instrucao()]
+
+
+def test_definicoes_alcancantes_juntam_os_dois_caminhos():
+    grafo = _grafo(DESVIO)
+    alcancam = _por_instrucao(definicoes_alcancantes(grafo))
+    assert alcancam[3] == [0, 1]
+    # depois do desvio, as duas definições de x alcançam o uso
+    assert alcancam[5] == [0, 1, 3]
+    assert alcancam[6] == [0, 1, 3, 5]
+
+
+def test_definicoes_alcancantes_no_laco():
+    grafo = _grafo(LACO)
+    resultado = definicoes_alcancantes(grafo)
+    alcancam = _por_instrucao(resultado)
+    # no cabeçalho chegam a inicial e a da volta; a do corpo mata a inicial
+    assert alcancam[2] == [0, 3]
+    assert alcancam[4] == [3]
+    assert alcancam[6] == [0, 3]
+    saida_corpo = resultado.saida[grafo.bloco_do_rotulo['L0'] + 1]
+    assert resultado.universo.itens(saida_corpo) == [3]
+
+
+def test_expressoes_disponiveis_morrem_quando_um_operando_e_reescrito():
+    grafo = _grafo(DESVIO)
+    resultado = expressoes_disponiveis(grafo)
+    disponiveis = _por_instrucao(resultado)
+    soma = (Op.SOMA, 'x', 'y')
+    assert disponiveis[2] == [soma]
+    assert disponiveis[4] == []
+    # y + x é a mesma expressão que x + y
+    assert disponiveis[6] == [soma]
+    assert len(resultado.universo) == 1
+
+
+def test_chamada_invalida_so_as_expressoes_com_globais():
+    marca = Quadrupla(Op.FUNCAO, 'f', ('a',), ())
+    codigo = [
+        marca,
+        Quadrupla(Op.SOMA, '_t0', 'a', '1'),
+        Quadrupla(Op.SOMA, '_t1', 'g', '1'),
+        Quadrupla(Op.CHAMADA, '_t2', 'h', 0),
+        Quadrupla(Op.RETORNO, None, '_t0'),
+        Quadrupla(Op.FIM_FUNCAO, 'f'),
+    ]
+    grafo = grafos_por_funcao(codigo)[1]
+    disponiveis = _por_instrucao(expressoes_disponiveis(grafo))
+    assert [e[1:] for e in disponiveis[2]] == [('1', 'a'), ('1', 'g')]
+    # a chamada pode mudar g, mas não o parâmetro a nem o literal
+    assert [e[1:] for e in disponiveis[3]] == [('1', 'a')]
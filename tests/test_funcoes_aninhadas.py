@@ -0,0 +1,45 @@
+import pytest
+
+from compilador import compilar, executar
+from intermediario.quadruplas import listagem
+
+PROGRAMA = """inicio_programa main
+inteiro r;
+funcao f(inteiro a): inteiro {
+    inteiro b;
+    funcao g(inteiro c): inteiro {
+        retorna %s;
+    }
+    b = 5;
+    retorna g(a);
+}
+r = f(1);
+escreva(r);
+fim_programa
+"""
+
+
+@pytest.mark.parametrize('nivel', [0, 1, 2])
+@pytest.mark.parametrize('backend', ['vm', 'python'])
+def test_aninhada_usa_os_proprios_nomes_e_as_globais(rodar, nivel, backend):
+    saida, _ = rodar(PROGRAMA % 'c + r + 1', nivel_otimizacao=nivel, backend=backend)
+    assert saida == ['2']
+
+
+@pytest.mark.parametrize('expressao, nome', [('b + c', 'b'), ('a + c', 'a')])
+def test_locais_da_funcao_de_fora_sao_analisados_e_listados(expressao, nome):
+    parser = compilar(PROGRAMA % expressao)
+    assert f"_t0 := {expressao}" in listagem(parser.codigo_intermediario)
+
+
+@pytest.mark.parametrize('backend', ['vm', 'python'])
+@pytest.mark.parametrize('codigo', [PROGRAMA % 'b + c', PROGRAMA.replace('retorna %s;', 'b = c;\n        retorna c;')])
+def test_locais_da_funcao_de_fora_nao_sao_executados(codigo, backend):
+    parser = compilar(codigo)
+    with pytest.raises(Exception, match="usa 'b', local de 'f'"):
+        executar(parser, saida=lambda *valores: None, backend=backend)
+
+
+def test_locais_da_funcao_de_fora_nao_sao_otimizados():
+    with pytest.raises(Exception, match="usa 'b', local de 'f'"):
+        compilar(PROGRAMA % 'b + c', nivel_otimizacao=1)
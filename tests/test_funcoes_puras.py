@@ -0,0 +1,45 @@
+import pytest
+
+from compilador import compilar
+from intermediario.quadruplas import Op
+from otimizacao.funcoes_puras import avaliar_funcoes_puras
+
+PROGRAMA = """inicio_programa main
+inteiro a;
+funcao quadrado(inteiro x, inteiro n): inteiro {
+    enquanto (n > 0) {
+        x = x * x;
+        n = n - 1;
+    }
+    retorna x;
+}
+a = quadrado(3, %d);
+escreva(a / a);
+escreva(quadrado(2, 2));
+fim_programa
+"""
+
+
+def _chamadas(codigo):
+    return sum(q.op == Op.CHAMADA for q in codigo)
+
+
+def test_chamada_com_argumentos_constantes_e_avaliada():
+    codigo = compilar(PROGRAMA % 2).codigo_intermediario
+    novo, info = avaliar_funcoes_puras(codigo)
+    assert info['chamadas_avaliadas'] == 2
+    assert _chamadas(novo) == 0
+
+
+def test_resultado_grande_demais_mantem_a_chamada():
+    # 3 elevado a 2**16 não cabe num literal: essa chamada fica para a execução
+    codigo = compilar(PROGRAMA % 16).codigo_intermediario
+    novo, info = avaliar_funcoes_puras(codigo)
+    assert info['chamadas_avaliadas'] == 1
+    assert _chamadas(novo) == 1
+
+
+@pytest.mark.parametrize('nivel', [0, 1, 2])
+def test_resultado_grande_demais_executa(rodar, nivel):
+    saida, _ = rodar(PROGRAMA % 16, nivel_otimizacao=nivel)
+    assert saida == ['1', '16']
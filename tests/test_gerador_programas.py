@@ -0,0 +1,13 @@
+import pytest
+
+from benchmark.gerador_programas import FORMAS, gerar_programa
+from compilador import compilar, executar
+
+
+@pytest.mark.parametrize('forma', FORMAS)
+@pytest.mark.parametrize('profundidade', [1, 4, 8])
+def test_programas_gerados_terminam(forma, profundidade):
+    # com a = 4, os `se (a > 4)` e mais fundos não executam: os laços de fora
+    # não podem depender do corpo mais interno para sair
+    parser = compilar(gerar_programa(4096, forma, profundidade=profundidade))
+    executar(parser, saida=lambda *valores: None)
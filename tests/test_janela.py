@@ -0,0 +1,43 @@
+import pytest
+
+from intermediario.quadruplas import Op, Quadrupla
+from otimizacao.janela import otimizar_janela
+from otimizacao.propagacao_constantes import remover_temporarios_mortos
+
+
+def test_multiplicacao_por_zero_vira_zero():
+    codigo = [Quadrupla(Op.MULT, 'x', 'a', '0')]
+    novo, _ = otimizar_janela(codigo)
+    assert novo == [Quadrupla(Op.COPIA, 'x', '0')]
+
+
+def test_divisao_que_pode_falhar_nao_e_removida():
+    codigo = [Quadrupla(Op.DIV, '_t0', 'a', 'b'), Quadrupla(Op.COPIA, 'x', '0'),
+              Quadrupla(Op.DIV, '_t1', 'a', '2')]
+    assert remover_temporarios_mortos(codigo) == codigo[:2]
+
+
+# a divisão só alimenta um produto por zero, que a janela troca por 0
+DIVISAO_DESCARTADA = """inicio_programa main
+inteiro a, b, c;
+funcao f(inteiro x, inteiro y): inteiro {
+    inteiro r;
+    r = 0 * (x / y) + (x / y) * 0;
+    retorna r;
+}
+a = 7;
+b = 0;
+c = (a / b) * 0;
+escreva(c);
+c = f(a, b);
+escreva(c);
+fim_programa
+"""
+
+
+@pytest.mark.parametrize('nivel', [0, 1, 2])
+@pytest.mark.parametrize('backend', ['vm', 'python'])
+@pytest.mark.parametrize('programa', [DIVISAO_DESCARTADA, DIVISAO_DESCARTADA.replace("c = (a / b) * 0;\nescreva(c);\n", "")])
+def test_divisao_por_zero_descartada_ainda_falha(rodar, nivel, backend, programa):
+    with pytest.raises(Exception, match="divisão por zero"):
+        rodar(programa, nivel, backend)
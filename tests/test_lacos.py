@@ -0,0 +1,172 @@
+import pytest
+
+from intermediario.quadruplas import Op, Quadrupla
+from otimizacao.lacos import otimizar_lacos
+
+LOCAIS = ('a', 'b', 'x', 'y', 'i', 't')
+
+
+def _funcao(corpo_laco, depois=(), saida_no_corpo=None, cabecalho=()):
+    """
+    funcao f(n, m): L0: <cabecalho>; ifFalse n goto L1; <corpo>; n := n - 1; goto L0; L1: <depois>; return 0
+
+    Com saida_no_corpo (lista de instruções), o corpo termina em
+    `ifFalse m goto L2`, e L2 executa essas instruções e retorna: o laço passa
+    a ter uma segunda saída, que só o corpo domina.
+    """
+    codigo = [
+        Quadrupla(Op.FUNCAO, 'f', ('n', 'm'), LOCAIS),
+        Quadrupla(Op.ROTULO, 'L0'),
+        *cabecalho,
+        Quadrupla(Op.SE_NAO, 'L1', 'n'),
+        *corpo_laco,
+    ]
+    if saida_no_corpo is not None:
+        codigo.append(Quadrupla(Op.SE_NAO, 'L2', 'm'))
+    codigo += [
+        Quadrupla(Op.SUB, 'n', 'n', '1'),
+        Quadrupla(Op.GOTO, 'L0'),
+        Quadrupla(Op.ROTULO, 'L1'),
+        *depois,
+        Quadrupla(Op.RETORNO, None, '0'),
+    ]
+    if saida_no_corpo is not None:
+        codigo += [Quadrupla(Op.ROTULO, 'L2'), *saida_no_corpo, Quadrupla(Op.RETORNO, None, '0')]
+    codigo.append(Quadrupla(Op.FIM_FUNCAO, 'f'))
+    return codigo
+
+
+def _movidas(corpo_laco, **opcoes):
+    """Instruções postas antes do cabeçalho e a contagem do passo."""
+    novo, info = otimizar_lacos(_funcao(corpo_laco, **opcoes))
+    return novo[1:novo.index(Quadrupla(Op.ROTULO, 'L0'))], info
+
+
+X = Quadrupla(Op.SOMA, 'x', 'a', 'b')
+ESCREVA_X = Quadrupla(Op.ESCREVA, None, 'x')
+
+
+def test_movida_quando_escrita_uma_vez():
+    movidas, info = _movidas([X, ESCREVA_X])
+    assert movidas == [X]
+    assert info['invariantes_movidas'] == 1
+
+
+def test_fica_quando_escrita_duas_vezes():
+    movidas, info = _movidas([X, ESCREVA_X, Quadrupla(Op.MULT, 'x', 'a', 'b'), ESCREVA_X])
+    assert movidas == []
+    assert info['invariantes_movidas'] == 0
+
+
+def test_fica_quando_viva_na_entrada_do_cabecalho():
+    # a primeira volta escreve o x de antes do laço
+    movidas, _ = _movidas([ESCREVA_X, X])
+    assert movidas == []
+
+
+def test_fica_quando_operando_e_escrito_no_laco():
+    movidas, _ = _movidas([Quadrupla(Op.SOMA, 'x', 'a', 'n'), ESCREVA_X])
+    assert movidas == []
+
+
+def test_invariante_de_invariante_tambem_sai():
+    y = Quadrupla(Op.MULT, 'y', 'x', '2')
+    movidas, info = _movidas([X, y, Quadrupla(Op.ESCREVA, None, 'y')])
+    assert movidas == [X, y]
+    assert info['invariantes_movidas'] == 2
+
+
+def test_movida_quando_domina_as_saidas():
+    # no cabeçalho, x := a + b domina a única saída, onde x é usado
+    movidas, _ = _movidas([], cabecalho=[X], depois=[ESCREVA_X])
+    assert movidas == [X]
+
+
+def test_movida_quando_morta_nas_saidas():
+    movidas, _ = _movidas([X, ESCREVA_X], saida_no_corpo=[])
+    assert movidas == [X]
+
+
+def test_fica_quando_viva_numa_saida_e_nao_domina_as_outras():
+    # x é usado depois da saída pelo corpo; a saída pelo cabeçalho não passa
+    # por x := a + b
+    movidas, _ = _movidas([X], saida_no_corpo=[ESCREVA_X])
+    assert movidas == []
+
+
+@pytest.mark.parametrize('divisor, movida', [('2', True), ('0', False), ('b', False)])
+def test_divisao_so_sai_se_nao_puder_falhar(divisor, movida):
+    # o laço pode não executar nenhuma vez
+    divisao = Quadrupla(Op.DIV, 'x', 'a', divisor)
+    movidas, _ = _movidas([divisao, ESCREVA_X])
+    assert movidas == ([divisao] if movida else [])
+
+
+def test_global_e_invariante_em_laco_sem_chamada():
+    global_ = Quadrupla(Op.SOMA, 'x', 'g', '1')
+    movidas, _ = _movidas([global_, ESCREVA_X])
+    assert movidas == [global_]
+
+
+def test_global_nao_e_invariante_em_laco_com_chamada():
+    global_ = Quadrupla(Op.SOMA, 'x', 'g', '1')
+    movidas, _ = _movidas([global_, ESCREVA_X, Quadrupla(Op.CHAMADA, None, 'p', 0)])
+    assert movidas == []
+
+
+def test_destino_global_nao_sai():
+    movidas, _ = _movidas([Quadrupla(Op.SOMA, 'g', 'a', 'b')])
+    assert movidas == []
+
+
+def test_reducao_de_forca():
+    corpo = [
+        Quadrupla(Op.MULT, 't', 'i', '4'),
+        Quadrupla(Op.ESCREVA, None, 't'),
+        Quadrupla(Op.SOMA, 'i', 'i', '3'),
+    ]
+    novo, info = otimizar_lacos(_funcao(corpo))
+    assert info['reducoes_de_forca'] == 1
+    assert info['invariantes_movidas'] == 0
+    assert novo[1:11] == [
+        Quadrupla(Op.MULT, '_t0', 'i', '4'),
+        Quadrupla(Op.ROTULO, 'L0'),
+        Quadrupla(Op.SE_NAO, 'L1', 'n'),
+        Quadrupla(Op.COPIA, 't', '_t0'),
+        Quadrupla(Op.ESCREVA, None, 't'),
+        Quadrupla(Op.SOMA, 'i', 'i', '3'),
+        Quadrupla(Op.SOMA, '_t0', '_t0', '12'),
+        # n := n - 1 também é indução, mas não tem multiplicação
+        Quadrupla(Op.SUB, 'n', 'n', '1'),
+        Quadrupla(Op.GOTO, 'L0'),
+        Quadrupla(Op.ROTULO, 'L1'),
+    ]
+
+
+def test_sem_reducao_quando_inducao_e_escrita_duas_vezes():
+    corpo = [
+        Quadrupla(Op.MULT, 't', 'i', '4'),
+        Quadrupla(Op.ESCREVA, None, 't'),
+        Quadrupla(Op.SOMA, 'i', 'i', '3'),
+        Quadrupla(Op.SOMA, 'i', 'i', '1'),
+    ]
+    novo, info = otimizar_lacos(_funcao(corpo))
+    assert info['reducoes_de_forca'] == 0
+    assert Quadrupla(Op.MULT, 't', 'i', '4') in novo
+
+
+def test_reducao_de_forca_mantem_a_saida(rodar):
+    programa = """inicio_programa main
+inteiro i, s;
+i = 0;
+s = 0;
+enquanto (i < 5) {
+    s = s + i * 7;
+    i = i + 2;
+}
+escreva(s);
+fim_programa
+"""
+    saida, parser = rodar(programa, nivel_otimizacao=1)
+    assert saida == ['42']
+    assert parser.relatorio_otimizacao['otimizar_lacos']['reducoes_de_forca'] == 1
@@ -0,0 +1,102 @@
+import io
+import re
+
+import pytest
+
+from compilador import LEXICOS, analisar_lexico, compilar
+from intermediario.quadruplas import listagem
+from lexico.analisador_lexico import IndiceLinhas, analisar_codigo, analisar_codigo_compacto, gerar_tokens, tokens_do_arquivo
+from sintatico.analisador_sintatico import Parser
+
+PROGRAMA = """inicio_programa main
+inteiro a, b;
+funcao f(inteiro x): inteiro {
+    retorna x * 2;
+}
+a = 3;
+enquanto (a > 0 e !(b > 4)) {
+    b = b + f(a);
+    a = a - 1;
+}
+escreva(b);
+fim_programa
+"""
+
+
+@pytest.mark.parametrize('lexico', LEXICOS)
+def test_formatos_de_tokens_geram_o_mesmo_tac(rodar, lexico):
+    saida, parser = rodar(PROGRAMA, lexico=lexico)
+    assert saida == ['6']
+    assert listagem(parser.codigo_intermediario) == listagem(compilar(PROGRAMA).codigo_intermediario)
+
+
+def test_fluxo_nao_serve_para_duas_fases():
+    with pytest.raises(ValueError):
+        compilar(PROGRAMA, duas_fases=True, lexico='fluxo')
+
+
+def test_lexico_desconhecido():
+    with pytest.raises(ValueError, match="Léxico desconhecido"):
+        analisar_lexico(PROGRAMA, 'vetor')
+
+
+CRLF = "inicio_programa main\r\ninteiro a;\r\na = 1 +;\r\nfim_programa\r\n"
+
+
+def test_indice_linhas():
+    indice = IndiceLinhas("ab\ncd\r\n\nef")
+    assert indice.localizar(0) == (1, 1)
+    # a quebra pertence à linha que ela termina
+    assert indice.localizar(2) == (1, 3)
+    assert indice.localizar(3) == (2, 1)
+    assert indice.localizar(5) == (2, 3)
+    assert indice.localizar(7) == (3, 1)
+    assert indice.localizar(8) == (4, 1)
+    assert indice.localizar(10) == (4, 3)
+
+
+def test_linha_e_coluna_do_fluxo_compacto():
+    fluxo = analisar_codigo_compacto(CRLF)
+    posicoes = [(fluxo[i].lexema, fluxo.linha_coluna(i)) for i in range(len(fluxo))]
+    assert posicoes[2:6] == [('inteiro', (2, 1)), ('a', (2, 9)), (';', (2, 10)), ('a', (3, 1))]
+    assert posicoes[-1] == ('EOF', (5, 1))
+
+
+@pytest.mark.parametrize('lexico', LEXICOS)
+@pytest.mark.parametrize('codigo, mensagem', [
+    ("inicio_programa 3\nfim_programa\n",
+     "linha 1, coluna 17 (token 1): Esperado 'ID', mas encontrado 'NUMERO' (3)"),
+    ("inicio_programa main\ninteiro a;\na = 1;\nfim_programa 5",
+     "linha 4, coluna 14 (token 10): Tokens inesperados"),
+    ("inicio_programa main\ninteiro a;\n",
+     "linha 3, coluna 1 (token 5): Esperado 'END', mas encontrado 'EOF'"),
+    (CRLF, "linha 3, coluna 8 (token 9): Token inesperado na expressão: PONTOVIRGULA"),
+])
+def test_erro_do_parser_com_linha_e_coluna(lexico, codigo, mensagem):
+    with pytest.raises(SyntaxError, match=r"^Erro sintático na " + re.escape(mensagem)):
+        compilar(codigo, lexico=lexico)
+
+
+def test_caractere_invalido_no_compacto():
+    with pytest.raises(SyntaxError, match="linha 3, coluna 9: '@'"):
+        analisar_codigo_compacto("inicio_programa main\r\ninteiro a;\r\n  a = 1 @ 2;\r\n")
+
+
+@pytest.mark.parametrize('tamanho_bloco', range(1, 9))
+def test_blocos_do_fluxo_nao_mudam_as_posicoes(tamanho_bloco):
+    # blocos pequenos cortam tokens, o \r\n e o ponto do erro em todos os lugares
+    esperados = [(t.tipo, t.lexema, t.inicio) for t in analisar_codigo(CRLF)]
+    fluxo = gerar_tokens(io.StringIO(CRLF), tamanho_bloco)
+    assert [(t.tipo, t.lexema, t.inicio) for t in fluxo] == esperados
+    with pytest.raises(SyntaxError, match="linha 3, coluna 8 "):
+        Parser(gerar_tokens(io.StringIO(CRLF), tamanho_bloco), CRLF).analisar(imprimir=False)
+
+
+@pytest.mark.parametrize('usar_mmap', [True, False])
+def test_erro_no_ultimo_bloco_do_arquivo(tmp_path, usar_mmap):
+    codigo = PROGRAMA.replace("fim_programa\n", "fim_programa 5")
+    caminho = tmp_path / 'programa.txt'
+    caminho.write_bytes(codigo.encode('utf-8'))
+    tokens = tokens_do_arquivo(str(caminho), usar_mmap=usar_mmap, tamanho_bloco=16)
+    with pytest.raises(SyntaxError, match="linha 12, coluna 14 "):
+        Parser(tokens, codigo).analisar(imprimir=False)
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from compilador import compilar
+from intermediario.quadruplas import listagem
+from lote import compilar_lote, main
+
+BOM = "inicio_programa main\ninteiro a;\na = 2;\nenquanto (a > 0) {\n    escreva(a);\n    a = a - 1;\n}\nfim_programa\n"
+RUIM = "inicio_programa main\ninteiro a;\nb = 2;\nfim_programa\n"
+
+
+@pytest.fixture
+def fontes(tmp_path):
+    entrada = tmp_path / 'fontes'
+    (entrada / 'sub').mkdir(parents=True)
+    (entrada / 'bom.txt').write_text(BOM, encoding='utf-8')
+    (entrada / 'sub' / 'ruim.txt').write_text(RUIM, encoding='utf-8')
+    return entrada
+
+
+@pytest.mark.parametrize('trabalhadores', [1, 2])
+def test_grava_tac_erro_e_resumo(tmp_path, fontes, trabalhadores):
+    saida = tmp_path / 'saida'
+    # resultados opostos de uma execução anterior
+    (saida / 'sub').mkdir(parents=True)
+    (saida / 'bom.erro').write_text('velho\n', encoding='utf-8')
+    (saida / 'sub' / 'ruim.tac').write_text('velho\n', encoding='utf-8')
+
+    codigo = main([str(fontes / '**' / '*.txt'), '--saida', str(saida), '-j', str(trabalhadores)])
+    assert codigo == 1
+
+    assert sorted(p.relative_to(saida).as_posix() for p in saida.rglob('*') if p.is_file()) == \
+        ['bom.tac', 'resumo.json', 'sub/ruim.erro']
+    tac = '\n'.join(listagem(compilar(BOM).codigo_intermediario)) + '\n'
+    assert (saida / 'bom.tac').read_text(encoding='utf-8') == tac
+    erro = (saida / 'sub' / 'ruim.erro').read_text(encoding='utf-8')
+    assert erro == "Exception: Identificador 'b' não declarado.\n"
+
+    resumo = json.loads((saida / 'resumo.json').read_text(encoding='utf-8'))
+    resultados = {r['arquivo']: r for r in resumo['resultados']}
+    bom, ruim = resultados[str(fontes / 'bom.txt')], resultados[str(fontes / 'sub' / 'ruim.txt')]
+    assert len(resultados) == 2
+    assert (bom['ok'], bom['erro'], bom['bytes'], bom['instrucoes']) == (True, None, len(BOM), tac.count('\n'))
+    assert (ruim['ok'], ruim['instrucoes'], ruim['bytes']) == (False, 0, len(RUIM))
+    assert ruim['erro'] == erro.rstrip('\n')
+    assert resumo['segundos'] >= 0
+
+
+@pytest.mark.parametrize('trabalhadores', [1, 2])
+def test_compilar_lote_mantem_a_ordem(tmp_path, fontes, trabalhadores):
+    caminhos = [str(fontes / 'sub' / 'ruim.txt'), str(fontes / 'bom.txt')]
+    resultados = compilar_lote(caminhos, str(tmp_path / 'saida'), trabalhadores=trabalhadores, nivel_otimizacao=1)
+    assert [(r['arquivo'], r['ok']) for r in resultados] == [(caminhos[0], False), (caminhos[1], True)]
+    assert (tmp_path / 'saida' / 'bom.tac').exists()
+
+
+def test_trabalhadores_invalidos(tmp_path):
+    with pytest.raises(ValueError):
+        compilar_lote([], str(tmp_path), trabalhadores=-1)
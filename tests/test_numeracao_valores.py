@@ -0,0 +1,66 @@
+import pytest
+
+from intermediario.quadruplas import Op, Quadrupla
+from otimizacao.numeracao_valores import numerar_valores
+
+
+def q(op, resultado=None, arg1=None, arg2=None):
+    return Quadrupla(op, resultado, arg1, arg2)
+
+
+def test_subexpressao_repetida_vira_copia():
+    codigo = [q(Op.SOMA, '_t0', 'a', 'b'), q(Op.SOMA, '_t1', 'b', 'a'), q(Op.COPIA, 'x', '_t1')]
+    novo, info = numerar_valores(codigo)
+    assert novo[1] == q(Op.COPIA, '_t1', '_t0')
+    assert info['subexpressoes_eliminadas'] == 1
+
+
+def test_atribuicao_invalida_o_valor():
+    codigo = [q(Op.SOMA, '_t0', 'a', 'b'), q(Op.COPIA, 'a', '1'), q(Op.SOMA, '_t1', 'a', 'b')]
+    novo, info = numerar_valores(codigo)
+    assert novo == codigo
+    assert info['subexpressoes_eliminadas'] == 0
+
+
+def test_chamada_invalida_as_globais():
+    codigo = [q(Op.MULT, '_t0', 'g', '2'), q(Op.CHAMADA, '_t1', 'f', 0), q(Op.MULT, '_t2', 'g', '2')]
+    novo, info = numerar_valores(codigo)
+    assert novo == codigo
+    assert info['subexpressoes_eliminadas'] == 0
+
+
+def test_nao_atravessa_blocos():
+    codigo = [q(Op.SOMA, '_t0', 'a', 'b'), q(Op.ROTULO, 'L0'), q(Op.SOMA, '_t1', 'a', 'b')]
+    novo, info = numerar_valores(codigo)
+    assert novo == codigo
+    assert info['subexpressoes_eliminadas'] == 0
+
+
+# os parâmetros não são constantes, então só a numeração elimina as repetições
+PROGRAMA = """inicio_programa main
+inteiro r;
+funcao f(inteiro a, inteiro b): inteiro {
+    inteiro c, d;
+    c = (a * b) + (a * b) * 2;
+    d = (b * a) - c;
+    escreva(c);
+    a = 1;
+    escreva(a * b);
+    retorna d;
+}
+r = f(7, 5);
+escreva(r);
+fim_programa
+"""
+
+
+@pytest.mark.parametrize('nivel', [1, 2])
+@pytest.mark.parametrize('backend', ['vm', 'python'])
+def test_programa_otimizado_escreve_o_mesmo(rodar, nivel, backend):
+    esperado, sem_otimizacao = rodar(PROGRAMA)
+    saida, otimizado = rodar(PROGRAMA, nivel, backend)
+    assert saida == esperado == ['105', '5', '-70']
+    multiplicacoes = [x for x in otimizado.codigo_intermediario if x.op == Op.MULT]
+    # a * b e b * a são o mesmo valor até `a = 1`; depois, um novo
+    assert len(multiplicacoes) < sum(x.op == Op.MULT for x in sem_otimizacao.codigo_intermediario)
+    assert otimizado.relatorio_otimizacao['numerar_valores']['subexpressoes_eliminadas'] >= 2
@@ -0,0 +1,66 @@
+import pytest
+
+from compilador import compilar
+from intermediario.quadruplas import Op, Quadrupla
+from otimizacao.propagacao_condicional import INDEFINIDO, VARIAVEL, encontro, propagar_constantes_condicional
+
+LACO_MORTO = """inicio_programa main
+inteiro x;
+x = 0;
+enquanto (x > 0) {
+    escreva(x);
+    x = x - 1;
+}
+escreva(x);
+fim_programa
+"""
+
+# x só recebe 1: a φ do cabeçalho junta 1 com 1
+LACO_CONSTANTE = """inicio_programa main
+inteiro x, n;
+x = 1;
+n = 3;
+enquanto (n > 0) {
+    x = 1;
+    n = n - 1;
+}
+escreva(x + 1);
+fim_programa
+"""
+
+
+def test_encontro():
+    assert encontro(INDEFINIDO, 3) == 3
+    assert encontro(3, 3) == 3
+    assert encontro(3, 4) is VARIAVEL
+    assert encontro(VARIAVEL, INDEFINIDO) is VARIAVEL
+
+
+def test_laco_que_nunca_executa_perde_o_corpo():
+    codigo = compilar(LACO_MORTO).codigo_intermediario
+    novo, info = propagar_constantes_condicional(codigo)
+    assert Op.SE not in [q.op for q in novo]
+    assert [q for q in novo if q.op == Op.ESCREVA] == [Quadrupla(Op.ESCREVA, None, '0')]
+    assert info['desvios_resolvidos'] == 1
+    assert info['blocos_removidos'] == 1
+    assert info['instrucoes_removidas'] == len(codigo) - len(novo) > 0
+
+
+def test_constante_atravessa_a_phi_do_laco():
+    codigo = compilar(LACO_CONSTANTE).codigo_intermediario
+    novo, _ = propagar_constantes_condicional(codigo)
+    assert novo[-1] == Quadrupla(Op.ESCREVA, None, '2')
+
+
+def test_desvio_com_condicao_variavel_fica():
+    codigo = compilar(LACO_CONSTANTE.replace('n = 3;', 'n = n + 3;')).codigo_intermediario
+    novo, info = propagar_constantes_condicional(codigo)
+    assert Op.SE in [q.op for q in novo]
+    assert info['desvios_resolvidos'] == 0
+
+
+@pytest.mark.parametrize('programa, esperado', [(LACO_MORTO, ['0']), (LACO_CONSTANTE, ['2'])])
+@pytest.mark.parametrize('nivel', [0, 1, 2])
+def test_saida_igual_em_todos_os_niveis(rodar, programa, esperado, nivel):
+    saida, _ = rodar(programa, nivel_otimizacao=nivel)
+    assert saida == esperado
@@ -0,0 +1,19 @@
+import pytest
+
+from intermediario.quadruplas import Op, Quadrupla
+from otimizacao.propagacao_constantes import propagar_constantes
+
+# 3 elevado a 2**16 tem mais de 30 mil dígitos: não dá para escrever como literal
+QUADRADOS = "inicio_programa main\ninteiro a;\na = 3;\n" + "a = a * a;\n" * 16 + "escreva(a / a);\nfim_programa\n"
+
+
+def test_dobra_operacao_entre_literais():
+    novo, _ = propagar_constantes([Quadrupla(Op.SOMA, 'x', '2', '3'), Quadrupla(Op.ESCREVA, None, 'x')])
+    assert novo[-1] == Quadrupla(Op.ESCREVA, None, '5')
+
+
+@pytest.mark.parametrize('nivel', [0, 1, 2])
+@pytest.mark.parametrize('backend', ['vm', 'python'])
+def test_valor_grande_demais_nao_e_dobrado(rodar, nivel, backend):
+    saida, _ = rodar(QUADRADOS, nivel_otimizacao=nivel, backend=backend)
+    assert saida == ['1']
@@ -0,0 +1,69 @@
+from intermediario.quadruplas import Op, Quadrupla
+from otimizacao.cfg import grafos_por_funcao
+from otimizacao.ssa import FormaSSA, sair_ssa
+from test_fluxo_dados import DESVIO, LACO
+
+# funcao f: b := g; call h; b := b + g; call h; return b (g é global)
+CHAMADAS = [
+    Quadrupla(Op.FUNCAO, 'f', (), ('b',)),
+    Quadrupla(Op.COPIA, 'b', 'g'),
+    Quadrupla(Op.CHAMADA, None, 'h', 0),
+    Quadrupla(Op.SOMA, 'b', 'b', 'g'),
+    Quadrupla(Op.CHAMADA, None, 'h', 0),
+    Quadrupla(Op.RETORNO, None, 'b'),
+    Quadrupla(Op.FIM_FUNCAO, 'f'),
+]
+
+
+def _forma(codigo, indice=0):
+    return FormaSSA(grafos_por_funcao(codigo)[indice])
+
+
+def test_phi_no_rotulo_de_juncao_do_desvio():
+    forma = _forma(DESVIO)
+    assert forma.idom == [0, 0, 0]
+    assert [[repr(phi) for phi in phis] for phis in forma.phis] == [[], [], ['x.3 := phi(x.1, x.2)']]
+    assert forma.listagem() == [
+        'x.1 := 1', 't.1 := x.1 + y.0', 'ifFalse c.0 goto L1', 'x.2 := 2',
+        'L1:', 'x.3 := phi(x.1, x.2)', 'u.1 := y.0 + x.3', 'escreva(u.1)',
+    ]
+
+
+def test_phi_no_cabecalho_do_laco():
+    forma = _forma(LACO)
+    assert forma.idom == [0, 0, 1, 1]
+    assert forma.listagem() == [
+        'x.1 := 0', 'L0:', 'x.2 := phi(x.1, x.3)', 'ifFalse c.0 goto L1',
+        'x.3 := x.2 + 1', 'goto L0', 'L1:', 'escreva(x.2)',
+    ]
+
+
+def test_sem_phi_para_variavel_morta_na_juncao():
+    # sem o uso de x depois de L1, as duas definições não precisam de φ
+    codigo = DESVIO[:5] + [Quadrupla(Op.ESCREVA, None, 'y')]
+    assert _forma(codigo).phis == [[], [], []]
+
+
+def test_chamada_cria_uma_versao_da_global_lida_depois():
+    forma = _forma(CHAMADAS, 1)
+    # as duas leituras de g depois da primeira chamada usam a mesma versão;
+    # depois da segunda chamada g não é lida e nenhuma versão é criada
+    assert forma.listagem() == ['b.1 := g.0', 'call h, 0', 'b.2 := b.1 + g.1', 'call h, 0', 'return b.2']
+    assert forma.globais_lidas == frozenset({'g'})
+
+
+def test_locais_nao_mudam_de_versao_na_chamada():
+    codigo = CHAMADAS[:1] + [Quadrupla(Op.COPIA, 'b', '1'), Quadrupla(Op.CHAMADA, None, 'h', 0)] + CHAMADAS[5:]
+    assert _forma(codigo, 1).listagem() == ['b.1 := 1', 'call h, 0', 'return b.1']
+
+
+def test_sair_ssa_volta_ao_corpo_original():
+    for codigo, indice in ((DESVIO, 0), (LACO, 0), (CHAMADAS, 1)):
+        grafo = grafos_por_funcao(codigo)[indice]
+        assert sair_ssa(FormaSSA(grafo)) == list(grafo.corpo)
+
+
+def test_sair_ssa_descarta_blocos_e_instrucoes_removidas():
+    forma = _forma(DESVIO)
+    forma.corpo[3] = None
+    assert sair_ssa(forma, [2, 0]) == DESVIO[:3] + DESVIO[4:]
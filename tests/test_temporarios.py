@@ -0,0 +1,45 @@
+import pytest
+
+from compilador import compilar
+from intermediario.quadruplas import eh_temporario
+
+
+@pytest.mark.parametrize('declaracao', [
+    'inteiro a, _t0;',
+    'procedimento p(inteiro _tm3) { escreva(_tm3); }',
+    'funcao _t12(): inteiro { retorna 1; }',
+])
+def test_nomes_na_forma_dos_temporarios_sao_rejeitados(declaracao):
+    codigo = f"inicio_programa main\n{declaracao}\nescreva(2 + 3);\nfim_programa\n"
+    with pytest.raises(Exception, match="reservada aos temporários"):
+        compilar(codigo)
+
+
+def test_prefixo_no_meio_do_nome_e_aceito(rodar):
+    saida, _ = rodar("inicio_programa main\ninteiro a_t0, t0;\na_t0 = 2;\nt0 = 3;\nescreva(a_t0 + t0);\nfim_programa\n")
+    assert saida == ['5']
+
+
+@pytest.mark.parametrize('nivel', [0, 1, 2])
+@pytest.mark.parametrize('backend', ['vm', 'python'])
+def test_outros_nomes_com_o_prefixo_sao_aceitos(rodar, nivel, backend):
+    codigo = """inicio_programa main
+inteiro _total, _tipo, _t, _t1x;
+procedimento p(inteiro _tx) { escreva(_tx + _total); }
+_total = 2;
+_tipo = 3;
+_t = 4;
+_t1x = 5;
+p(_tipo * _t + _t1x);
+fim_programa
+"""
+    saida, _ = rodar(codigo, nivel_otimizacao=nivel, backend=backend)
+    assert saida == ['19']
+
+
+@pytest.mark.parametrize('nome, temporario', [
+    ('_t0', True), ('_t17', True), ('_tm0', True), ('_tm42', True),
+    ('_t', False), ('_tm', False), ('_total', False), ('_tipo', False), ('_t1x', False), ('t0', False),
+])
+def test_eh_temporario(nome, temporario):
+    assert eh_temporario(nome) is temporario